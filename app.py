@@ -1,5 +1,8 @@
 import streamlit as st
-from utils.database import obtener_datos
+from utils.database import obtener_datos, invalidar_version
+from utils.exportacion import FORMATOS_EXPORTACION, descarga_diferida
+from utils.formato_largo import anios_en_columnas, columna_pasajeros
+from utils.rendimiento import iniciar_ejecucion, panel_rendimiento
 
 # Configurar la página
 st.set_page_config(
@@ -9,6 +12,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Etapas de esta ejecución para el panel de rendimiento
+iniciar_ejecucion()
+
 # Título principal
 st.title("✈️ Análisis exploratorio de tráfico aéreo en EE.UU 2022-2023")
 st.markdown("---")
@@ -22,6 +28,10 @@ tabla_seleccionada = st.selectbox(
     index=2  # Por defecto mostrar airports
 )
 
+# Comprobar ahora si la tabla cambió; solo se vuelve a descargar si su versión es distinta
+if st.button("🔄 Buscar cambios", help="Comprueba si la tabla cambió en la base de datos y, si es así, la vuelve a descargar"):
+    invalidar_version(tabla_seleccionada)
+
 # Obtener datos basado en la tabla seleccionada
 with st.spinner(f"Cargando datos de la tabla {tabla_seleccionada}..."):
     df = obtener_datos(tabla_seleccionada)
@@ -36,22 +46,12 @@ if not df.empty:
     with col2:
         st.metric("Total de Columnas", len(df.columns))
 
-    if tabla_seleccionada == "domestic":
-        with col3:
-            total_pasajeros = df['2023_enplaned_passengers_dom'].sum()
-            st.metric("Total Pasajeros 2023", f"{total_pasajeros:,.0f}")
-
-        with col4:
-            total_pasajeros = df['2022_enplaned_passengers_dom'].sum()
-            st.metric("Total Pasajeros 2022", f"{total_pasajeros:,.0f}")
-    elif tabla_seleccionada == "international":
-        with col3:
-            total_pasajeros = df['2023_enplaned_passengers_inter'].sum()
-            st.metric("Total Pasajeros 2023", f"{total_pasajeros:,.0f}")
-
-        with col4:
-            total_pasajeros = df['2022_enplaned_passengers_inter'].sum()
-            st.metric("Total Pasajeros 2022", f"{total_pasajeros:,.0f}")
+    if tabla_seleccionada in ("domestic", "international"):
+        # Pasajeros de los dos años más recientes de la tabla
+        for columna, anio in zip((col3, col4), anios_en_columnas(df.columns, tabla_seleccionada)):
+            with columna:
+                total_pasajeros = df[columna_pasajeros(anio, tabla_seleccionada)].sum()
+                st.metric(f"Total Pasajeros {anio}", f"{total_pasajeros:,.0f}")
     else:
         with col3:
             st.metric("Tabla", tabla_seleccionada.title())
@@ -61,18 +61,28 @@ if not df.empty:
     # Mostrar todos los datos
     st.dataframe(df, width='stretch')
     
-    # Botón para descargar
-    csv = df.to_csv(index=False)
-    st.download_button(
-        label="📥 Descargar CSV",
-        data=csv,
-        file_name=f"{tabla_seleccionada}_data.csv",
-        mime="text/csv"
-    )
+    # Botón para descargar: el archivo se genera recién al hacer clic (no en cada recarga)
+    col1, col2 = st.columns([1, 3], vertical_alignment="bottom")
+    with col1:
+        formato = st.selectbox(
+            "Formato de descarga:",
+            options=list(FORMATOS_EXPORTACION),
+            format_func=lambda clave: FORMATOS_EXPORTACION[clave]['nombre']
+        )
+    with col2:
+        st.download_button(
+            label=f"📥 Descargar {FORMATOS_EXPORTACION[formato]['nombre']}",
+            data=descarga_diferida(df, formato),
+            file_name=f"{tabla_seleccionada}_data{FORMATOS_EXPORTACION[formato]['extension']}",
+            mime=FORMATOS_EXPORTACION[formato]['mime']
+        )
 
 else:
     st.error(f"❌ No se pudieron cargar los datos de la tabla '{tabla_seleccionada}'")
 
 # Footer
 st.markdown("---")
-st.markdown("📊 **✈️ Análisis exploratorio de tráfico aéreo en EE.UU 2022-2023** - Grupo 5 (Computación 2) - Universidad Central de Venezuela")
\ No newline at end of file
+st.markdown("📊 **✈️ Análisis exploratorio de tráfico aéreo en EE.UU 2022-2023** - Grupo 5 (Computación 2) - Universidad Central de Venezuela")
+
+# Panel de rendimiento (oculto salvo con ?perf=1 o AIRPORTS_PERF_PANEL=1)
+panel_rendimiento()
@@ -0,0 +1,226 @@
+"""
+Benchmarks de las transformaciones de datos de la aplicación sobre tablas sintéticas.
+
+Uso:
+    python -m benchmarks.ejecutar                                # 10², 10⁴ y 10⁶ aeropuertos
+    python -m benchmarks.ejecutar --tamanos 100 10000 --json resultados.json
+    python -m benchmarks.ejecutar --comparar resultados.json     # falla si hay regresiones
+
+Para cada transformación se informa el mejor tiempo de varias repeticiones, las filas
+procesadas por segundo y el pico de memoria (medido con tracemalloc en una ejecución aparte,
+para que el rastreo no afecte el tiempo).
+"""
+import argparse
+import gc
+import json
+import logging
+import sys
+import time
+import tracemalloc
+
+import streamlit  # noqa: F401
+
+# Fuera de 'streamlit run' las funciones con st.cache_data/st.cache_resource avisan que no hay
+# runtime; no afecta a las mediciones. Streamlit fija el nivel de cada logger hijo, así que
+# se silencian los que emiten el aviso
+for _logger in ('streamlit.runtime.caching.cache_data_api', 'streamlit.runtime.caching.cache_resource_api'):
+    logging.getLogger(_logger).setLevel(logging.ERROR)
+
+from benchmarks.generador import filas_postgrest, generar_mensual, generar_tablas
+from utils.aeropuertos import construir_hechos_aeropuertos, construir_hechos_largos, construir_hechos_por_flujo
+from utils.clasificacion import FLUJOS_PROPORCIONES, calcular_proporciones
+from utils.comparativa import COLUMNAS_COMPARATIVA, preparar_comparativa
+from utils.database import procesar_filas
+from utils.formato_largo import variacion_interanual
+from utils.mensual import a_formato_mensual, calcular_agregados
+
+TAMANOS_POR_DEFECTO = [100, 10_000, 1_000_000]
+REPETICIONES_POR_DEFECTO = 3
+
+# Aumento relativo (de tiempo o de memoria) a partir del cual se informa una regresión
+UMBRAL_REGRESION = 0.25
+
+
+def medir(funcion, repeticiones):
+    """
+    Mide una función sin argumentos: mejor tiempo de 'repeticiones' ejecuciones y
+    pico de memoria de una ejecución adicional con tracemalloc.
+
+    Args:
+        funcion (callable): Función a medir
+        repeticiones (int): Ejecuciones cronometradas
+
+    Returns:
+        tuple[float, int]: Segundos de la mejor ejecución y pico de memoria en bytes
+    """
+    tiempos = []
+    for _ in range(max(1, repeticiones)):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return min(tiempos), pico
+
+
+def ejecutar_tamano(n_aeropuertos, repeticiones):
+    """
+    Ejecuta todos los benchmarks con un conjunto sintético de 'n_aeropuertos' aeropuertos.
+
+    Transformaciones medidas:
+    - procesar_filas[<tabla>]: post-procesamiento de obtener_datos (JSON -> DataFrame)
+    - construir_hechos_largos: tabla de hechos larga (una fila por aeropuerto, año y flujo)
+    - construir_hechos_aeropuertos: pivote y uniones de la tabla de hechos (páginas 08 y 09)
+    - variacion_interanual: cambio porcentual 2022-2023 de la página 08
+    - calcular_proporciones: proporciones y clasificación de la página 7
+    - preparar_comparativa: procesamiento de la página 10
+    - calcular_agregados: acumulado de 12 meses y cambio interanual al cargar un mes nuevo
+
+    Args:
+        n_aeropuertos (int): Cantidad de aeropuertos
+        repeticiones (int): Ejecuciones cronometradas de cada transformación
+
+    Returns:
+        dict[str, dict]: Por transformación: filas, segundos, filas_por_segundo y memoria_pico_mb
+    """
+    tablas = generar_tablas(n_aeropuertos)
+    resultados = {}
+
+    def registrar(nombre, funcion, filas):
+        segundos, pico = medir(funcion, repeticiones)
+        resultados[nombre] = {
+            'filas': filas,
+            'segundos': segundos,
+            'filas_por_segundo': filas / segundos if segundos > 0 else float('inf'),
+            'memoria_pico_mb': pico / 2 ** 20,
+        }
+        mostrar_resultado(n_aeropuertos, nombre, resultados[nombre])
+
+    # Post-procesamiento de obtener_datos; las filas se generan y se liberan tabla por tabla
+    procesadas = {}
+    for tabla in ('airports', 'domestic', 'international', 'total'):
+        filas = filas_postgrest(tablas, tabla)
+        registrar(f'procesar_filas[{tabla}]', lambda: procesar_filas(tabla, filas), len(filas))
+        procesadas[tabla] = procesar_filas(tabla, filas)
+        del filas
+
+    registrar(
+        'construir_hechos_largos',
+        lambda: construir_hechos_largos(procesadas['total'], procesadas['domestic'], procesadas['international']),
+        n_aeropuertos
+    )
+    largo = construir_hechos_largos(procesadas['total'], procesadas['domestic'], procesadas['international'])
+    registrar('variacion_interanual', lambda: variacion_interanual(largo, '2022', '2023'), len(largo))
+
+    registrar(
+        'construir_hechos_aeropuertos',
+        lambda: construir_hechos_aeropuertos(
+            procesadas['total'], procesadas['domestic'], procesadas['international'], procesadas['airports']
+        ),
+        n_aeropuertos
+    )
+
+    hechos = construir_hechos_por_flujo(largo, procesadas['airports'], FLUJOS_PROPORCIONES)
+    registrar('calcular_proporciones', lambda: calcular_proporciones(hechos), n_aeropuertos)
+
+    total = procesadas['total'][COLUMNAS_COMPARATIVA]
+    registrar('preparar_comparativa', lambda: preparar_comparativa(total), n_aeropuertos)
+
+    # Un mes nuevo (diciembre de 2023) con el acumulado de noviembre y el mismo mes de 2022
+    # Solo se generan los tres meses que se usan (el año completo no entra en memoria con 10⁶ aeropuertos)
+    mensual = a_formato_mensual(generar_mensual(tablas, meses=[(2022, 12), (2023, 11), (2023, 12)]))
+    mes = mensual[(mensual['year'] == 2023) & (mensual['month'] == 12)]
+    hace_un_anio = mensual[(mensual['year'] == 2022) & (mensual['month'] == 12)]
+    anterior = calcular_agregados(mensual[(mensual['year'] == 2023) & (mensual['month'] == 11)])
+    del mensual
+    registrar('calcular_agregados', lambda: calcular_agregados(mes, anterior, hace_un_anio), len(mes))
+
+    return resultados
+
+
+def mostrar_resultado(n_aeropuertos, nombre, resultado):
+    """
+    Imprime una fila de resultados.
+
+    Args:
+        n_aeropuertos (int): Tamaño del conjunto sintético
+        nombre (str): Transformación
+        resultado (dict): Resultado de la transformación
+    """
+    print(
+        f"{n_aeropuertos:>10,}  {nombre:<32}  {resultado['segundos'] * 1000:>11.2f} ms"
+        f"  {resultado['filas_por_segundo']:>14,.0f} filas/s  {resultado['memoria_pico_mb']:>9.1f} MB"
+    )
+
+
+def comparar(resultados, base, umbral=UMBRAL_REGRESION):
+    """
+    Compara los resultados con una ejecución anterior y devuelve las regresiones.
+
+    Args:
+        resultados (dict): Resultados actuales por tamaño y transformación
+        base (dict): Resultados de referencia (mismo formato, leídos del JSON)
+        umbral (float): Aumento relativo de tiempo o memoria que cuenta como regresión
+
+    Returns:
+        list[str]: Descripción de cada regresión encontrada
+    """
+    regresiones = []
+    for tamano, transformaciones in resultados.items():
+        for nombre, actual in transformaciones.items():
+            anterior = base.get(tamano, {}).get(nombre)
+            if anterior is None:
+                continue
+            for medida, unidad in (('segundos', 's'), ('memoria_pico_mb', 'MB')):
+                if anterior[medida] > 0 and actual[medida] > anterior[medida] * (1 + umbral):
+                    regresiones.append(
+                        f"{tamano} aeropuertos, {nombre}: {medida} {anterior[medida]:.4g} {unidad} -> "
+                        f"{actual[medida]:.4g} {unidad} (+{actual[medida] / anterior[medida] - 1:.0%})"
+                    )
+    return regresiones
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de las transformaciones de datos sobre tablas sintéticas")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=TAMANOS_POR_DEFECTO,
+                        help="Cantidades de aeropuertos de los conjuntos sintéticos")
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES_POR_DEFECTO,
+                        help="Ejecuciones cronometradas de cada transformación (se informa la mejor)")
+    parser.add_argument('--json', help="Guardar los resultados en este archivo")
+    parser.add_argument('--comparar', help="Comparar con los resultados guardados en este archivo")
+    parser.add_argument('--umbral', type=float, default=UMBRAL_REGRESION,
+                        help="Aumento relativo de tiempo o memoria que cuenta como regresión")
+    args = parser.parse_args(argumentos)
+
+    print(f"{'aeropuertos':>10}  {'transformación':<32}  {'tiempo':>14}  {'rendimiento':>21}  {'pico':>12}")
+    resultados = {}
+    for tamano in args.tamanos:
+        resultados[str(tamano)] = ejecutar_tamano(tamano, args.repeticiones)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            regresiones = comparar(resultados, json.load(archivo), args.umbral)
+        if regresiones:
+            print("\nRegresiones:")
+            for regresion in regresiones:
+                print(f"  {regresion}")
+            return 1
+        print("\nSin regresiones")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+
+# Proporción de aeropuertos que tienen vuelos internacionales
+PROPORCION_INTERNACIONAL = 0.4
+
+# Aeropuertos por ciudad y cantidad máxima de estados
+AEROPUERTOS_POR_CIUDAD = 3
+MAX_ESTADOS = 50
+
+LETRAS = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+
+# Peso relativo de cada mes (enero a diciembre) en los pasajeros del año: el flujo doméstico
+# sube en verano y en las fiestas; el internacional se concentra más en julio y agosto
+ESTACIONALIDAD = {
+    'domestic': np.array([0.85, 0.82, 1.00, 1.00, 1.05, 1.12, 1.15, 1.10, 0.95, 1.00, 0.97, 1.04]),
+    'international': np.array([0.90, 0.78, 0.90, 0.95, 1.00, 1.15, 1.30, 1.25, 0.95, 0.92, 0.85, 1.05]),
+}
+
+
+def _codigos_iata(n):
+    """
+    Códigos IATA de tres letras (AAA, AAB, ...); se repiten cada 26³ aeropuertos.
+
+    Args:
+        n (int): Cantidad de códigos
+
+    Returns:
+        np.ndarray: Códigos
+    """
+    i = np.arange(n) % 26 ** 3
+    return np.char.add(np.char.add(LETRAS[i // 676], LETRAS[(i // 26) % 26]), LETRAS[i % 26])
+
+
+def _ranking(valores):
+    """
+    Ranking de mayor a menor (1 = mayor valor).
+
+    Args:
+        valores (np.ndarray): Valores
+
+    Returns:
+        np.ndarray: Ranking de cada valor
+    """
+    ranking = np.empty(len(valores), dtype=np.int64)
+    ranking[np.argsort(-valores, kind='stable')] = np.arange(1, len(valores) + 1)
+    return ranking
+
+
+def _cambio_porcentual(anterior, actual):
+    """
+    Cambio porcentual redondeado a 2 decimales, como en la base de datos (0 si el año anterior es 0).
+
+    Args:
+        anterior (np.ndarray): Pasajeros 2022
+        actual (np.ndarray): Pasajeros 2023
+
+    Returns:
+        np.ndarray: Cambio porcentual
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cambio = np.where(anterior > 0, (actual - anterior) / anterior * 100, 0.0)
+    return np.round(cambio, 2)
+
+
+def _tabla_flujo(ids_aeropuerto, pasajeros_2023, pasajeros_2022, sufijo):
+    """
+    Tabla de un flujo ('domestic', 'international' o 'total') con las columnas de la base de datos.
+
+    Args:
+        ids_aeropuerto (np.ndarray): 'airport_id' de cada fila
+        pasajeros_2023 (np.ndarray): Pasajeros embarcados 2023
+        pasajeros_2022 (np.ndarray): Pasajeros embarcados 2022
+        sufijo (str): 'dom', 'inter' o 'total'
+
+    Returns:
+        pd.DataFrame: Tabla del flujo
+    """
+    return pd.DataFrame({
+        f'2023_rank_{sufijo}': _ranking(pasajeros_2023),
+        f'2022_rank_{sufijo}': _ranking(pasajeros_2022),
+        f'percentage_change_2022_2023_{sufijo}': _cambio_porcentual(pasajeros_2022, pasajeros_2023),
+        f'2023_enplaned_passengers_{sufijo}': pasajeros_2023,
+        f'2022_enplaned_passengers_{sufijo}': pasajeros_2022,
+        'id': np.arange(1, len(ids_aeropuerto) + 1),
+        'airport_id': ids_aeropuerto,
+    })
+
+
+def generar_tablas(n_aeropuertos, semilla=0, proporcion_internacional=PROPORCION_INTERNACIONAL):
+    """
+    Genera las seis tablas de la base de datos (city, state, airports, domestic,
+    international y total) con datos sintéticos y el mismo esquema que Supabase.
+
+    Los pasajeros siguen una distribución log-normal (pocos aeropuertos muy grandes y
+    muchos pequeños); 2022 varía entre -30% y +30% respecto de 2023; los rankings y el
+    cambio porcentual se calculan como en la base de datos.
+
+    Args:
+        n_aeropuertos (int): Cantidad de aeropuertos
+        semilla (int): Semilla del generador aleatorio
+        proporcion_internacional (float): Proporción de aeropuertos con vuelos internacionales
+
+    Returns:
+        dict[str, pd.DataFrame]: Tablas por nombre
+    """
+    rng = np.random.default_rng(semilla)
+    n = n_aeropuertos
+    n_ciudades = max(1, n // AEROPUERTOS_POR_CIUDAD)
+    n_estados = min(MAX_ESTADOS, n_ciudades)
+
+    state = pd.DataFrame({'id': np.arange(1, n_estados + 1), 'name': [f'State {i}' for i in range(n_estados)]})
+    city = pd.DataFrame({'id': np.arange(1, n_ciudades + 1), 'name': [f'City {i}' for i in range(n_ciudades)]})
+
+    ids = np.arange(1, n + 1)
+    city_id = rng.integers(1, n_ciudades + 1, n)
+    state_id = rng.integers(1, n_estados + 1, n)
+    nombres = [f'Airport {i} International' for i in range(n)]
+    airports = pd.DataFrame({
+        'id': ids,
+        'iata_code': _codigos_iata(n),
+        'name': [f'City {c - 1}, S{s:02d}: {a}' for c, s, a in zip(city_id, state_id, nombres)],
+        'airport': nombres,
+        'state_id': state_id,
+        'city_id': city_id,
+    })
+
+    dom_2023 = rng.lognormal(11, 2, n).astype(np.int64)
+    dom_2022 = (dom_2023 * rng.uniform(0.7, 1.3, n)).astype(np.int64)
+
+    con_internacional = rng.random(n) < proporcion_internacional
+    inter_2023 = (dom_2023 * rng.uniform(0.01, 0.5, n)).astype(np.int64)
+    inter_2022 = (inter_2023 * rng.uniform(0.7, 1.3, n)).astype(np.int64)
+
+    tot_2023 = dom_2023 + np.where(con_internacional, inter_2023, 0)
+    tot_2022 = dom_2022 + np.where(con_internacional, inter_2022, 0)
+
+    return {
+        'city': city,
+        'state': state,
+        'airports': airports,
+        'domestic': _tabla_flujo(ids, dom_2023, dom_2022, 'dom'),
+        'international': _tabla_flujo(
+            ids[con_internacional], inter_2023[con_internacional], inter_2022[con_internacional], 'inter'
+        ),
+        'total': _tabla_flujo(ids, tot_2023, tot_2022, 'total'),
+    }
+
+
+def generar_mensual(tablas, semilla=0, ruido=0.05, meses=None):
+    """
+    Reparte los pasajeros anuales de las tablas 'domestic' e 'international' en meses
+    con ESTACIONALIDAD y un ruido por aeropuerto y mes. Los meses de cada año suman
+    el total anual (salvo el redondeo).
+
+    Args:
+        tablas (dict[str, pd.DataFrame]): Tablas de generar_tablas
+        semilla (int): Semilla del generador aleatorio
+        ruido (float): Desvío relativo del peso de cada mes
+        meses (list[tuple[int, int]], optional): Meses (año, mes) que se devuelven (por
+            defecto todos). Los valores son los mismos que con todos los meses; solo se
+            evita armar las filas del resto
+
+    Returns:
+        pd.DataFrame: Una fila por aeropuerto y mes con airport_id, year, month, domestic e international
+    """
+    rng = np.random.default_rng(semilla)
+    ids = tablas['total']['airport_id'].to_numpy()
+    anios = sorted({int(col[:4]) for col in tablas['domestic'].columns if col[:4].isdigit()})
+    partes = []
+    for anio in anios:
+        # Los pesos de los 12 meses se sortean siempre (normalizan el año y mantienen la
+        # secuencia aleatoria), pero solo se arman las filas de los meses pedidos
+        elegidos = np.arange(12) if meses is None else np.array([m - 1 for a, m in meses if a == anio], dtype=np.int64)
+        mensual = {}
+        for flujo, sufijo in (('domestic', 'dom'), ('international', 'inter')):
+            anual = tablas[flujo].set_index('airport_id')[f'{anio}_enplaned_passengers_{sufijo}']
+            anual = anual.reindex(ids, fill_value=0).to_numpy(dtype=np.float64)
+            pesos = ESTACIONALIDAD[flujo] * rng.lognormal(0, ruido, (len(ids), 12))
+            pesos /= pesos.sum(axis=1, keepdims=True)
+            mensual[flujo] = (anual[:, None] * pesos[:, elegidos]).astype(np.int64).ravel()
+        if not len(elegidos):
+            continue
+        partes.append(pd.DataFrame({
+            'airport_id': np.repeat(ids, len(elegidos)),
+            'year': anio,
+            'month': np.tile(elegidos + 1, len(ids)),
+            **mensual,
+        }))
+    if not partes:
+        return pd.DataFrame(columns=['airport_id', 'year', 'month', 'domestic', 'international'])
+    return pd.concat(partes, ignore_index=True)
+
+
+def filas_postgrest(tablas, tabla):
+    """
+    Filas de una tabla tal como las devuelve PostgREST para la consulta completa de
+    descargar_tabla ('*' más las relaciones embebidas de RELACIONES).
+
+    Args:
+        tablas (dict[str, pd.DataFrame]): Tablas de generar_tablas
+        tabla (str): Nombre de la tabla
+
+    Returns:
+        list[dict]: Filas de la respuesta
+    """
+    filas = tablas[tabla].to_dict('records')
+
+    if tabla in ('domestic', 'international', 'total'):
+        nombres = tablas['airports'].set_index('id')['airport']
+        for fila, nombre in zip(filas, nombres.reindex(tablas[tabla]['airport_id']).tolist()):
+            fila['airports'] = {'airport': nombre}
+
+    if tabla == 'airports':
+        for relacion, columna in (('city', 'city_id'), ('state', 'state_id')):
+            nombres = tablas[relacion].set_index('id')['name']
+            for fila, nombre in zip(filas, nombres.reindex(tablas['airports'][columna]).tolist()):
+                fila[relacion] = {'name': nombre}
+
+    return filas
@@ -1,102 +1,46 @@
 import streamlit as st
-from utils.database import obtener_datos
+from utils.aeropuertos import obtener_anios, obtener_variacion, TABLAS_HECHOS
+from utils.figuras import figura_en_cache
+from utils.rankings import obtener_indice_variacion, top_n_aeropuertos
+from utils.rendimiento import iniciar_ejecucion, panel_rendimiento
 import plotly.express as px # type: ignore
-import pandas as pd
 
 # Configurar la página
 st.set_page_config(
-    page_title="Aeropuertos con mayor y menor porcentaje de crecimiento entre los años 2022 - 2023",
+    page_title="Aeropuertos con mayor y menor porcentaje de crecimiento de pasajeros",
     page_icon="✈️",
     layout="wide",
     initial_sidebar_state="expanded"
 )
 
-# Título principal
-st.title("✈️ Análisis exploratorio de tráfico aéreo en EE.UU 2022-2023")
+# Etapas de esta ejecución para el panel de rendimiento
+iniciar_ejecucion()
+
+# --- Selectores de años ---
+st.sidebar.header("Opciones de Cambio %")
+
+# Cualquier par de años con datos; por defecto los dos más recientes
+anios = obtener_anios()
+anio_final = st.sidebar.selectbox("Año final:", options=anios, index=0)
+anio_base = st.sidebar.selectbox("Año base:", options=anios, index=min(1, len(anios) - 1))
+
+# Título principal (con el par de años elegido)
+st.title(f"✈️ Análisis exploratorio de tráfico aéreo en EE.UU {anio_base}-{anio_final}")
 st.markdown("---")
 
 # Tab 1: Datos Completos
-st.subheader("Porcentaje de crecimiento de pasajeros entre los años 2022 - 2023")
+st.subheader(f"Porcentaje de crecimiento de pasajeros entre los años {anio_base} - {anio_final}")
 st.markdown("---")
 
-# 1. Define la tabla que quieres (por ejemplo, 'total', 'domestic', 'airports')
-Tabla_Total = 'total' 
-Tabla_Domestic = 'domestic'
-Tabla_airports = 'airports'
-Tabla_international = 'international'
-
-# 2. Llama a la función para obtener la tabla completa como un DataFrame
-# La función está decorada con @st.cache_data, por lo que solo se ejecuta una vez.
-df_total = obtener_datos(Tabla_Total)
-df_domestic = obtener_datos(Tabla_Domestic)
-df_airports = obtener_datos(Tabla_airports)
-df_international = obtener_datos(Tabla_international)
-
-# Convertir la columna 'airport' a string (texto) en df_total
-df_total['airport'] = df_total['airport'].astype(str)
-
-# Convertir la columna 'airport' a string (texto) en df_domestic
-df_domestic['airport'] = df_domestic['airport'].astype(str)
-
-# Convertir la columna 'airport' a string (texto) en df_international
-df_international['airport'] = df_international['airport'].astype(str)
-
-df_airports['iata_code'] = df_airports['iata_code'].astype(str)
-
-# --- Paso 2: Ejecutar el Join/Merge de forma segura ---
-
-KEY_COL = 'airport' 
-
-# 1. Seleccionar las últimas 2 columnas de df_domestic y df_international
-df2_extra = df_domestic.iloc[:, -2:]
-df3_extra = df_international.iloc[:, -2:]
-df4_extra = df_airports[['iata_code']]
-
-# 2. Establecer la columna clave como índice en los DataFrames que se van a unir
-# Esto es necesario para usar .join()
-df2_extra = df2_extra.set_index(df_domestic[KEY_COL])
-df3_extra = df3_extra.set_index(df_international[KEY_COL])
-df4_extra = df4_extra.set_index(df_airports[KEY_COL])
-
-
-# 3. Unir (Join) usando la columna clave ya unificada
-df_final = df_total.join(
-    df2_extra, 
-    on=KEY_COL, 
-    how='left'
-).join(
-    df3_extra, 
-    on=KEY_COL, 
-    how='left'
-).join(
-    df4_extra,
-    on=KEY_COL,
-    how='left'
-)
+# Variación interanual del par de años elegido (ver utils/aeropuertos.py): una fila por
+# aeropuerto de la tabla de hechos con las columnas 'cambio_<flujo>_pct', en caché.
+df_final = obtener_variacion(anio_base, anio_final)
 
-df_final.rename(columns={'2023_enplaned_passengers_total': '2023_total','2022_enplaned_passengers_total': '2022_total','2023_enplaned_passengers_dom': '2023_domestic','2022_enplaned_passengers_dom': '2022_domestic','2023_enplaned_passengers_inter': '2023_international','2022_enplaned_passengers_inter': '2022_international'}, inplace=True)
-
-# Definición de las nuevas columnas de cambio porcentual
-TIPOS_DE_FLUJO = ['total', 'domestic', 'international']
-
-for flujo in TIPOS_DE_FLUJO:
-    col_2022 = f'2022_{flujo}'
-    col_2023 = f'2023_{flujo}'
-    
-    # Nombre de la nueva columna de cambio porcentual
-    col_cambio = f'cambio_{flujo}_pct'
-    
-    # Calcular el cambio porcentual
-    # Nota: Usamos .div(..., fill_value=0) para manejar posibles divisiones por cero 
-    # (si 2022 es 0 o NaN)
-    df_final[col_cambio] = (
-        (df_final[col_2023] - df_final[col_2022]) / df_final[col_2022].replace(0, pd.NA)
-    ) * 100
+if df_final.empty:
+    st.error("❌ No se pudieron cargar los datos. Verifica la conexión a la base de datos.")
+    st.stop()
 
-# Llenar cualquier valor NaN resultante con 0 (si no hay datos o la división era por cero)
-df_final = df_final.fillna(0)
-
-def crear_grafico_cambio(df, flujo, orden, n_aeropuertos):
+def crear_grafico_cambio(df, flujo, orden, n_aeropuertos, anio_base, anio_final):
     """
     Genera un gráfico de barras de cambio porcentual dinámico.
     """
@@ -110,30 +54,28 @@ def crear_grafico_cambio(df, flujo, orden, n_aeropuertos):
     
     # --- NUEVO PASO CLAVE: FILTRAR LOS DATOS DE CAMBIO 0% ---
     
-    # 1. Crear una copia del DataFrame para trabajar sobre él
-    df_filtrado = df.copy()
-    
-    # 2. Aplicar el filtro: solo incluir filas donde el cambio NO es 0
+    # Máscara de filas donde el cambio NO es 0 (sin copiar el DataFrame)
     # Esto elimina los aeropuertos que pasaron de 0 a 0 o que realmente no tienen datos.
-    # Usamos np.isclose() para manejar errores de punto flotante, aunque pd.Series.abs() > 0.0 también funciona.
-    df_filtrado = df_filtrado[df_filtrado[nombre_columna_cambio].abs() > 0.001].copy()
+    mascara = (df[nombre_columna_cambio].abs() > 0.001).to_numpy()
 
     # Si después de filtrar no quedan datos
-    if df_filtrado.empty:
+    if not mascara.any():
         st.warning(f"No hay aeropuertos con cambio porcentual distinto de 0% para el flujo {titulo_flujo}.")
         return None
 
-    # 2. ORDENAR Y SELECCIONAR DATOS
-    
-    if orden == 'Mayor Crecimiento (Top N)':
-        # Orden descendente (los cambios positivos más altos)
-        df_ordenado = df_filtrado.sort_values(by=nombre_columna_cambio, ascending=False)
-    else: # Menor Crecimiento (Bottom N)
-        # Orden ascendente (los cambios negativos más bajos)
-        df_ordenado = df_filtrado.sort_values(by=nombre_columna_cambio, ascending=True)
-
-    # Seleccionar los Top/Bottom N
-    df_top_n = df_ordenado.head(n_aeropuertos).copy()
+    # 2. SELECCIONAR LOS TOP/BOTTOM N
+    # Se toman las primeras posiciones del orden precalculado de la columna (ver utils/rankings.py)
+    # en lugar de ordenar todo el DataFrame en cada cambio de los selectores.
+    df_top_n = top_n_aeropuertos(
+        df,
+        nombre_columna_cambio,
+        n_aeropuertos,
+        # Mayor crecimiento: orden descendente (los cambios positivos más altos);
+        # menor crecimiento: orden ascendente (los cambios negativos más bajos)
+        descendente=(orden == 'Mayor Crecimiento (Top N)'),
+        mascara=mascara,
+        indice=obtener_indice_variacion(anio_base, anio_final)
+    )
     
     # 3. GENERAR EL GRÁFICO CON PLOTLY
     
@@ -142,7 +84,7 @@ def crear_grafico_cambio(df, flujo, orden, n_aeropuertos):
         x=nombre_columna_cambio, 
         y='airport', 
         orientation='h', 
-        title=f'{orden} de {n_aeropuertos} Aeropuertos: Cambio % de Pasajeros {titulo_flujo} (2022 vs 2023)',
+        title=f'{orden} de {n_aeropuertos} Aeropuertos: Cambio % de Pasajeros {titulo_flujo} ({anio_base} vs {anio_final})',
         labels={nombre_columna_cambio: 'Cambio Porcentual (%)', 'airport': 'Aeropuerto'},
         # Usamos una escala de color divergente para mostrar crecimiento (positivo) vs. caída (negativo)
         color=nombre_columna_cambio,
@@ -160,8 +102,6 @@ def crear_grafico_cambio(df, flujo, orden, n_aeropuertos):
 # --- Lógica de la página ---
 
 # --- Selectores ---
-st.sidebar.header("Opciones de Cambio %")
-
 # Selector de Flujo (Nacional, Internacional, Total)
 flujo_seleccionado = st.sidebar.selectbox(
     "Selecciona el Flujo de Pasajeros:",
@@ -185,17 +125,27 @@ n_seleccionado = st.sidebar.slider(
 
 # --- Generar Gráfico ---
 if 'df_final' in locals():
-    figura = crear_grafico_cambio(
-        df=df_final, 
-        flujo=flujo_seleccionado, 
-        orden=orden_seleccionado,
-        n_aeropuertos=n_seleccionado
+    # La figura queda en caché por años, flujo, orden y N (y versión de los datos)
+    figura = figura_en_cache(
+        ('08_cambio', anio_base, anio_final, flujo_seleccionado, orden_seleccionado, n_seleccionado),
+        lambda: crear_grafico_cambio(
+            df=df_final, 
+            flujo=flujo_seleccionado, 
+            orden=orden_seleccionado,
+            n_aeropuertos=n_seleccionado,
+            anio_base=anio_base,
+            anio_final=anio_final
+        ),
+        tablas=TABLAS_HECHOS
     )
 
     if figura:
         st.plotly_chart(figura, use_container_width=True)
     
-if flujo_seleccionado == 'total':
+# Conclusiones del análisis original (solo corresponden a la comparación 2022 vs 2023)
+analisis_original = (anio_base, anio_final) == ('2022', '2023')
+
+if analisis_original and flujo_seleccionado == 'total':
                 
         st.markdown(f"""
                     Los aeropuertos que tuvieron un mayor porcentaje de decrecimiento de pasajeros entre los años 2022 y 2023 fueron:
@@ -209,7 +159,7 @@ if flujo_seleccionado == 'total':
                     + Idaho Falls Regional (-12.45%)
                     """)
         
-elif flujo_seleccionado == 'international':
+elif analisis_original and flujo_seleccionado == 'international':
                 
         st.markdown(f"""
                     Los aeropuertos que tuvieron un mayor porcentaje de crecimiento de pasajeros entre los años 2022 y 2023 fueron:
@@ -223,7 +173,7 @@ elif flujo_seleccionado == 'international':
                     + Kakului Airport (2.34%)
                     """)
     
-elif flujo_seleccionado == 'domestic':
+elif analisis_original and flujo_seleccionado == 'domestic':
                 
         st.markdown(f"""
                     Los aeropuertos que tuvieron un mayor porcentaje de crecimiento de pasajeros entre los años 2022 y 2023 fueron:
@@ -241,7 +191,6 @@ elif flujo_seleccionado == 'domestic':
     # Opcional: Mostrar los datos para debug
     # st.subheader("Datos de Cambio Porcentual")
     # st.dataframe(df_final[['airport', '2022_' + flujo_seleccionado, '2023_' + flujo_seleccionado, 'cambio_' + flujo_seleccionado + '_pct']].head(20))
-else:
-    st.warning("El DataFrame 'df_final' no está cargado. Asegúrate de que la conexión a Supabase se ejecuta primero.")
-
 
+# Panel de rendimiento (oculto salvo con ?perf=1 o AIRPORTS_PERF_PANEL=1)
+panel_rendimiento()
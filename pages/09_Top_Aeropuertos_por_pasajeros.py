@@ -1,5 +1,9 @@
 import streamlit as st
-from utils.database import obtener_datos
+from utils.aeropuertos import obtener_hechos_aeropuertos, TABLAS_HECHOS
+from utils.figuras import figura_en_cache
+from utils.formato_largo import anios_pivotados
+from utils.rankings import top_n_aeropuertos
+from utils.rendimiento import iniciar_ejecucion, panel_rendimiento
 import plotly.express as px # type: ignore
 
 # Configurar la página
@@ -10,6 +14,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Etapas de esta ejecución para el panel de rendimiento
+iniciar_ejecucion()
+
 # Título principal
 st.title("✈️ Análisis exploratorio de tráfico aéreo en EE.UU 2022-2023")
 st.markdown("---")
@@ -18,64 +25,14 @@ st.markdown("---")
 st.subheader("Aeropuertos con mayor y menor cantidad de pasajeros")
 st.markdown("---")
 
-#Crear tabla final 
-
-# 1. Extrael tablas de la base de datos
-Tabla_Total = 'total' 
-Tabla_Domestic = 'domestic'
-Tabla_airports = 'airports'
-Tabla_international = 'international'
-
-# 2. Llama a la función para obtener la tabla completa como un DataFrame
-
-df_total = obtener_datos(Tabla_Total)
-df_domestic = obtener_datos(Tabla_Domestic)
-df_airports = obtener_datos(Tabla_airports)
-df_international = obtener_datos(Tabla_international)
-
-# Convertir la columna 'airport' a string (texto) en df_total
-df_total['airport'] = df_total['airport'].astype(str)
-
-# Convertir la columna 'airport' a string (texto) en df_domestic
-df_domestic['airport'] = df_domestic['airport'].astype(str)
-
-# Convertir la columna 'airport' a string (texto) en df_international
-df_international['airport'] = df_international['airport'].astype(str)
-
-df_airports['iata_code'] = df_airports['iata_code'].astype(str)
-
-# --- Paso 2: Ejecutar el Join/Merge de forma segura ---
-
-KEY_COL = 'airport' 
+# Tabla de hechos de aeropuertos compartida por las páginas (ver utils/aeropuertos.py):
+# total, domestic, international y airports unidas por 'airport_id', con una columna
+# '<año>_<flujo>' por cada año con datos, ya calculadas y en caché.
+df_final = obtener_hechos_aeropuertos()
 
-# 1. Seleccionar las últimas 2 columnas de df_domestic y df_international
-df2_extra = df_domestic.iloc[:, -2:]
-df3_extra = df_international.iloc[:, -2:]
-df4_extra = df_airports[['iata_code']]
-
-# 2. Establecer la columna clave como índice en los DataFrames que se van a unir
-# Esto es necesario para usar .join()
-df2_extra = df2_extra.set_index(df_domestic[KEY_COL])
-df3_extra = df3_extra.set_index(df_international[KEY_COL])
-df4_extra = df4_extra.set_index(df_airports[KEY_COL])
-
-
-# 3. Unir (Join) usando la columna clave ya unificada
-df_final = df_total.join(
-    df2_extra, 
-    on=KEY_COL, 
-    how='left'
-).join(
-    df3_extra, 
-    on=KEY_COL, 
-    how='left'
-).join(
-    df4_extra,
-    on=KEY_COL,
-    how='left'
-)
-
-df_final.rename(columns={'2023_enplaned_passengers_total': '2023_total','2022_enplaned_passengers_total': '2022_total','2023_enplaned_passengers_dom': '2023_domestic','2022_enplaned_passengers_dom': '2022_domestic','2023_enplaned_passengers_inter': '2023_international','2022_enplaned_passengers_inter': '2022_international'}, inplace=True)
+if df_final.empty:
+    st.error("❌ No se pudieron cargar los datos. Verifica la conexión a la base de datos.")
+    st.stop()
 
 def crear_grafico_dinamico(df, anio, flujo, orden, n_aeropuertos):
     """
@@ -91,17 +48,16 @@ def crear_grafico_dinamico(df, anio, flujo, orden, n_aeropuertos):
         st.error(f"Error: La columna '{nombre_columna_datos}' no se encontró en el DataFrame.")
         return None
 
-    # 2. ORDENAR Y SELECCIONAR DATOS
-    # Ordenar los datos
-    if orden == 'Mayor Flujo (Top N)':
-        # Orden descendente para el TOP N
-        df_ordenado = df.sort_values(by=nombre_columna_datos, ascending=False)
-    else: # Menor Flujo (Bottom N)
-        # Orden ascendente para el BOTTOM N
-        df_ordenado = df.sort_values(by=nombre_columna_datos, ascending=True)
-
-    # Seleccionar los Top/Bottom N
-    df_top_n = df_ordenado.head(n_aeropuertos).copy()
+    # 2. SELECCIONAR LOS TOP/BOTTOM N
+    # Se toman las primeras posiciones del orden precalculado de la columna (ver utils/rankings.py)
+    # en lugar de ordenar todo el DataFrame en cada cambio de los selectores.
+    df_top_n = top_n_aeropuertos(
+        df,
+        nombre_columna_datos,
+        n_aeropuertos,
+        # Descendente para el TOP N, ascendente para el BOTTOM N
+        descendente=(orden == 'Mayor Flujo (Top N)')
+    )
     
     # 3. GENERAR EL GRÁFICO CON PLOTLY
     
@@ -131,10 +87,10 @@ if 'df_final' in locals(): # Verifica que el DataFrame esté cargado
     # --- 1. Definir los Selectores en el Sidebar ---
     st.sidebar.header("Opciones de Visualización")
     
-    # Selector de Año
+    # Selector de Año (los años de la tabla de hechos, del más reciente al más antiguo)
     anio_seleccionado = st.sidebar.selectbox(
         "Selecciona el Año:",
-        options=['2023', '2022']
+        options=anios_pivotados(df_final.columns)
     )
     
     # Selector de Flujo (Nacional, Internacional, Total)
@@ -161,12 +117,17 @@ if 'df_final' in locals(): # Verifica que el DataFrame esté cargado
     # --- 2. Generar y Mostrar el Gráfico ---
     
     # Llamar a la función con los valores seleccionados
-    figura = crear_grafico_dinamico(
-        df=df_final, 
-        anio=anio_seleccionado, 
-        flujo=flujo_seleccionado, 
-        orden=orden_seleccionado,
-        n_aeropuertos=n_seleccionado
+    # La figura queda en caché por año, flujo, orden y N (y versión de los datos)
+    figura = figura_en_cache(
+        ('09_top', anio_seleccionado, flujo_seleccionado, orden_seleccionado, n_seleccionado),
+        lambda: crear_grafico_dinamico(
+            df=df_final, 
+            anio=anio_seleccionado, 
+            flujo=flujo_seleccionado, 
+            orden=orden_seleccionado,
+            n_aeropuertos=n_seleccionado
+        ),
+        tablas=TABLAS_HECHOS
     )
 
     # Mostrar el gráfico si se generó correctamente
@@ -264,4 +225,7 @@ elif anio_seleccionado == '2022':
                     + Brownsville South Padre Island International. (126.554)
                     + Meadows FIeld. (140.884)
                     + Great Falls International. (141.048)
-                    """)
\ No newline at end of file
+                    """)
+
+# Panel de rendimiento (oculto salvo con ?perf=1 o AIRPORTS_PERF_PANEL=1)
+panel_rendimiento()
@@ -1,7 +1,13 @@
 import streamlit as st
-from utils.database import obtener_datos
+from utils.database import obtener_datos, versiones_tablas
+from utils.comparativa import COLUMNAS_COMPARATIVA, preparar_comparativa
+from utils.estadisticas import tabla_estadisticas
+from utils.histogramas import calcular_histograma, barras_histograma
+from utils.figuras import figura_en_cache
+from utils.rendimiento import cache_medido, iniciar_ejecucion, panel_rendimiento
 import pandas as pd
 import plotly.express as px # type: ignore
+import plotly.graph_objects as go
 
 # Configurar la página
 st.set_page_config(
@@ -11,81 +17,48 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Etapas de esta ejecución para el panel de rendimiento
+iniciar_ejecucion()
+
 # Título principal
 st.title("✈️ Análisis Exploratorio de Tráfico Aéreo Global 2022-2023")
 st.markdown("---")
 
-@st.cache_data
-def load_and_process_data():
-    """Carga los datos de la tabla 'total', renombra las columnas y prepara los datos."""
+# La versión de 'total' forma parte de la clave: la comparativa se vuelve a preparar cuando cambia la tabla
+@cache_medido(st.cache_data, max_entries=4)
+def load_and_process_data(versiones):
+    """Carga los datos de la tabla 'total' y prepara la comparativa (ver utils/comparativa.py)."""
     
-    df = obtener_datos('total')
+    df = obtener_datos('total', columnas=COLUMNAS_COMPARATIVA)
 
     if df.empty:
         st.warning("No se pudieron cargar los datos de la tabla 'total'. Asegúrate de que Supabase está configurado correctamente.")
         return pd.DataFrame(), pd.DataFrame()
 
-    # Nombres de las columnas según tu base de datos
-    COL_PASAJEROS_2023 = '2023_enplaned_passengers_total'
-    COL_PASAJEROS_2022 = '2022_enplaned_passengers_total'
-    COL_CRECIMIENTO = 'percentage_change_2022_2023_total'
-    
-    # 1. Asegurar que las columnas sean numéricas
-    df[COL_PASAJEROS_2023] = pd.to_numeric(df[COL_PASAJEROS_2023], errors='coerce')
-    df[COL_PASAJEROS_2022] = pd.to_numeric(df[COL_PASAJEROS_2022], errors='coerce')
-    df[COL_CRECIMIENTO] = pd.to_numeric(df[COL_CRECIMIENTO], errors='coerce')
-
-    # 2. Renombrar columnas
-    df = df.rename(columns={
-        '2023_rank_total': 'Ranking 2023',
-        '2022_rank_total': 'Ranking 2022',
-        COL_PASAJEROS_2023: 'Pasajeros 2023',
-        COL_PASAJEROS_2022: 'Pasajeros 2022',
-        COL_CRECIMIENTO: 'Crecimiento (%)',
-        'airport': 'Aeropuerto',
-    })
-    
-    # 3. Eliminar filas con valores nulos para los cálculos clave
-    df.dropna(subset=['Pasajeros 2023', 'Pasajeros 2022', 'Crecimiento (%)', 'Ranking 2023', 'Ranking 2022'], inplace=True)
-
-    # 4. Cálculos Adicionales
-    df['Diferencia Pasajeros'] = df['Pasajeros 2023'] - df['Pasajeros 2022']
-    df['Cambio Ranking'] = df['Ranking 2022'] - df['Ranking 2023'] 
-    
-    # Seleccionar y reordenar columnas finales (mostrando solo el Top 20)
-    cols_finales = ['Aeropuerto', 'Ranking 2023', 'Pasajeros 2023', 'Pasajeros 2022', 
-                    'Cambio Ranking', 'Diferencia Pasajeros', 'Crecimiento (%)']
-    
-    # df_top_20 es el DataFrame filtrado para el Top 20.
-    df_top_20 = df[df['Ranking 2023'] <= 20].sort_values(by='Ranking 2023')[cols_finales]
-
-    # df_completo es el DataFrame completo, aunque ya no lo usaremos para estadísticas.
-    return df_top_20, df 
+    # df_top_20 es el DataFrame filtrado para el Top 20; df_completo es la tabla completa
+    return preparar_comparativa(df, top=20)
 
-df_top_20, df_completo = load_and_process_data() 
+df_top_20, df_completo = load_and_process_data(versiones_tablas(['total']))
 
 # --- 2. Funciones para Estadísticas Descriptivas ---
 
-def calcular_estadisticas_avanzadas(series):
-    """Calcula la asimetría, curtosis y coeficiente de variación."""
-    mean = series.mean()
-    std = series.std()
-    
-    stats = {
-        'Asimetría': series.skew(),
-        'Curtosis': series.kurtosis(),
-        'Coeficiente de Variación': (std / mean) * 100 if mean != 0 else 0
-    }
-    return pd.Series(stats)
+def crear_histograma(serie, intervalos, titulo, etiqueta_x, color=None, formato=',.0f'):
+    """Histograma agrupado con NumPy: al navegador solo llega un dato por intervalo."""
+    conteos, bordes = calcular_histograma(serie, intervalos)
+    fig = go.Figure(barras_histograma(conteos, bordes, separacion=0.1, formato=formato, marker_color=color))
+    fig.update_layout(title=titulo, xaxis_title=etiqueta_x, yaxis_title='count')
+    return fig
 
+@cache_medido(st.cache_data)
 def generar_tabla_estadisticas(df):
     """Genera una tabla de estadísticas descriptivas unificada con formato."""
     
     cols_calc = ['Pasajeros 2023', 'Pasajeros 2022', 'Diferencia Pasajeros', 'Crecimiento (%)']
 
-    stats_std = df[cols_calc].describe().T.drop(columns=['count'])
-    stats_adv = df[cols_calc].apply(calcular_estadisticas_avanzadas).T
-    stats_df = pd.concat([stats_std, stats_adv], axis=1)
+    # Media, desviación, cuartiles, asimetría, curtosis y CV de las cuatro columnas en una sola pasada
+    stats_df = tabla_estadisticas(df, cols_calc).drop(columns=['count'])
+    # Los valores se reemplazan por texto con formato
+    stats_df = stats_df.astype(object)
 
     idx_rename = {
         'Pasajeros 2023': 'Pasajeros Totales (2023)',
@@ -160,42 +133,51 @@ if not df_top_20.empty:
     st.markdown("Los histogramas muestran cómo se agrupan y se distribuyen la cantidad de pasajeros en los años 2022 y 2023 y del cambio porcentual de los pasajeros **pertenecientes al Top 20 de aeropuertos con mayor cantidad de pasajeros**.")
 
 
+    # Las figuras de esta página no tienen parámetros: quedan en caché hasta que cambie la tabla 'total'
+
     # Histograma 2: Pasajeros 2022
-    fig_hist_2022 = px.histogram(
-        df_top_20, 
-        x='Pasajeros 2022', 
-        nbins=10, 
-        title='Frecuencia de Pasajeros Totales (2022) - Top 20',
-        labels={'Pasajeros 2022': 'Pasajeros Totales (2022)'}
+    fig_hist_2022 = figura_en_cache(
+        ('10_hist_2022',),
+        lambda: crear_histograma(
+            df_top_20['Pasajeros 2022'],
+            10,
+            'Frecuencia de Pasajeros Totales (2022) - Top 20',
+            'Pasajeros Totales (2022)'
+        ),
+        tablas=['total']
     )
-    fig_hist_2022.update_layout(bargap=0.1)
     st.plotly_chart(fig_hist_2022, use_container_width=True)
     st.write("""Respaldando lo mostrado en las estadísticas descriptivas es fácilmente visible la distribución de los datos además de observar que 7 de los 20 aeropuertos en el ranking tienen de entre 20 y 25 millones de pasajeros en el año 2022 y con un solo aeropuerto entre los 45 y 50 millones de aeropuertos como un valor muy alejado y atípico.
 """)
 
 # Histograma 1: Pasajeros 2023
-    fig_hist_2023 = px.histogram(
-        df_top_20, 
-        x='Pasajeros 2023', 
-        nbins=10, 
-        title='Frecuencia de Pasajeros Totales (2023)  - Top 20',
-        labels={'Pasajeros 2023': 'Pasajeros Totales (2023)'}
+    fig_hist_2023 = figura_en_cache(
+        ('10_hist_2023',),
+        lambda: crear_histograma(
+            df_top_20['Pasajeros 2023'],
+            10,
+            'Frecuencia de Pasajeros Totales (2023)  - Top 20',
+            'Pasajeros Totales (2023)'
+        ),
+        tablas=['total']
     )
-    fig_hist_2023.update_layout(bargap=0.1)
     st.plotly_chart(fig_hist_2023, use_container_width=True)
     st.write("""En el presente histograma de frecuencia se respalda los valores de las estadísticas descriptivas en donde se puede apreciar fácilmente la distribución de los datos en donde hay mayor frecuencia de aeropuertos  con cantidades de personas entre 20 y 25 millones de pasajeros y solo un aeropuerto cuenta con una cantidad de pasajeros de entre 50 y 55 millones.
 """)
 
     # Histograma 3: Crecimiento Porcentual
-    fig_hist_crecimiento = px.histogram(
-        df_top_20, 
-        x='Crecimiento (%)', 
-        nbins=50, 
-        title='Frecuencia del Cambio Porcentual de Pasajeros (2022-2023) - Top 20',
-        labels={'Crecimiento (%)': 'Crecimiento Porcentual (%)'},
-        color_discrete_sequence=['#00CC96']
+    fig_hist_crecimiento = figura_en_cache(
+        ('10_hist_crecimiento',),
+        lambda: crear_histograma(
+            df_top_20['Crecimiento (%)'],
+            50,
+            'Frecuencia del Cambio Porcentual de Pasajeros (2022-2023) - Top 20',
+            'Crecimiento Porcentual (%)',
+            color='#00CC96',
+            formato='.2f'
+        ),
+        tablas=['total']
     )
-    fig_hist_crecimiento.update_layout(bargap=0.1)
     st.plotly_chart(fig_hist_crecimiento, use_container_width=True)
     st.write("""Nuevamente se es fácilmente evidenciable lo visto en las estadísticas descriptivas y se puede apreciar visualmente que dentro el cambio porcentual de la cantidad de pasajeros hay una alta concentración de frecuencias entorno a la media de 11,74% además se pueden ver dos valores atípicos ambos en extremos opuestos de la distribución siendo los aeropuertos que más y menos crecieron respecto al año 2022.
 """)
@@ -220,15 +202,19 @@ if not df_top_20.empty:
     # 3.5. Visualización: Gráfico de Dispersión
     st.markdown("### Visualización: Crecimiento Porcentual vs. Pasajeros Totales (2023)")
     
-    fig_scatter = px.scatter(
-        df_top_20,
-        x='Pasajeros 2023',
-        y='Crecimiento (%)',
-        size='Pasajeros 2023',
-        color='Aeropuerto',
-        hover_name='Aeropuerto',
-        title='Pasajeros y Crecimiento de los Top 20 Aeropuertos',
-        labels={'Pasajeros 2023': 'Pasajeros Totales 2023', 'Crecimiento (%)': 'Crecimiento Porcentual (%)'},
+    fig_scatter = figura_en_cache(
+        ('10_dispersion',),
+        lambda: px.scatter(
+            df_top_20,
+            x='Pasajeros 2023',
+            y='Crecimiento (%)',
+            size='Pasajeros 2023',
+            color='Aeropuerto',
+            hover_name='Aeropuerto',
+            title='Pasajeros y Crecimiento de los Top 20 Aeropuertos',
+            labels={'Pasajeros 2023': 'Pasajeros Totales 2023', 'Crecimiento (%)': 'Crecimiento Porcentual (%)'},
+        ),
+        tablas=['total']
     )
     
     st.plotly_chart(fig_scatter, use_container_width=True)
@@ -238,3 +224,6 @@ A la derecha del grafico se tiene la leyenda con el ranking de aeropuertos orden
 
 else:
     st.error("No se encontraron datos para generar la comparativa o la carga de datos falló.")
+
+# Panel de rendimiento (oculto salvo con ?perf=1 o AIRPORTS_PERF_PANEL=1)
+panel_rendimiento()
@@ -0,0 +1,146 @@
+import streamlit as st
+import pandas as pd
+from utils.database import obtener_datos
+from utils.figuras import figura_en_cache
+from utils.mensual import aeropuertos_mensuales, obtener_serie_mensual, perfil_estacional, version_mensual
+from utils.rendimiento import iniciar_ejecucion, panel_rendimiento
+import plotly.express as px # type: ignore
+
+# Configurar la página
+st.set_page_config(
+    page_title="Estacionalidad mensual de pasajeros",
+    page_icon="📅",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Etapas de esta ejecución para el panel de rendimiento
+iniciar_ejecucion()
+
+# Título principal
+st.title("📅 Estacionalidad Mensual de Pasajeros")
+st.markdown("---")
+st.markdown(
+    "Pasajeros embarcados por mes, acumulado de los últimos 12 meses y cambio interanual de cada mes, "
+    "para comparar la estacionalidad del flujo doméstico y del internacional."
+)
+
+# Versión del almacén mensual (cambia al cargar o corregir un mes)
+version = version_mensual()
+
+if not version:
+    st.info("""
+    Todavía no hay datos mensuales cargados. Para cargarlos (CSV o Parquet con las columnas
+    `airport_id`, `year`, `month`, `domestic` e `international`):
+
+    ```bash
+    python -m utils.mensual datos_mensuales.csv
+    ```
+
+    Para probar la página con datos sintéticos: `python -m utils.mensual --sintetico 1000`
+    """)
+    st.stop()
+
+# Nombres de los aeropuertos para el selector
+aeropuertos = obtener_datos('airports', columnas=['airport', 'iata_code'])
+nombres = {}
+if not aeropuertos.empty:
+    nombres = dict(zip(aeropuertos['id'], aeropuertos['iata_code'].astype(str) + " · " + aeropuertos['airport'].astype(str)))
+
+# --- Selectores ---
+st.sidebar.header("🔧 Configuración")
+
+aeropuerto_seleccionado = st.sidebar.selectbox(
+    "Aeropuerto:",
+    options=[None] + aeropuertos_mensuales(),
+    format_func=lambda x: "Todos los aeropuertos" if x is None else nombres.get(x, f"Aeropuerto {x}"),
+    help="Escribe para buscar por código IATA o nombre"
+)
+
+flujos_seleccionados = st.sidebar.multiselect(
+    "Flujos:",
+    options=['domestic', 'international', 'total'],
+    default=['domestic', 'international'],
+    format_func=lambda x: x.capitalize()
+)
+
+if not flujos_seleccionados:
+    st.warning("Selecciona al menos un flujo.")
+    st.stop()
+
+# Serie mensual del aeropuerto (o de todos), en caché hasta que cambie el almacén
+serie = obtener_serie_mensual(aeropuerto_seleccionado)
+serie = serie[serie['flow'].isin(flujos_seleccionados)].copy()
+
+if serie.empty:
+    st.warning("No hay datos mensuales para el aeropuerto y los flujos seleccionados.")
+    st.stop()
+
+serie['mes'] = pd.to_datetime(dict(year=serie['year'], month=serie['month'], day=1))
+serie['flow'] = serie['flow'].astype(str)
+
+# Resumen del último mes cargado
+ultimo = serie[serie['mes'] == serie['mes'].max()]
+st.subheader(f"📊 Último mes: {ultimo['mes'].iloc[0]:%m/%Y}")
+columnas = st.columns(len(ultimo))
+for columna, (_, fila) in zip(columnas, ultimo.iterrows()):
+    with columna:
+        st.metric(
+            f"Pasajeros {fila['flow'].capitalize()}",
+            f"{fila['passengers']:,.0f}",
+            delta=None if pd.isna(fila['yoy_pct']) else f"{fila['yoy_pct']:.2f}% interanual"
+        )
+        st.caption(f"Últimos 12 meses: {fila['ttm']:,.0f}" + ("" if fila['ttm_completo'] else " (menos de 12 meses cargados)"))
+
+st.markdown("---")
+
+def crear_graficos(serie):
+    """
+    Gráficos de la serie mensual: pasajeros por mes, acumulado de 12 meses (solo los
+    meses con la ventana completa), cambio interanual por mes e índice estacional.
+    """
+    etiquetas = {'mes': 'Mes', 'flow': 'Flujo', 'passengers': 'Pasajeros', 'ttm': 'Pasajeros (12 meses)',
+                 'yoy_pct': 'Cambio interanual (%)', 'month': 'Mes', 'indice': 'Índice estacional'}
+
+    fig_mensual = px.line(serie, x='mes', y='passengers', color='flow', markers=True, labels=etiquetas,
+                          title='Pasajeros Embarcados por Mes')
+
+    fig_ttm = px.line(serie[serie['ttm_completo']], x='mes', y='ttm', color='flow', labels=etiquetas,
+                      title='Acumulado de los Últimos 12 Meses')
+
+    fig_yoy = px.bar(serie.dropna(subset=['yoy_pct']), x='mes', y='yoy_pct', color='flow', barmode='group',
+                     labels=etiquetas, title='Cambio Interanual por Mes (vs. el mismo mes del año anterior)')
+
+    perfil = perfil_estacional(serie)
+    perfil['flow'] = perfil['flow'].astype(str)
+    fig_perfil = px.line(perfil, x='month', y='indice', color='flow', markers=True, labels=etiquetas,
+                         title='Índice Estacional (100 = mes promedio)')
+    fig_perfil.update_xaxes(tickmode='array', tickvals=list(range(1, 13)),
+                            ticktext=['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic'])
+    fig_perfil.add_hline(y=100, line_dash='dash', line_color='gray')
+
+    return {'mensual': fig_mensual, 'ttm': fig_ttm, 'yoy': fig_yoy, 'perfil': fig_perfil}
+
+# Las figuras quedan en caché por aeropuerto y flujos (y versión del almacén mensual)
+graficos = figura_en_cache(
+    ('12_mensual', aeropuerto_seleccionado, tuple(flujos_seleccionados), version),
+    lambda: crear_graficos(serie)
+)
+
+st.plotly_chart(graficos['mensual'], use_container_width=True)
+
+col1, col2 = st.columns(2)
+with col1:
+    st.plotly_chart(graficos['ttm'], use_container_width=True)
+with col2:
+    st.plotly_chart(graficos['yoy'], use_container_width=True)
+
+st.subheader("🗓️ Estacionalidad")
+st.markdown(
+    "Pasajeros medios de cada mes del calendario respecto del promedio mensual. Un flujo con picos "
+    "más marcados necesita más personal en esos meses y menos en el resto del año."
+)
+st.plotly_chart(graficos['perfil'], use_container_width=True)
+
+# Panel de rendimiento (oculto salvo con ?perf=1 o AIRPORTS_PERF_PANEL=1)
+panel_rendimiento()
@@ -1,9 +1,16 @@
 import streamlit as st
-from utils.database import obtener_datos
+from utils.aeropuertos import TIPOS_DE_FLUJO, obtener_anios
+from utils.database import obtener_varias_tablas
+from utils.estadisticas import tabla_estadisticas, cuantiles_qq
+from utils.histogramas import REGLAS_INTERVALOS, calcular_histograma, barras_histograma, eje_logaritmico
+from utils.figuras import figura_en_cache
+from utils.formato_largo import PATRON_COLUMNA, columna_pasajeros
+from utils.rendimiento import cache_medido, iniciar_ejecucion, panel_rendimiento
 import plotly.express as px
 import plotly.graph_objects as go
 from scipy import stats
 import numpy as np
+import pandas as pd
 
 # Configurar la página
 st.set_page_config(
@@ -13,27 +20,42 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Etapas de esta ejecución para el panel de rendimiento
+iniciar_ejecucion()
+
 # Título principal
 st.title("📊 Estadísticas Descriptivas de Pasajeros por Aeropuerto")
 st.markdown("---")
 st.markdown("Análisis estadístico del número de pasajeros en aeropuertos de EE.UU. para los años 2022 y 2023")
 
+# Columnas de pasajeros de cada tipo de flujo, una por año con datos (del más reciente al más antiguo)
+COLUMNAS_PASAJEROS = {
+    flujo: [columna_pasajeros(anio, flujo) for anio in obtener_anios()]
+    for flujo in TIPOS_DE_FLUJO
+}
+
+def anio_de_columna(columna):
+    """
+    Año de una columna de pasajeros (por ejemplo '2023' de '2023_enplaned_passengers_dom').
+    """
+    return PATRON_COLUMNA.match(columna).group(1)
+
 # Obtener datos
 with st.spinner("Cargando datos..."):
-    df_total = obtener_datos('total')
-    df_domestic = obtener_datos('domestic')
-    df_international = obtener_datos('international')
+    # Solo se piden el nombre del aeropuerto y los pasajeros de cada año
+    tablas = obtener_varias_tablas(
+        TIPOS_DE_FLUJO,
+        columnas={flujo: ['airport'] + columnas for flujo, columnas in COLUMNAS_PASAJEROS.items()}
+    )
+    df_total = tablas['total']
+    df_domestic = tablas['domestic']
+    df_international = tablas['international']
 
 # Verificar que los datos se cargaron correctamente
 if df_total.empty or df_domestic.empty or df_international.empty:
     st.error("❌ No se pudieron cargar los datos. Verifica la conexión a la base de datos.")
     st.stop()
 
-# Convertir columnas a string para evitar errores
-df_total['airport'] = df_total['airport'].astype(str)
-df_domestic['airport'] = df_domestic['airport'].astype(str)
-df_international['airport'] = df_international['airport'].astype(str)
-
 # Sidebar para selección de tipo de flujo
 st.sidebar.header("🔧 Configuración del Análisis")
 
@@ -44,37 +66,45 @@ tipo_flujo = st.sidebar.selectbox(
     help="Selecciona si quieres analizar el flujo total, doméstico o internacional"
 )
 
+regla_intervalos = st.sidebar.selectbox(
+    "Intervalos de los histogramas:",
+    options=list(REGLAS_INTERVALOS),
+    format_func=lambda x: REGLAS_INTERVALOS[x],
+    help="Regla para agrupar los pasajeros en intervalos. La logarítmica distingue mejor los aeropuertos pequeños"
+)
+
 # Función para calcular estadísticas descriptivas
-def calcular_estadisticas_descriptivas(df, columnas_pasajeros, tipo_flujo):
+@cache_medido(st.cache_data, show_spinner=False)
+def calcular_estadisticas_descriptivas(df_total, df_domestic, df_international):
     """
-    Calcula estadísticas descriptivas para las columnas de pasajeros especificadas
+    Calcula las estadísticas descriptivas de las columnas de pasajeros de todos los
+    flujos y años en una sola pasada vectorizada (ver utils.estadisticas).
+    Se ignoran los valores nulos y negativos. El resultado queda en caché, así que
+    cambiar de flujo en la barra lateral solo consulta la tabla ya calculada.
+
+    Returns:
+        dict: Estadísticas de cada columna de pasajeros con al menos un valor válido
     """
-    estadisticas = {}
-    
-    for col in columnas_pasajeros:
-        if col in df.columns:
-            # Filtrar valores nulos y negativos
-            datos_limpios = df[col].dropna()
-            datos_limpios = datos_limpios[datos_limpios >= 0]
-            
-            if len(datos_limpios) > 0:
-                estadisticas[col] = {
-                    'count': len(datos_limpios),
-                    'mean': datos_limpios.mean(),
-                    'median': datos_limpios.median(),
-                    'std': datos_limpios.std(),
-                    'min': datos_limpios.min(),
-                    'max': datos_limpios.max(),
-                    'q25': datos_limpios.quantile(0.25),
-                    'q75': datos_limpios.quantile(0.75),
-                    'skewness': datos_limpios.skew(),
-                    'kurtosis': datos_limpios.kurtosis()
-                }
-    
-    return estadisticas
+    tablas = {'total': df_total, 'domestic': df_domestic, 'international': df_international}
+
+    # Columnas de distinto largo: se alinean por posición y se rellenan con NaN
+    df_pasajeros = pd.concat(
+        [tablas[flujo][columnas].reset_index(drop=True) for flujo, columnas in COLUMNAS_PASAJEROS.items()],
+        axis=1
+    )
+    resultado = tabla_estadisticas(df_pasajeros, solo_no_negativos=True)
+    return resultado[resultado['count'] > 0].to_dict('index')
+
+@cache_medido(st.cache_data, show_spinner=False)
+def calcular_cuantiles_qq(datos):
+    """
+    Cuantiles del gráfico Q-Q de una columna, sobre una grilla de tamaño fijo
+    (ver utils.estadisticas.cuantiles_qq). Quedan en caché entre reruns.
+    """
+    return cuantiles_qq(datos.to_numpy())
 
 # Función para crear visualizaciones
-def crear_visualizaciones(df, columnas_pasajeros, tipo_flujo):
+def crear_visualizaciones(df, columnas_pasajeros, tipo_flujo, regla_intervalos='fd'):
     """
     Crea visualizaciones para las estadísticas descriptivas
     """
@@ -87,24 +117,23 @@ def crear_visualizaciones(df, columnas_pasajeros, tipo_flujo):
             datos_limpios = datos_limpios[datos_limpios >= 0]
             
             if len(datos_limpios) > 0:
-                # Histograma
-                año = "2023" if "2023" in col else "2022"
-                fig_hist = px.histogram(
-                    x=datos_limpios,
-                    nbins=50,
-                    title=f'Distribución de Pasajeros Embarcados en {año}',
-                    labels={'x': 'Pasajeros Embarcados', 'y': 'Frecuencia'},
-                    color_discrete_sequence=['#1f77b4']
-                )
+                # Histograma (agrupado aquí: al navegador solo llega un dato por intervalo)
+                año = anio_de_columna(col)
+                conteos, bordes = calcular_histograma(datos_limpios, regla_intervalos)
+                escala_log = regla_intervalos == 'log' and bordes[0] > 0
+                fig_hist = go.Figure(barras_histograma(conteos, bordes, escala_log=escala_log, marker_color='#1f77b4'))
                 fig_hist.update_layout(
+                    title=f'Distribución de Pasajeros Embarcados en {año}',
                     xaxis_title='Pasajeros Embarcados',
                     yaxis_title='Frecuencia',
                     showlegend=False
                 )
+                if escala_log:
+                    fig_hist.update_xaxes(**eje_logaritmico(bordes))
                 visualizaciones[f'hist_{col}'] = fig_hist
                 
                 # Box plot
-                año = "2023" if "2023" in col else "2022"
+                año = anio_de_columna(col)
                 fig_box = px.box(
                     y=datos_limpios,
                     title=f'Box Plot de Pasajeros Embarcados en {año}',
@@ -119,13 +148,8 @@ def crear_visualizaciones(df, columnas_pasajeros, tipo_flujo):
                 
                 fig_qq = go.Figure()
                 
-                # Calcular percentiles teóricos y muestrales
-                n = len(datos_limpios)
-                percentiles_teoricos = np.linspace(0.01, 0.99, n)
-                percentiles_muestrales = np.percentile(datos_limpios, percentiles_teoricos * 100)
-                percentiles_normales = stats.norm.ppf(percentiles_teoricos, 
-                                                    loc=np.mean(datos_limpios), 
-                                                    scale=np.std(datos_limpios))
+                # Calcular percentiles teóricos y muestrales (grilla fija, no un punto por aeropuerto)
+                percentiles_normales, percentiles_muestrales = calcular_cuantiles_qq(datos_limpios)
                 
                 # Agregar línea de referencia (distribución normal)
                 fig_qq.add_trace(go.Scatter(
@@ -156,14 +180,12 @@ def crear_visualizaciones(df, columnas_pasajeros, tipo_flujo):
                 visualizaciones[f'qq_{col}'] = fig_qq
                 
                 # Gráfica de Curtosis (Histograma con curva normal superpuesta)
-                fig_kurt = px.histogram(
-                    x=datos_limpios,
-                    nbins=50,
-                    title=f'Análisis de Curtosis - Distribución vs Normal en {año}',
-                    labels={'x': 'Pasajeros Embarcados', 'y': 'Densidad'},
-                    color_discrete_sequence=['#9b59b6'],
-                    histnorm='probability density'
-                )
+                # La curva normal se compara en escala lineal: con la regla logarítmica se usa Freedman–Diaconis
+                if regla_intervalos == 'log':
+                    conteos, bordes = calcular_histograma(datos_limpios, 'fd')
+                fig_kurt = go.Figure(barras_histograma(
+                    conteos, bordes, densidad=True, marker_color='#9b59b6', name='Densidad', showlegend=False
+                ))
                 
                 # Agregar curva normal teórica
                 x_range = np.linspace(datos_limpios.min(), datos_limpios.max(), 100)
@@ -180,6 +202,7 @@ def crear_visualizaciones(df, columnas_pasajeros, tipo_flujo):
                 ))
                 
                 fig_kurt.update_layout(
+                    title=f'Análisis de Curtosis - Distribución vs Normal en {año}',
                     xaxis_title='Pasajeros Embarcados',
                     yaxis_title='Densidad de Probabilidad',
                     showlegend=True
@@ -189,30 +212,31 @@ def crear_visualizaciones(df, columnas_pasajeros, tipo_flujo):
     return visualizaciones
 
 # Determinar columnas según el tipo de flujo
+columnas_pasajeros = COLUMNAS_PASAJEROS[tipo_flujo]
 if tipo_flujo == 'total':
     df_analisis = df_total
-    columnas_pasajeros = ['2023_enplaned_passengers_total', '2022_enplaned_passengers_total']
     titulo_analisis = "Total de Pasajeros"
 elif tipo_flujo == 'domestic':
     df_analisis = df_domestic
-    columnas_pasajeros = ['2023_enplaned_passengers_dom', '2022_enplaned_passengers_dom']
     titulo_analisis = "Pasajeros Domésticos"
 else:  # international
     df_analisis = df_international
-    columnas_pasajeros = ['2023_enplaned_passengers_inter', '2022_enplaned_passengers_inter']
     titulo_analisis = "Pasajeros Internacionales"
 
-# Calcular estadísticas descriptivas
-estadisticas = calcular_estadisticas_descriptivas(df_analisis, columnas_pasajeros, tipo_flujo)
+# Estadísticas descriptivas de todos los flujos (calculadas una vez y en caché)
+estadisticas = calcular_estadisticas_descriptivas(df_total, df_domestic, df_international)
 
 # Mostrar resumen general
 st.subheader(f"📈 Resumen General - {titulo_analisis}")
 
 col1, col2, col3, col4 = st.columns(4)
 
-if '2023_enplaned_passengers_total' in estadisticas or '2023_enplaned_passengers_dom' in estadisticas or '2023_enplaned_passengers_inter' in estadisticas:
-    col_2023 = [col for col in columnas_pasajeros if '2023' in col][0]
-    col_2022 = [col for col in columnas_pasajeros if '2022' in col][0]
+# Comparación de los dos años más recientes
+if columnas_pasajeros and columnas_pasajeros[0] in estadisticas:
+    col_final = columnas_pasajeros[0]
+    col_base = columnas_pasajeros[1] if len(columnas_pasajeros) > 1 else None
+    anio_final = anio_de_columna(col_final)
+    anio_base = anio_de_columna(col_base) if col_base else None
     
     with col1:
         st.metric(
@@ -222,31 +246,30 @@ if '2023_enplaned_passengers_total' in estadisticas or '2023_enplaned_passengers
         )
     
     with col2:
-        if col_2023 in estadisticas:
-            total_2023 = df_analisis[col_2023].sum()
-            st.metric(
-                "Total Pasajeros 2023",
-                f"{total_2023:,.0f}",
-                help="Suma total de pasajeros en 2023"
-            )
+        total_final = df_analisis[col_final].sum()
+        st.metric(
+            f"Total Pasajeros {anio_final}",
+            f"{total_final:,.0f}",
+            help=f"Suma total de pasajeros en {anio_final}"
+        )
     
     with col3:
-        if col_2022 in estadisticas:
-            total_2022 = df_analisis[col_2022].sum()
+        if col_base in estadisticas:
+            total_base = df_analisis[col_base].sum()
             st.metric(
-                "Total Pasajeros 2022",
-                f"{total_2022:,.0f}",
-                help="Suma total de pasajeros en 2022"
+                f"Total Pasajeros {anio_base}",
+                f"{total_base:,.0f}",
+                help=f"Suma total de pasajeros en {anio_base}"
             )
     
     with col4:
-        if col_2023 in estadisticas and col_2022 in estadisticas:
-            crecimiento = ((total_2023 - total_2022) / total_2022) * 100
+        if col_base in estadisticas:
+            crecimiento = ((total_final - total_base) / total_base) * 100
             st.metric(
                 "Crecimiento %",
                 f"{crecimiento:.2f}%",
                 delta=f"{crecimiento:.2f}%",
-                help="Porcentaje de crecimiento entre 2022 y 2023"
+                help=f"Porcentaje de crecimiento entre {anio_base} y {anio_final}"
             )
 
 st.markdown("---")
@@ -306,103 +329,16 @@ def crear_metric_card(titulo, valor, descripcion=""):
     </div>
     """
 
-# Crear tabs para cada año
-if len(columnas_pasajeros) == 2:
-    tab_2023, tab_2022 = st.tabs(["📈 2023", "📈 2022"])
-    
-    col_2023 = columnas_pasajeros[0] if "2023" in columnas_pasajeros[0] else columnas_pasajeros[1]
-    col_2022 = columnas_pasajeros[1] if "2023" in columnas_pasajeros[0] else columnas_pasajeros[0]
+# Crear una pestaña por año (del más reciente al más antiguo)
+if columnas_pasajeros:
+    tabs_anios = st.tabs([f"📈 {anio_de_columna(col)}" for col in columnas_pasajeros])
     
-    with tab_2023:
-        if col_2023 in estadisticas:
-            st.markdown("### Estadísticas Descriptivas 2023")
-            
-            # Primera fila de métricas principales
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.markdown(crear_metric_card(
-                    "Media",
-                    f"{estadisticas[col_2023]['mean']:,.0f}",
-                    "Promedio aritmético"
-                ), unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown(crear_metric_card(
-                    "Mediana",
-                    f"{estadisticas[col_2023]['median']:,.0f}",
-                    "Valor central"
-                ), unsafe_allow_html=True)
-            
-            with col3:
-                st.markdown(crear_metric_card(
-                    "Desv. Estándar",
-                    f"{estadisticas[col_2023]['std']:,.0f}",
-                    "Dispersión de datos"
-                ), unsafe_allow_html=True)
-            
-            with col4:
-                st.markdown(crear_metric_card(
-                    "Rango",
-                    f"{estadisticas[col_2023]['max'] - estadisticas[col_2023]['min']:,.0f}",
-                    "Diferencia min-max"
-                ), unsafe_allow_html=True)
-            
-            # Segunda fila de métricas adicionales
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.markdown(crear_metric_card(
-                    "Mínimo",
-                    f"{estadisticas[col_2023]['min']:,.0f}",
-                    "Valor más bajo"
-                ), unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown(crear_metric_card(
-                    "Máximo",
-                    f"{estadisticas[col_2023]['max']:,.0f}",
-                    "Valor más alto"
-                ), unsafe_allow_html=True)
-            
-            with col3:
-                st.markdown(crear_metric_card(
-                    "Q1 (25%)",
-                    f"{estadisticas[col_2023]['q25']:,.0f}",
-                    "Primer cuartil"
-                ), unsafe_allow_html=True)
-            
-            with col4:
-                st.markdown(crear_metric_card(
-                    "Q3 (75%)",
-                    f"{estadisticas[col_2023]['q75']:,.0f}",
-                    "Tercer cuartil"
-                ), unsafe_allow_html=True)
-            
-            # Tercera fila para métricas de forma
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                skew_val = estadisticas[col_2023]['skewness']
-                skew_interpretation = "Sesgada a la derecha" if skew_val > 0.5 else "Sesgada a la izquierda" if skew_val < -0.5 else "Simétrica"
-                st.markdown(crear_metric_card(
-                    "Asimetría",
-                    f"{skew_val:.3f}",
-                    skew_interpretation
-                ), unsafe_allow_html=True)
+    for tab_anio, col in zip(tabs_anios, columnas_pasajeros):
+        with tab_anio:
+            if col not in estadisticas:
+                continue
             
-            with col2:
-                kurt_val = estadisticas[col_2023]['kurtosis']
-                kurt_interpretation = "Más puntiaguda que la normal" if kurt_val > 0 else "Más plana que la normal" if kurt_val < 0 else "Similar a la normal"
-                st.markdown(crear_metric_card(
-                    "Curtosis",
-                    f"{kurt_val:.3f}",
-                    kurt_interpretation
-                ), unsafe_allow_html=True)
-    
-    with tab_2022:
-        if col_2022 in estadisticas:
-            st.markdown("### Estadísticas Descriptivas 2022")
+            st.markdown(f"### Estadísticas Descriptivas {anio_de_columna(col)}")
             
             # Primera fila de métricas principales
             col1, col2, col3, col4 = st.columns(4)
@@ -410,28 +346,28 @@ if len(columnas_pasajeros) == 2:
             with col1:
                 st.markdown(crear_metric_card(
                     "Media",
-                    f"{estadisticas[col_2022]['mean']:,.0f}",
+                    f"{estadisticas[col]['mean']:,.0f}",
                     "Promedio aritmético"
                 ), unsafe_allow_html=True)
             
             with col2:
                 st.markdown(crear_metric_card(
                     "Mediana",
-                    f"{estadisticas[col_2022]['median']:,.0f}",
+                    f"{estadisticas[col]['median']:,.0f}",
                     "Valor central"
                 ), unsafe_allow_html=True)
             
             with col3:
                 st.markdown(crear_metric_card(
                     "Desv. Estándar",
-                    f"{estadisticas[col_2022]['std']:,.0f}",
+                    f"{estadisticas[col]['std']:,.0f}",
                     "Dispersión de datos"
                 ), unsafe_allow_html=True)
             
             with col4:
                 st.markdown(crear_metric_card(
                     "Rango",
-                    f"{estadisticas[col_2022]['max'] - estadisticas[col_2022]['min']:,.0f}",
+                    f"{estadisticas[col]['max'] - estadisticas[col]['min']:,.0f}",
                     "Diferencia min-max"
                 ), unsafe_allow_html=True)
             
@@ -441,28 +377,28 @@ if len(columnas_pasajeros) == 2:
             with col1:
                 st.markdown(crear_metric_card(
                     "Mínimo",
-                    f"{estadisticas[col_2022]['min']:,.0f}",
+                    f"{estadisticas[col]['min']:,.0f}",
                     "Valor más bajo"
                 ), unsafe_allow_html=True)
             
             with col2:
                 st.markdown(crear_metric_card(
                     "Máximo",
-                    f"{estadisticas[col_2022]['max']:,.0f}",
+                    f"{estadisticas[col]['max']:,.0f}",
                     "Valor más alto"
                 ), unsafe_allow_html=True)
             
             with col3:
                 st.markdown(crear_metric_card(
                     "Q1 (25%)",
-                    f"{estadisticas[col_2022]['q25']:,.0f}",
+                    f"{estadisticas[col]['q25']:,.0f}",
                     "Primer cuartil"
                 ), unsafe_allow_html=True)
             
             with col4:
                 st.markdown(crear_metric_card(
                     "Q3 (75%)",
-                    f"{estadisticas[col_2022]['q75']:,.0f}",
+                    f"{estadisticas[col]['q75']:,.0f}",
                     "Tercer cuartil"
                 ), unsafe_allow_html=True)
             
@@ -470,7 +406,7 @@ if len(columnas_pasajeros) == 2:
             col1, col2 = st.columns(2)
             
             with col1:
-                skew_val = estadisticas[col_2022]['skewness']
+                skew_val = estadisticas[col]['skewness']
                 skew_interpretation = "Sesgada a la derecha" if skew_val > 0.5 else "Sesgada a la izquierda" if skew_val < -0.5 else "Simétrica"
                 st.markdown(crear_metric_card(
                     "Asimetría",
@@ -479,7 +415,7 @@ if len(columnas_pasajeros) == 2:
                 ), unsafe_allow_html=True)
             
             with col2:
-                kurt_val = estadisticas[col_2022]['kurtosis']
+                kurt_val = estadisticas[col]['kurtosis']
                 kurt_interpretation = "Más puntiaguda que la normal" if kurt_val > 0 else "Más plana que la normal" if kurt_val < 0 else "Similar a la normal"
                 st.markdown(crear_metric_card(
                     "Curtosis",
@@ -490,20 +426,23 @@ if len(columnas_pasajeros) == 2:
 # Crear visualizaciones
 st.subheader("📈 Visualizaciones")
 
-visualizaciones = crear_visualizaciones(df_analisis, columnas_pasajeros, tipo_flujo)
+# Las figuras quedan en caché por flujo y regla de intervalos (y versión de los datos)
+visualizaciones = figura_en_cache(
+    ('6_visualizaciones', tipo_flujo, regla_intervalos),
+    lambda: crear_visualizaciones(df_analisis, columnas_pasajeros, tipo_flujo, regla_intervalos),
+    tablas=['total', 'domestic', 'international']
+)
 
 # Mostrar histogramas
 st.markdown("### Distribuciones de Frecuencia")
 for col in columnas_pasajeros:
     if f'hist_{col}' in visualizaciones:
-        año = "2023" if "2023" in col else "2022"
         st.plotly_chart(visualizaciones[f'hist_{col}'], use_container_width=True)
 
 # Mostrar box plots
 st.markdown("### Análisis de Cajas (Box Plots)")
 for col in columnas_pasajeros:
     if f'box_{col}' in visualizaciones:
-        año = "2023" if "2023" in col else "2022"
         st.plotly_chart(visualizaciones[f'box_{col}'], use_container_width=True)
 
 # Mostrar gráficas de asimetría y curtosis
@@ -524,7 +463,6 @@ with tab_asimetria:
     
     for col in columnas_pasajeros:
         if f'qq_{col}' in visualizaciones:
-            año = "2023" if "2023" in col else "2022"
             st.plotly_chart(visualizaciones[f'qq_{col}'], use_container_width=True)
 
 with tab_curtosis:
@@ -539,7 +477,6 @@ with tab_curtosis:
     
     for col in columnas_pasajeros:
         if f'kurt_{col}' in visualizaciones:
-            año = "2023" if "2023" in col else "2022"
             st.plotly_chart(visualizaciones[f'kurt_{col}'], use_container_width=True)
 
 # --- Análisis de tipo de operación por aeropuerto ---
@@ -561,26 +498,30 @@ df_tipo_aeropuerto = {
 }
 
 # Crear gráfico de pastel
-fig_tipo = px.pie(
-    df_tipo_aeropuerto,
-    values="Cantidad",
-    names="Tipo de Aeropuerto",
-    title="Distribución de Aeropuertos según Tipo de Vuelos",
-    color_discrete_sequence=px.colors.qualitative.Set2,
-    hole=0.4
-)
-
-fig_tipo.update_traces(
-    textinfo="percent+label",
-    pull=[0.05, 0],
-    marker=dict(line=dict(color="#FFFFFF", width=2))
-)
-
-fig_tipo.update_layout(
-    showlegend=True,
-    legend_title="Categoría",
-    legend=dict(orientation="h", y=-0.1, x=0.3)
-)
+def crear_grafico_tipo():
+    fig_tipo = px.pie(
+        df_tipo_aeropuerto,
+        values="Cantidad",
+        names="Tipo de Aeropuerto",
+        title="Distribución de Aeropuertos según Tipo de Vuelos",
+        color_discrete_sequence=px.colors.qualitative.Set2,
+        hole=0.4
+    )
+
+    fig_tipo.update_traces(
+        textinfo="percent+label",
+        pull=[0.05, 0],
+        marker=dict(line=dict(color="#FFFFFF", width=2))
+    )
+
+    fig_tipo.update_layout(
+        showlegend=True,
+        legend_title="Categoría",
+        legend=dict(orientation="h", y=-0.1, x=0.3)
+    )
+    return fig_tipo
+
+fig_tipo = figura_en_cache(('6_tipo_aeropuerto',), crear_grafico_tipo, tablas=['domestic', 'international'])
 
 # Mostrar gráfico
 st.plotly_chart(fig_tipo, use_container_width=True)
@@ -617,3 +558,6 @@ with st.expander("Explicación de las estadísticas descriptivas"):
 
 st.markdown("---")
 st.markdown("📊 **Análisis Estadístico de Tráfico Aéreo en EE.UU. 2022-2023** - Grupo 5 (Computación 2) - Universidad Central de Venezuela")
+
+# Panel de rendimiento (oculto salvo con ?perf=1 o AIRPORTS_PERF_PANEL=1)
+panel_rendimiento()
@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-from utils.database import obtener_datos
+from utils.aeropuertos import TABLAS_HECHOS, obtener_anios
+from utils.busqueda import filtrar_por_busqueda
+from utils.clasificacion import UMBRALES_CLASIFICACION, obtener_proporciones
+from utils.figuras import figura_en_cache
+from utils.rendimiento import iniciar_ejecucion, panel_rendimiento
 import plotly.graph_objects as go # type: ignore
 
 # Configurar la página
@@ -12,124 +15,32 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Etapas de esta ejecución para el panel de rendimiento
+iniciar_ejecucion()
+
 # Título principal
 st.title("✈️ Análisis de Proporción de Vuelos por Aeropuerto")
 st.markdown("---")
 st.markdown("Análisis detallado de la distribución de vuelos domésticos e internacionales por aeropuerto")
 
-# Obtener datos
-with st.spinner("Cargando datos..."):
-    df_domestic = obtener_datos('domestic')
-    df_international = obtener_datos('international')
-    df_airports = obtener_datos('airports')
-
-# Verificar que los datos se cargaron correctamente
-if df_domestic.empty or df_international.empty or df_airports.empty:
-    st.error("❌ No se pudieron cargar los datos. Verifica la conexión a la base de datos.")
-    st.stop()
-
-# Convertir columnas a string para evitar errores
-df_domestic['airport'] = df_domestic['airport'].astype(str)
-df_international['airport'] = df_international['airport'].astype(str)
-df_airports['airport'] = df_airports['airport'].astype(str)
-
 # Sidebar para configuración
 st.sidebar.header("🔧 Configuración del Análisis")
 
-# Selector de año
+# Selector de año (los años con datos, del más reciente al más antiguo)
 año_seleccionado = st.sidebar.selectbox(
     "Selecciona el año:",
-    options=['2023', '2022'],
+    options=obtener_anios(),
     help="Selecciona el año para el análisis de proporciones"
 )
 
-# Función para calcular proporciones por aeropuerto
-def calcular_proporciones_por_aeropuerto(df_domestic, df_international, año):
-    """
-    Calcula las proporciones de vuelos domésticos e internacionales por aeropuerto
-    """
-    # Determinar columnas según el año
-    if año == '2023':
-        col_dom = '2023_enplaned_passengers_dom'
-        col_inter = '2023_enplaned_passengers_inter'
-    else:  # 2022
-        col_dom = '2022_enplaned_passengers_dom'
-        col_inter = '2022_enplaned_passengers_inter'
-    
-#    Unir los datasets de domésticos e internacionales por aeropuerto
-    df_proporciones = pd.merge(
-        df_domestic[['airport', col_dom]],
-        df_international[['airport', col_inter]],
-        on='airport',
-        how='outer'  # mantiene todos los aeropuertos, incluso si no tienen datos internacionales
-    ).fillna(0)
-
-        # Renombrar columnas
-    df_proporciones.rename(columns={
-        col_dom: 'vuelos_domesticos',
-        col_inter: 'vuelos_internacionales'
-    }, inplace=True)
-
-    # Convertir a entero
-    df_proporciones['vuelos_domesticos'] = pd.to_numeric(df_proporciones['vuelos_domesticos'], errors='coerce').fillna(0).astype(int)
-    df_proporciones['vuelos_internacionales'] = pd.to_numeric(df_proporciones['vuelos_internacionales'], errors='coerce').fillna(0).astype(int)
-        # Calcular totales
-    df_proporciones['total_vuelos'] = df_proporciones['vuelos_domesticos'] + df_proporciones['vuelos_internacionales']
-    
-    # Calcular porcentajes
-    # Manejar casos especiales cuando total_vuelos es 0
-    df_proporciones['pct_domesticos'] = np.where(
-        df_proporciones['total_vuelos'] > 0,
-        (df_proporciones['vuelos_domesticos'] / df_proporciones['total_vuelos']) * 100,
-        np.where(
-            df_proporciones['vuelos_domesticos'] > 0,
-            100.0,  # Si solo hay vuelos domésticos, 100%
-            0.0     # Si no hay vuelos de ningún tipo, 0%
-        )
-    )
-    df_proporciones['pct_internacionales'] = np.where(
-        df_proporciones['total_vuelos'] > 0,
-        (df_proporciones['vuelos_internacionales'] / df_proporciones['total_vuelos']) * 100,
-        np.where(
-            df_proporciones['vuelos_internacionales'] > 0,
-            100.0,  # Si solo hay vuelos internacionales, 100%
-            0.0     # Si no hay vuelos de ningún tipo, 0%
-        )
-    )
-    
-    # Asegurar que los porcentajes sean números enteros o decimales, no NaN
-    df_proporciones['pct_domesticos'] = df_proporciones['pct_domesticos'].fillna(0).round(2)
-    df_proporciones['pct_internacionales'] = df_proporciones['pct_internacionales'].fillna(0).round(2)
-    
-    # Clasificar aeropuertos por tipo de tráfico
-    def clasificar_aeropuerto(pct_dom, pct_inter):
-        if pct_dom >= 90:
-            return "Predominantemente Doméstico"
-        elif pct_inter >= 90:
-            return "Predominantemente Internacional"
-        elif pct_dom >= 70:
-            return "Mayormente Doméstico"
-        elif pct_inter >= 70:
-            return "Mayormente Internacional"
-        elif pct_dom >= 60:
-            return "Balanceado-Doméstico"
-        elif pct_inter >= 60:
-            return "Balanceado-Internacional"
-        else:
-            return "Balanceado"
-    
-    df_proporciones['clasificacion'] = df_proporciones.apply(
-        lambda row: clasificar_aeropuerto(row['pct_domesticos'], row['pct_internacionales']), 
-        axis=1
-    )
-    
-    # Ordenar por total de vuelos descendente
-    df_proporciones = df_proporciones.sort_values('total_vuelos', ascending=False).reset_index(drop=True)
-    
-    return df_proporciones
+# Obtener proporciones y clasificaciones (se calculan para todos los años a la vez y quedan en caché)
+with st.spinner("Cargando datos..."):
+    df_proporciones = obtener_proporciones().get(año_seleccionado, pd.DataFrame())
 
-# Calcular proporciones
-df_proporciones = calcular_proporciones_por_aeropuerto(df_domestic, df_international, año_seleccionado)
+# Verificar que los datos se cargaron correctamente
+if df_proporciones.empty:
+    st.error("❌ No se pudieron cargar los datos. Verifica la conexión a la base de datos.")
+    st.stop()
 
 # Mostrar resumen general
 st.subheader("📊 Resumen General")
@@ -177,17 +88,51 @@ with col5:
 
 st.markdown("---")
 
+# Aeropuertos por página del gráfico de barras (opciones del selector y valor inicial)
+OPCIONES_BARRAS_POR_PAGINA = [10, 20, 50]
+BARRAS_POR_PAGINA = 20
+
+def pagina_de_barras(df, pagina, tamano, agrupar_resto=True):
+    """
+    Recorta los aeropuertos de una página del gráfico de barras y, opcionalmente,
+    agrega una fila 'Otros' con la suma de los aeropuertos que quedan fuera, de modo
+    que el gráfico tiene como máximo tamano + 1 barras sin importar cuántos coincidan.
+
+    Args:
+        df (pd.DataFrame): Aeropuertos filtrados, en el orden en que se muestran
+        pagina (int): Página (empieza en 1)
+        tamano (int): Aeropuertos por página
+        agrupar_resto (bool): Agregar la fila 'Otros'
+
+    Returns:
+        pd.DataFrame: Columnas airport, vuelos_domesticos y vuelos_internacionales de la página
+    """
+    columnas = ['airport', 'vuelos_domesticos', 'vuelos_internacionales']
+    inicio = (pagina - 1) * tamano
+    df_pagina = df[columnas].iloc[inicio:inicio + tamano]
+
+    resto = len(df) - len(df_pagina)
+    if agrupar_resto and resto > 0:
+        otros = pd.DataFrame([{
+            'airport': f'Otros ({resto} aeropuertos)',
+            'vuelos_domesticos': df['vuelos_domesticos'].sum() - df_pagina['vuelos_domesticos'].sum(),
+            'vuelos_internacionales': df['vuelos_internacionales'].sum() - df_pagina['vuelos_internacionales'].sum(),
+        }])
+        df_pagina = pd.concat([df_pagina, otros], ignore_index=True)
+
+    return df_pagina
+
 # Búsqueda y filtrado de aeropuertos
 st.subheader("🔍 Búsqueda de Aeropuertos")
 
 col1, col2 = st.columns([2, 1])
 
 with col1:
-    # Búsqueda por nombre de aeropuerto
+    # Búsqueda por nombre, código IATA, ciudad o estado (tolera acentos y errores de tipeo)
     aeropuerto_buscar = st.text_input(
         "Buscar aeropuerto:",
-        placeholder="Escribe el nombre del aeropuerto...",
-        help="Busca un aeropuerto específico por nombre"
+        placeholder="Escribe el nombre, código IATA, ciudad o estado...",
+        help="Busca aeropuertos por nombre, código IATA, ciudad o estado; los resultados se ordenan por relevancia"
     )
 
 with col2:
@@ -203,7 +148,7 @@ with col2:
 df_filtrado = df_proporciones.copy()
 
 if aeropuerto_buscar:
-    df_filtrado = df_filtrado[df_filtrado['airport'].str.contains(aeropuerto_buscar, case=False, na=False)]
+    df_filtrado = filtrar_por_busqueda(df_filtrado, aeropuerto_buscar)
 
 if clasificacion_filtro != 'Todas':
     df_filtrado = df_filtrado[df_filtrado['clasificacion'] == clasificacion_filtro]
@@ -272,43 +217,86 @@ with tab2:
     # Gráfico de barras horizontales
     st.markdown(f"### Gráfico de Barras - {año_seleccionado}")
     
+    # Controles de paginación: el gráfico nunca tiene más de 'barras_por_pagina' barras (+ 'Otros')
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        barras_por_pagina = st.selectbox(
+            "Aeropuertos por página:",
+            options=OPCIONES_BARRAS_POR_PAGINA,
+            index=OPCIONES_BARRAS_POR_PAGINA.index(BARRAS_POR_PAGINA),
+            help="Cantidad de aeropuertos que se dibujan en cada página del gráfico"
+        )
+    total_paginas = max(1, -(-len(df_filtrado) // barras_por_pagina))
+    with col2:
+        pagina = st.number_input(
+            f"Página (de {total_paginas}):",
+            min_value=1,
+            max_value=total_paginas,
+            value=1,
+            step=1,
+            help="Página de aeropuertos, en el orden de la tabla"
+        )
+    with col3:
+        agrupar_resto = st.checkbox(
+            "Agrupar el resto de aeropuertos en 'Otros'",
+            value=True,
+            help="Agrega una barra con la suma de los aeropuertos que no están en la página"
+        )
+    
+    df_pagina = pagina_de_barras(df_filtrado, pagina, barras_por_pagina, agrupar_resto)
+    
     # Crear gráfico de barras apiladas
-    fig = go.Figure()
+    def crear_grafico_barras():
+        fig = go.Figure()
     
-    # Agregar barras para vuelos domésticos
-    fig.add_trace(go.Bar(
-        y=df_filtrado['airport'],
-        x=df_filtrado['vuelos_domesticos'],
-        name='Vuelos Domésticos',
-        orientation='h',
-        marker_color='#1f77b4'
-    ))
+        # Agregar barras para vuelos domésticos
+        fig.add_trace(go.Bar(
+            y=df_pagina['airport'],
+            x=df_pagina['vuelos_domesticos'],
+            name='Vuelos Domésticos',
+            orientation='h',
+            marker_color='#1f77b4'
+        ))
     
-    # Agregar barras para vuelos internacionales
-    fig.add_trace(go.Bar(
-        y=df_filtrado['airport'],
-        x=df_filtrado['vuelos_internacionales'],
-        name='Vuelos Internacionales',
-        orientation='h',
-        marker_color='#ff7f0e'
-    ))
+        # Agregar barras para vuelos internacionales
+        fig.add_trace(go.Bar(
+            y=df_pagina['airport'],
+            x=df_pagina['vuelos_internacionales'],
+            name='Vuelos Internacionales',
+            orientation='h',
+            marker_color='#ff7f0e'
+        ))
     
-    fig.update_layout(
-        title=f'Distribución de Vuelos por Aeropuerto - {año_seleccionado}',
-        xaxis_title='Número de Vuelos',
-        yaxis_title='Aeropuerto',
-        barmode='stack',
-        height=max(400, len(df_filtrado) * 30),
+        fig.update_layout(
+            title=f'Distribución de Vuelos por Aeropuerto - {año_seleccionado}',
+            xaxis_title='Número de Vuelos',
+            yaxis_title='Aeropuerto',
+            barmode='stack',
+            height=max(400, len(df_pagina) * 30),
+            # La barra 'Otros' puede cambiar mucho la escala: las marcas se eligen automáticamente
             xaxis=dict(
-                tickmode='linear',
-                tick0=0,
-                dtick=5000000,
                 tickformat='~s',  # Abrevia: 5M, 10M, 15M
                 ticksuffix=''     # No agrega nada más al final
-            )
+            ),
+            # Primer aeropuerto de la página arriba y 'Otros' al final
+            yaxis=dict(autorange='reversed')
+        )
+        return fig
+
+    # La figura queda en caché por año, búsqueda, clasificación y página (y versión de los datos)
+    fig = figura_en_cache(
+        ('7_barras', año_seleccionado, aeropuerto_buscar, clasificacion_filtro,
+         barras_por_pagina, pagina, agrupar_resto),
+        crear_grafico_barras,
+        tablas=TABLAS_HECHOS
     )
     
     st.plotly_chart(fig, use_container_width=True)
+    inicio = (pagina - 1) * barras_por_pagina
+    st.caption(
+        f"Aeropuertos {min(inicio + 1, len(df_filtrado))}-{min(inicio + barras_por_pagina, len(df_filtrado))} "
+        f"de {len(df_filtrado)}"
+    )
 
 # Análisis de aeropuertos específicos
 if len(df_filtrado) > 0:
@@ -350,20 +338,28 @@ if len(df_filtrado) > 0:
             )
         
         # Gráfico de barras individual
-        fig_individual = go.Figure()
+        def crear_grafico_individual():
+            fig_individual = go.Figure()
         
-        fig_individual.add_trace(go.Bar(
-            x=['Domésticos', 'Internacionales'],
-            y=[aeropuerto_data['vuelos_domesticos'], aeropuerto_data['vuelos_internacionales']],
-            marker_color=['#1f77b4', '#ff7f0e'],
-            text=[f"{aeropuerto_data['vuelos_domesticos']:,.0f}", f"{aeropuerto_data['vuelos_internacionales']:,.0f}"],
-            textposition='auto'
-        ))
+            fig_individual.add_trace(go.Bar(
+                x=['Domésticos', 'Internacionales'],
+                y=[aeropuerto_data['vuelos_domesticos'], aeropuerto_data['vuelos_internacionales']],
+                marker_color=['#1f77b4', '#ff7f0e'],
+                text=[f"{aeropuerto_data['vuelos_domesticos']:,.0f}", f"{aeropuerto_data['vuelos_internacionales']:,.0f}"],
+                textposition='auto'
+            ))
         
-        fig_individual.update_layout(
-            title=f'Distribución de Vuelos - {aeropuerto_especifico} ({año_seleccionado})',
-            yaxis_title='Número de Vuelos',
-            showlegend=False
+            fig_individual.update_layout(
+                title=f'Distribución de Vuelos - {aeropuerto_especifico} ({año_seleccionado})',
+                yaxis_title='Número de Vuelos',
+                showlegend=False
+            )
+            return fig_individual
+
+        fig_individual = figura_en_cache(
+            ('7_individual', año_seleccionado, aeropuerto_especifico),
+            crear_grafico_individual,
+            tablas=TABLAS_HECHOS
         )
         
         st.plotly_chart(fig_individual, use_container_width=True)
@@ -372,17 +368,23 @@ if len(df_filtrado) > 0:
 st.markdown("---")
 st.markdown("### ℹ️ Información sobre las Clasificaciones")
 
+# Umbrales de las bandas de clasificación (ver utils/clasificacion.py)
+u1, u2, u3 = UMBRALES_CLASIFICACION
+
 with st.expander("Explicación de las clasificaciones de aeropuertos"):
-    st.markdown("""
+    st.markdown(f"""
     **Clasificaciones por Tipo de Tráfico:**
     
-    - **Predominantemente Doméstico** (≥90% doméstico): Aeropuertos que manejan principalmente vuelos nacionales
-    - **Predominantemente Internacional** (≥90% internacional): Aeropuertos con enfoque en vuelos internacionales
-    - **Mayormente Doméstico** (70-89% doméstico): Aeropuertos con mayoría doméstica pero con presencia internacional
-    - **Mayormente Internacional** (70-89% internacional): Aeropuertos con mayoría internacional pero con tráfico doméstico
-    - **Balanceado-Doméstico** (60-69% doméstico): Aeropuertos con distribución relativamente equilibrada, tendiendo a doméstico
-    - **Balanceado-Internacional** (60-69% internacional): Aeropuertos con distribución relativamente equilibrada, tendiendo a internacional
-    - **Balanceado** (40-59% cada uno): Aeropuertos con distribución muy equilibrada entre doméstico e internacional
+    - **Predominantemente Doméstico** (≥{u1:g}% doméstico): Aeropuertos que manejan principalmente vuelos nacionales
+    - **Predominantemente Internacional** (≥{u1:g}% internacional): Aeropuertos con enfoque en vuelos internacionales
+    - **Mayormente Doméstico** ({u2:g}-{u1 - 1:g}% doméstico): Aeropuertos con mayoría doméstica pero con presencia internacional
+    - **Mayormente Internacional** ({u2:g}-{u1 - 1:g}% internacional): Aeropuertos con mayoría internacional pero con tráfico doméstico
+    - **Balanceado-Doméstico** ({u3:g}-{u2 - 1:g}% doméstico): Aeropuertos con distribución relativamente equilibrada, tendiendo a doméstico
+    - **Balanceado-Internacional** ({u3:g}-{u2 - 1:g}% internacional): Aeropuertos con distribución relativamente equilibrada, tendiendo a internacional
+    - **Balanceado** ({100 - u3:g}-{u3 - 1:g}% cada uno): Aeropuertos con distribución muy equilibrada entre doméstico e internacional
     
     **Nota:** Los porcentajes se calculan basándose en el número de pasajeros en vuelos domésticos vs internacionales.
-    """)
\ No newline at end of file
+    """)
+
+# Panel de rendimiento (oculto salvo con ?perf=1 o AIRPORTS_PERF_PANEL=1)
+panel_rendimiento()
@@ -1,6 +1,15 @@
 import streamlit as st
-import pandas as pd
-from utils.database import supabase
+from utils.consultas import (
+    top_crecimiento_porcentual_domestico,
+    top_incremento_absoluto_domestico,
+    crecimiento_domestico_mayor_a,
+    proporcion_pasajeros_internacionales,
+    top_estados_pasajeros_totales,
+    aeropuertos_que_mejoraron_ranking,
+    ejecutar_consulta,
+    TTL_CONSULTAS,
+)
+from utils.rendimiento import iniciar_ejecucion, panel_rendimiento
 
 # Configurar la página
 st.set_page_config(
@@ -9,6 +18,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Etapas de esta ejecución para el panel de rendimiento
+iniciar_ejecucion()
+
 # Título de la página
 st.title("🔍 Querys SQL")
 st.markdown("---")
@@ -25,6 +37,13 @@ query_seleccionado = st.selectbox(
             "⬆️ Aeropuertos que Mejoraron su Ranking Total"
         ]
     )
+
+# Los resultados quedan en caché; esta opción obliga a consultar de nuevo a Supabase
+forzar = st.checkbox(
+    "🔄 Forzar actualización",
+    value=False,
+    help=f"Los resultados se guardan en caché durante {TTL_CONSULTAS} segundos. Marca esta opción para volver a consultar la base de datos."
+)
     
     # QUERY 1: Top 10 crecimiento doméstico
 if query_seleccionado == "🏆 Top 10 - Mayor Crecimiento Doméstico 2022-2023":
@@ -50,21 +69,11 @@ LIMIT 10;
             """, language='sql')
         
         if st.button("🚀 Ejecutar Query (Porcentaje)", key="query1_percentage"):
-            with st.spinner("Ejecutando consulta a Supabase..."):
+            with st.spinner("Ejecutando consulta..."):
                 try:
-                    response = supabase.table('domestic').select("*, airports(name)").execute()
-                    if response.data:
-                        df = pd.DataFrame(response.data)
-                        df['airport_name'] = df['airports'].apply(lambda x: x['name'] if x else None)
-                        df_resultado = df[['airport_name', '2022_enplaned_passengers_dom', '2023_enplaned_passengers_dom', 'percentage_change_2022_2023_dom']].copy()
-                        df_resultado = df_resultado.rename(columns={
-                            'airport_name': 'name',
-                            '2022_enplaned_passengers_dom': '2022_passengers',
-                            '2023_enplaned_passengers_dom': '2023_passengers',
-                            'percentage_change_2022_2023_dom': 'percentage_change'
-                        })
-                        df_resultado = df_resultado.sort_values('percentage_change', ascending=False).head(10).reset_index(drop=True)
-
+                    # El servidor ordena y limita: solo llegan las 10 filas del resultado
+                    df_resultado = ejecutar_consulta(top_crecimiento_porcentual_domestico, forzar=forzar)
+                    if not df_resultado.empty:
                         st.success(f"✅ Consulta ejecutada exitosamente. {len(df_resultado)} registros encontrados.")
                         st.dataframe(df_resultado, width='stretch')
 
@@ -99,24 +108,11 @@ LIMIT 10;
             """, language='sql')
 
         if st.button("🚀 Ejecutar Query (Incremento Absoluto)", key="query1_absolute"):
-            with st.spinner("Ejecutando consulta a Supabase..."):
+            with st.spinner("Ejecutando consulta..."):
                 try:
-                    response = supabase.table('domestic').select("*, airports(name)").execute()
-                    if response.data:
-                        df = pd.DataFrame(response.data)
-                        df['airport_name'] = df['airports'].apply(lambda x: x['name'] if x else None)
-
-                        # Calcular el incremento absoluto
-                        df['increase'] = df['2023_enplaned_passengers_dom'] - df['2022_enplaned_passengers_dom']
-
-                        df_resultado = df[['airport_name', '2022_enplaned_passengers_dom', '2023_enplaned_passengers_dom', 'increase']].copy()
-                        df_resultado = df_resultado.rename(columns={
-                            'airport_name': 'name',
-                            '2022_enplaned_passengers_dom': '2022_passengers',
-                            '2023_enplaned_passengers_dom': '2023_passengers'
-                        })
-                        df_resultado = df_resultado.sort_values('increase', ascending=False).head(10).reset_index(drop=True)
-
+                    # El incremento es un campo calculado del servidor (sql/campos_calculados.sql)
+                    df_resultado = ejecutar_consulta(top_incremento_absoluto_domestico, forzar=forzar)
+                    if not df_resultado.empty:
                         st.success(f"✅ Consulta ejecutada exitosamente. {len(df_resultado)} registros encontrados.")
                         st.dataframe(df_resultado, width='stretch')
 
@@ -150,45 +146,24 @@ ORDER BY percentage_change_2022_2023_dom DESC;
         """, language='sql')
 
     if st.button("🚀 Ejecutar Query", key="query2"):
-        with st.spinner("Ejecutando consulta a Supabase..."):
+        with st.spinner("Ejecutando consulta..."):
             try:
-                # Obtener datos de domestic con JOIN a airports
-                response = supabase.table('domestic').select("*, airports(name)").execute()
+                # Filtro > 20% (más de 20%, no >= 20%) y orden aplicados en el servidor
+                df_resultado = ejecutar_consulta(crecimiento_domestico_mayor_a, 20, forzar=forzar)
                 
-                if response.data:
-                    df = pd.DataFrame(response.data)
-                    
-                    # Expandir la columna airports para obtener el campo name
-                    df['airport_name'] = df['airports'].apply(lambda x: x['name'] if x else None)
+                if not df_resultado.empty:
+                    st.success(f"✅ Consulta ejecutada exitosamente. {len(df_resultado)} registros encontrados.")
+                    st.dataframe(df_resultado, width='stretch')
                     
-                    # Filtrar por crecimiento > 20% (más de 20%, no >= 20%)
-                    df_filtrado = df[df['percentage_change_2022_2023_dom'] > 20]
+                    # Botón para descargar resultados reales
+                    csv_real = df_resultado.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Descargar Resultados Reales",
+                        data=csv_real,
+                        file_name="crecimiento_mayor_20_porciento_real.csv",
+                        mime="text/csv"
+                    )                            
                     
-                    if len(df_filtrado) > 0:
-                        # Si PF existen aeropuertos con crecimiento > 20%
-                        df_resultado = df_filtrado[['airport_name', '2022_enplaned_passengers_dom', '2023_enplaned_passengers_dom', 'percentage_change_2022_2023_dom']].copy()
-                        df_resultado = df_resultado.rename(columns={
-                            'airport_name': 'name',
-                            '2022_enplaned_passengers_dom': '2022_passengers',
-                            '2023_enplaned_passengers_dom': '2023_passengers'
-                        })
-                        df_resultado = df_resultado.sort_values('percentage_change_2022_2023_dom', ascending=False)
-                        df_resultado = df_resultado.reset_index(drop=True)
-                        
-                        st.success(f"✅ Consulta ejecutada exitosamente. {len(df_resultado)} registros encontrados.")
-                        st.dataframe(df_resultado, width='stretch')
-                        
-                        # Botón para descargar resultados reales
-                        csv_real = df_resultado.to_csv(index=False)
-                        st.download_button(
-                            label="📥 Descargar Resultados Reales",
-                            data=csv_real,
-                            file_name="crecimiento_mayor_20_porciento_real.csv",
-                            mime="text/csv"
-                        )                            
-                        
-                    else:
-                        st.warning("⚠️ No se encontraron datos para esta consulta")
                 else:
                     st.warning("⚠️ No se encontraron datos para esta consulta")
                     
@@ -216,36 +191,12 @@ ORDER BY CASE WHEN a.name IS NULL THEN 1 ELSE 0 END, proportion DESC;
         """, language='sql')
 
     if st.button("🚀 Ejecutar Query", key="query3"):
-        with st.spinner("Ejecutando consulta a Supabase..."):
+        with st.spinner("Ejecutando consulta..."):
             try:
-                # Obtener datos de international con JOIN a airports
-                response = supabase.table('international').select("*, airports(name)").execute()
+                # Una sola llamada RPC: el servidor devuelve las proporciones y la fila TOTAL ya calculadas
+                df_resultado = ejecutar_consulta(proporcion_pasajeros_internacionales, forzar=forzar)
                 
-                if response.data:
-                    df = pd.DataFrame(response.data)
-                    
-                    # Expandir la columna airports para obtener el campo name
-                    df['airport_name'] = df['airports'].apply(lambda x: x['name'] if x else None)
-                    
-                    # Calcular total de pasajeros internacionales
-                    total_passengers = df['2023_enplaned_passengers_inter'].sum()
-                    
-                    # Calcular proporción por aeropuerto
-                    df['proportion'] = (df['2023_enplaned_passengers_inter'] / total_passengers).round(3)
-                    
-                    # Seleccionar columnas necesarias y ordenar
-                    df_resultado = df[['airport_name', 'proportion']].copy()
-                    df_resultado = df_resultado.rename(columns={'airport_name': 'airport_name'})
-                    df_resultado = df_resultado.sort_values('proportion', ascending=False)
-                    
-                    # Agregar fila de total
-                    total_row = pd.DataFrame({
-                        'airport_name': ['TOTAL'],
-                        'proportion': [1.000]
-                    })
-                    df_resultado = pd.concat([df_resultado, total_row], ignore_index=True)
-                    df_resultado = df_resultado.reset_index(drop=True)
-                    
+                if not df_resultado.empty:
                     st.success(f"✅ Consulta ejecutada exitosamente. {len(df_resultado)} registros encontrados.")
                     st.dataframe(df_resultado, width='stretch')
                     
@@ -262,7 +213,7 @@ ORDER BY CASE WHEN a.name IS NULL THEN 1 ELSE 0 END, proportion DESC;
                     
             except Exception as e:
                 st.error(f"❌ Error al ejecutar consulta: {str(e)}")
-                st.info("💡 **Nota:** Asegúrate de que las tablas 'international' y 'airports' existan en Supabase")
+                st.info("💡 **Nota:** Asegúrate de que la función 'international_passenger_proportion' (sql/funciones_agregadas.sql) exista en Supabase")
             
 
 # QUERY 4: Top 5 estados
@@ -291,63 +242,33 @@ LIMIT 5;
     
     
     if st.button("🚀 Ejecutar Query", key="query4"):
-        with st.spinner("Ejecutando consulta a Supabase..."):
+        with st.spinner("Ejecutando consulta..."):
             try:
-                # Obtener datos de airports con JOIN a state
-                response = supabase.table('airports').select("*, state(name)").execute()
+                # Una sola llamada RPC: el servidor hace los JOIN, la suma por estado y el límite
+                df_resultado = ejecutar_consulta(top_estados_pasajeros_totales, 5, forzar=forzar)
                 
-                if response.data:
-                    df_airports = pd.DataFrame(response.data)
-                    
-                    # Expandir la columna state para obtener el campo name
-                    df_airports['state_name'] = df_airports['state'].apply(lambda x: x['name'] if x else None)
+                if not df_resultado.empty:
+                    st.success(f"✅ Consulta ejecutada exitosamente. {len(df_resultado)} registros encontrados.")
+                    st.dataframe(df_resultado, width='stretch')
                     
-                    # Obtener datos de domestic e international
-                    response_dom = supabase.table('domestic').select("*").execute()
-                    response_int = supabase.table('international').select("*").execute()
+                    # Gráfico de barras con datos reales
+                    if not df_resultado.empty:
+                        st.bar_chart(df_resultado.set_index('states')['total_passengers'])
                     
-                    if response_dom.data and response_int.data:
-                        df_domestic = pd.DataFrame(response_dom.data)
-                        df_international = pd.DataFrame(response_int.data)
-                        
-                        # Combinar datos de domestic e international
-                        df_combined = df_domestic.merge(df_international, on='airport_id', suffixes=('_dom', '_inter'))
-                        
-                        # Combinar con airports para obtener state_name
-                        df_final = df_combined.merge(df_airports[['id', 'state_name']], left_on='airport_id', right_on='id')
-                        
-                        # Calcular total de pasajeros por estado
-                        df_final['total_passengers'] = df_final['2023_enplaned_passengers_dom'] + df_final['2023_enplaned_passengers_inter']
-                        
-                        # Agrupar por estado y sumar pasajeros
-                        df_resultado = df_final.groupby('state_name')['total_passengers'].sum().reset_index()
-                        df_resultado = df_resultado.rename(columns={'state_name': 'states'})
-                        df_resultado = df_resultado.sort_values('total_passengers', ascending=False).head(5)
-                        df_resultado = df_resultado.reset_index(drop=True)
-                        
-                        st.success(f"✅ Consulta ejecutada exitosamente. {len(df_resultado)} registros encontrados.")
-                        st.dataframe(df_resultado, width='stretch')
-                        
-                        # Gráfico de barras con datos reales
-                        if not df_resultado.empty:
-                            st.bar_chart(df_resultado.set_index('states')['total_passengers'])
-                        
-                        # Botón para descargar resultados reales
-                        csv_real = df_resultado.to_csv(index=False)
-                        st.download_button(
-                            label="📥 Descargar Resultados Reales",
-                            data=csv_real,
-                            file_name="top_5_estados_real.csv",
-                            mime="text/csv"
-                        )
-                    else:
-                        st.warning("⚠️ No se pudieron obtener datos de domestic o international")
+                    # Botón para descargar resultados reales
+                    csv_real = df_resultado.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Descargar Resultados Reales",
+                        data=csv_real,
+                        file_name="top_5_estados_real.csv",
+                        mime="text/csv"
+                    )
                 else:
                     st.warning("⚠️ No se encontraron datos para esta consulta")
                     
             except Exception as e:
                 st.error(f"❌ Error al ejecutar consulta: {str(e)}")
-                st.info("💡 **Nota:** Asegúrate de que las tablas 'airports', 'domestic', 'international' y 'state' existan en Supabase")
+                st.info("💡 **Nota:** Asegúrate de que la función 'top_states_total_passengers' (sql/funciones_agregadas.sql) exista en Supabase")
         
 # QUERY 5: Mejora de ranking
 elif query_seleccionado == "⬆️ Aeropuertos que Mejoraron su Ranking Total":
@@ -366,26 +287,12 @@ ORDER BY "2023_rank_total" ASC;
         """, language='sql')
 
     if st.button("🚀 Ejecutar Query", key="query5"):
-        with st.spinner("Ejecutando consulta a Supabase..."):
+        with st.spinner("Ejecutando consulta..."):
             try:
-                # Obtener datos de total con JOIN a airports
-                response = supabase.table('total').select("*, airports(name)").execute()
+                # Filtro 2023 < 2022 (campo calculado 'rank_change') y orden aplicados en el servidor
+                df_resultado = ejecutar_consulta(aeropuertos_que_mejoraron_ranking, forzar=forzar)
                 
-                if response.data:
-                    df = pd.DataFrame(response.data)
-                    
-                    # Expandir la columna airports para obtener el campo name
-                    df['airport_name'] = df['airports'].apply(lambda x: x['name'] if x else None)
-                    
-                    # Filtrar aeropuertos que mejoraron su ranking (2023 < 2022)
-                    df_filtrado = df[df['2023_rank_total'] < df['2022_rank_total']]
-                    
-                    # Seleccionar columnas necesarias y ordenar
-                    df_resultado = df_filtrado[['airport_name', '2022_rank_total', '2023_rank_total']].copy()
-                    df_resultado = df_resultado.rename(columns={'airport_name': 'name'})
-                    df_resultado = df_resultado.sort_values('2023_rank_total')
-                    df_resultado = df_resultado.reset_index(drop=True)
-                    
+                if not df_resultado.empty:
                     st.success(f"✅ Consulta ejecutada exitosamente. {len(df_resultado)} registros encontrados.")
                     st.dataframe(df_resultado, width='stretch')
                     
@@ -409,3 +316,6 @@ ORDER BY "2023_rank_total" ASC;
 # Footer
 st.markdown("---")
 st.markdown("📊 **✈️ Análisis exploratorio de tráfico aéreo en EE.UU 2022-2023** - Grupo 5 (Computación 2) - Universidad Central de Venezuela")
+
+# Panel de rendimiento (oculto salvo con ?perf=1 o AIRPORTS_PERF_PANEL=1)
+panel_rendimiento()
@@ -0,0 +1,23 @@
+-- Campos calculados para PostgREST (ejecutar una vez en el editor SQL de Supabase).
+-- Una función que recibe la fila de una tabla se puede pedir en el 'select',
+-- filtrar y ordenar como si fuera una columna más, por ejemplo:
+--   /domestic?select=increase&order=increase.desc&limit=10
+-- Los usa utils/consultas.py para que el servidor devuelva solo las filas del resultado.
+
+-- Incremento absoluto de pasajeros domésticos 2023 - 2022
+CREATE OR REPLACE FUNCTION public.increase(public.domestic)
+RETURNS bigint
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT $1."2023_enplaned_passengers_dom"::bigint - $1."2022_enplaned_passengers_dom"::bigint;
+$$;
+
+-- Puestos ganados en el ranking total (positivo si el aeropuerto mejoró en 2023)
+CREATE OR REPLACE FUNCTION public.rank_change(public.total)
+RETURNS integer
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT $1."2022_rank_total"::integer - $1."2023_rank_total"::integer;
+$$;
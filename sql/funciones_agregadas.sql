@@ -0,0 +1,51 @@
+-- Funciones de agregación para PostgREST (ejecutar una vez en el editor SQL de Supabase).
+-- Se llaman por RPC (POST /rest/v1/rpc/<función>) y devuelven solo las filas agregadas,
+-- en lugar de descargar las tablas completas y agruparlas en el cliente.
+-- Las usa utils/consultas.py.
+
+-- Estados con mayor número de pasajeros 2023 (domésticos + internacionales)
+CREATE OR REPLACE FUNCTION public.top_states_total_passengers(limit_count integer DEFAULT 5)
+RETURNS TABLE (states text, total_passengers bigint)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        s.name::text,
+        sum(i."2023_enplaned_passengers_inter" + d."2023_enplaned_passengers_dom")::bigint
+    FROM public.international AS i
+    INNER JOIN public.domestic AS d ON d.airport_id = i.airport_id
+    INNER JOIN public.airports AS a ON a.id = i.airport_id
+    INNER JOIN public.state AS s ON s.id = a.state_id
+    GROUP BY s.name
+    -- Los empates se ordenan por nombre con COLLATE "C" (orden de bytes), igual en cualquier base de datos
+    ORDER BY 2 DESC NULLS LAST, s.name COLLATE "C"
+    LIMIT limit_count;
+$$;
+
+-- Proporción de pasajeros internacionales 2023 por aeropuerto, con la fila 'TOTAL' del ROLLUP al final
+CREATE OR REPLACE FUNCTION public.international_passenger_proportion()
+RETURNS TABLE (airport_name text, proportion numeric)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH total AS (
+        SELECT sum("2023_enplaned_passengers_inter") AS total_passengers
+        FROM public.international
+    )
+    SELECT
+        CASE WHEN GROUPING(a.id) = 1 THEN 'TOTAL' ELSE a.name::text END,
+        round(
+            sum(i."2023_enplaned_passengers_inter")::numeric
+            / NULLIF((SELECT total_passengers FROM total), 0),
+            3
+        )
+    FROM public.international AS i
+    INNER JOIN public.airports AS a ON a.id = i.airport_id
+    -- Se agrupa por id (y no solo por nombre) para no mezclar aeropuertos homónimos
+    GROUP BY ROLLUP ((a.id, a.name))
+    ORDER BY GROUPING(a.id), 2 DESC NULLS LAST, a.name COLLATE "C";
+$$;
+
+-- Permitir que la clave anónima de la aplicación llame a las funciones
+GRANT EXECUTE ON FUNCTION public.top_states_total_passengers(integer) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.international_passenger_proportion() TO anon, authenticated;
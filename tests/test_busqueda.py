@@ -0,0 +1,58 @@
+"""
+Pruebas del índice de búsqueda de aeropuertos (utils/busqueda.py).
+
+Uso:
+    python -m pytest -q tests/test_busqueda.py
+"""
+import pandas as pd
+import pytest
+
+from utils.busqueda import IndiceBusqueda, normalizar
+
+
+@pytest.fixture(scope="module")
+def indice():
+    df = pd.DataFrame({
+        'airport_id': [1, 2, 3, 4],
+        'airport': [
+            'Daniel K Inouye International',
+            'Hartsfield-Jackson Atlanta International',
+            'Los Angeles International',
+            'São Paulo/Guarulhos International',
+        ],
+        'iata_code': ['HNL', 'ATL', 'LAX', 'GRU'],
+        'city': ['Honolulu', 'Atlanta', 'Los Angeles', 'Guarulhos'],
+        'state': ['Hawaii', 'Georgia', 'California', 'São Paulo'],
+    })
+    return IndiceBusqueda(df)
+
+
+def ids(resultados):
+    return [id_aeropuerto for id_aeropuerto, _ in resultados]
+
+
+def test_normalizar():
+    assert normalizar("São Paulo/Guarulhos, SP") == "sao paulo guarulhos sp"
+
+
+def test_prefijo_y_exacto_primero(indice):
+    # "lax" es el código IATA exacto de Los Angeles; "atl" solo es prefijo de palabras de Atlanta
+    assert ids(indice.buscar("lax")) == [3]
+    assert ids(indice.buscar("atl")) == [2]
+
+
+def test_subcadena_de_dos_caracteres(indice):
+    # "ai" no es prefijo de ninguna palabra: aparece dentro de "hawaii"
+    assert ids(indice.buscar("ai")) == [1]
+    # "la" es prefijo de "lax" y está dentro de "atlanta"; el prefijo puntúa más
+    assert ids(indice.buscar("la")) == [3, 2]
+
+
+def test_errores_de_tipeo(indice):
+    assert ids(indice.buscar("guarulos")) == [4]
+
+
+def test_todos_los_terminos_deben_coincidir(indice):
+    assert ids(indice.buscar("los angeles")) == [3]
+    assert indice.buscar("los atlanta") == []
+    assert indice.buscar("   ") == []
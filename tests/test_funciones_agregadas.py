@@ -0,0 +1,220 @@
+"""
+Pruebas de las funciones de sql/funciones_agregadas.sql.
+
+- Con PG_DSN (cadena de conexión a una base de datos de Postgres vacía, por ejemplo
+  postgresql://postgres@localhost/pruebas) el SQL se ejecuta en Postgres sobre tablas
+  sintéticas y su resultado se compara con la implementación anterior en pandas
+  (descarga de las tablas proyectadas más merge/groupby en el cliente) y con el backend
+  simulado (utils/supabase_simulado.py). Todo se hace en una transacción que se deshace
+  al terminar. Sin PG_DSN, o sin psycopg instalado, estas pruebas se omiten.
+- Sin base de datos solo se comprueba el backend simulado contra la implementación en pandas.
+
+Uso:
+    python -m pytest -q tests
+    PG_DSN=postgresql://postgres@localhost/pruebas python -m pytest -q tests
+"""
+import os
+from pathlib import Path
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+from postgrest.exceptions import APIError
+
+from benchmarks.generador import generar_tablas
+from utils.supabase_simulado import ClienteSimulado
+
+RUTA_SQL = Path(__file__).resolve().parent.parent / 'sql' / 'funciones_agregadas.sql'
+
+# Columnas de las tablas que usan las funciones (el resto del esquema no interviene)
+ESQUEMA = {
+    'state': {'id': 'integer PRIMARY KEY', 'name': 'text'},
+    'airports': {'id': 'integer PRIMARY KEY', 'name': 'text', 'state_id': 'integer'},
+    'domestic': {'id': 'integer PRIMARY KEY', 'airport_id': 'integer', '2023_enplaned_passengers_dom': 'bigint'},
+    'international': {'id': 'integer PRIMARY KEY', 'airport_id': 'integer', '2023_enplaned_passengers_inter': 'bigint'},
+}
+
+
+@pytest.fixture(scope="module")
+def tablas():
+    tablas = generar_tablas(2000, semilla=7)
+    # Dos aeropuertos internacionales homónimos: el ROLLUP agrupa por id y no los debe mezclar
+    airports = tablas['airports'].copy()
+    primero, segundo = airports.index[airports['id'].isin(tablas['international']['airport_id'].iloc[:2])]
+    airports.loc[segundo, 'name'] = airports.loc[primero, 'name']
+    tablas['airports'] = airports
+    return tablas
+
+
+@pytest.fixture(scope="module")
+def cliente(tablas):
+    return ClienteSimulado(tablas, latencia=0, latencia_por_fila=0, tasa_errores=0, max_filas=0)
+
+
+@pytest.fixture(scope="module")
+def postgres(tablas):
+    """Conexión a Postgres con las tablas sintéticas y las funciones creadas (sin confirmar)."""
+    dsn = os.environ.get('PG_DSN')
+    if not dsn:
+        pytest.skip("PG_DSN no está definida: se omiten las pruebas contra Postgres")
+    psycopg = pytest.importorskip('psycopg')
+
+    conexion = psycopg.connect(dsn)
+    try:
+        # Roles de Supabase a los que se les da permiso de ejecución
+        conexion.execute("""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN CREATE ROLE anon; END IF;
+                IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN CREATE ROLE authenticated; END IF;
+            END
+            $$;
+        """)
+        for tabla, columnas in ESQUEMA.items():
+            definicion = ', '.join(f'"{columna}" {tipo}' for columna, tipo in columnas.items())
+            conexion.execute(f'CREATE TABLE public.{tabla} ({definicion})')
+            nombres = ', '.join(f'"{columna}"' for columna in columnas)
+            with conexion.cursor().copy(f'COPY public.{tabla} ({nombres}) FROM STDIN') as copia:
+                for fila in tablas[tabla][list(columnas)].itertuples(index=False):
+                    copia.write_row(fila)
+        conexion.execute(RUTA_SQL.read_text(encoding='utf-8'))
+        yield conexion
+    finally:
+        conexion.rollback()
+        conexion.close()
+
+
+def consultar(conexion, sql, parametros=None, columnas=None):
+    """Ejecuta una consulta y devuelve el resultado como DataFrame (numeric como float)."""
+    filas = conexion.execute(sql, parametros).fetchall()
+    df = pd.DataFrame(filas, columns=columnas)
+    if 'proportion' in df.columns:
+        df['proportion'] = df['proportion'].map(lambda valor: None if valor is None else float(valor))
+    return df
+
+
+def estados_en_pandas(tablas, limite):
+    """Implementación anterior de top_estados_pasajeros_totales (merge y groupby en pandas)."""
+    df_airports = tablas['airports'][['id', 'state_id']].merge(
+        tablas['state'][['id', 'name']].rename(columns={'id': 'state_id', 'name': 'states'}), on='state_id'
+    )
+    df = tablas['domestic'][['airport_id', '2023_enplaned_passengers_dom']].merge(
+        tablas['international'][['airport_id', '2023_enplaned_passengers_inter']], on='airport_id'
+    )
+    df = df.merge(df_airports[['id', 'states']], left_on='airport_id', right_on='id')
+    df['total_passengers'] = df['2023_enplaned_passengers_dom'] + df['2023_enplaned_passengers_inter']
+
+    df_resultado = df.groupby('states')['total_passengers'].sum().reset_index()
+    return df_resultado.sort_values(['total_passengers', 'states'], ascending=[False, True]).head(limite).reset_index(drop=True)
+
+
+def proporciones_en_pandas(tablas):
+    """Implementación anterior de proporcion_pasajeros_internacionales (con la fila TOTAL)."""
+    df = tablas['international'][['airport_id', '2023_enplaned_passengers_inter']].merge(
+        tablas['airports'][['id', 'name']], left_on='airport_id', right_on='id', how='left'
+    ).rename(columns={'name': 'airport_name'})
+
+    total_passengers = df['2023_enplaned_passengers_inter'].sum()
+    df['proportion'] = (df['2023_enplaned_passengers_inter'] / total_passengers).round(3)
+    df_resultado = df[['airport_name', 'proportion']].sort_values(['proportion', 'airport_name'], ascending=[False, True])
+
+    total_row = pd.DataFrame({'airport_name': ['TOTAL'], 'proportion': [1.000]})
+    return pd.concat([df_resultado, total_row], ignore_index=True)
+
+
+def rpc(cliente, funcion, parametros=None, columnas=None):
+    """Resultado de una función RPC del backend simulado como DataFrame."""
+    return pd.DataFrame(cliente.rpc(funcion, parametros).execute().data, columns=columnas)
+
+
+# --- Backend simulado frente a la implementación en pandas (sin base de datos) ---
+
+@pytest.mark.parametrize("limite", [1, 5, 100])
+def test_simulado_top_states_total_passengers(tablas, cliente, limite):
+    resultado = rpc(cliente, 'top_states_total_passengers', {'limit_count': limite}, ['states', 'total_passengers'])
+    pdt.assert_frame_equal(resultado, estados_en_pandas(tablas, limite), check_dtype=False)
+
+
+def test_simulado_international_passenger_proportion(tablas, cliente):
+    resultado = rpc(cliente, 'international_passenger_proportion', columnas=['airport_name', 'proportion'])
+    pdt.assert_frame_equal(resultado, proporciones_en_pandas(tablas), check_dtype=False)
+
+
+def test_simulado_funcion_inexistente(cliente):
+    with pytest.raises(APIError, match='PGRST202'):
+        cliente.rpc('no_existe').execute()
+
+
+# --- sql/funciones_agregadas.sql en Postgres (requiere PG_DSN) ---
+
+@pytest.mark.parametrize("limite", [1, 5, 100])
+def test_sql_top_states_total_passengers(tablas, cliente, postgres, limite):
+    resultado = consultar(
+        postgres, 'SELECT * FROM public.top_states_total_passengers(%s)', (limite,), ['states', 'total_passengers']
+    )
+    pdt.assert_frame_equal(resultado, estados_en_pandas(tablas, limite), check_dtype=False)
+    # El backend simulado responde lo mismo que la función SQL
+    simulado = rpc(cliente, 'top_states_total_passengers', {'limit_count': limite}, ['states', 'total_passengers'])
+    pdt.assert_frame_equal(simulado, resultado, check_dtype=False)
+
+
+def test_sql_top_states_total_passengers_limite_por_defecto(postgres):
+    resultado = consultar(postgres, 'SELECT * FROM public.top_states_total_passengers()')
+    assert len(resultado) == 5
+
+
+def test_sql_international_passenger_proportion(tablas, cliente, postgres):
+    resultado = consultar(
+        postgres, 'SELECT * FROM public.international_passenger_proportion()', columnas=['airport_name', 'proportion']
+    )
+    pdt.assert_frame_equal(resultado, proporciones_en_pandas(tablas), check_dtype=False)
+    # La fila del ROLLUP va siempre al final y los homónimos no se mezclan
+    assert resultado['airport_name'].iloc[-1] == 'TOTAL'
+    assert resultado['airport_name'].iloc[:-1].value_counts().max() == 2
+    simulado = rpc(cliente, 'international_passenger_proportion', columnas=['airport_name', 'proportion'])
+    pdt.assert_frame_equal(simulado, resultado, check_dtype=False)
+
+
+def test_sql_international_passenger_proportion_sin_pasajeros(tablas, postgres):
+    # NULLIF: con total 0 las proporciones quedan en NULL en lugar de fallar por división por cero
+    postgres.execute('SAVEPOINT sin_pasajeros')
+    try:
+        postgres.execute('UPDATE public.international SET "2023_enplaned_passengers_inter" = 0')
+        resultado = consultar(
+            postgres, 'SELECT * FROM public.international_passenger_proportion()', columnas=['airport_name', 'proportion']
+        )
+    finally:
+        postgres.execute('ROLLBACK TO SAVEPOINT sin_pasajeros')
+
+    assert len(resultado) == len(tablas['international']) + 1
+    assert resultado['airport_name'].iloc[-1] == 'TOTAL'
+    assert resultado['proportion'].isna().all()
+
+    vacias = {**tablas, 'international': tablas['international'].assign(**{'2023_enplaned_passengers_inter': 0})}
+    simulado = rpc(
+        ClienteSimulado(vacias, latencia=0, latencia_por_fila=0, tasa_errores=0, max_filas=0),
+        'international_passenger_proportion',
+        columnas=['airport_name', 'proportion']
+    )
+    assert simulado['airport_name'].iloc[-1] == 'TOTAL'
+    assert simulado['proportion'].isna().all()
+
+
+@pytest.mark.parametrize("funcion", [
+    'public.top_states_total_passengers(integer)',
+    'public.international_passenger_proportion()',
+])
+@pytest.mark.parametrize("rol", ['anon', 'authenticated'])
+def test_sql_permisos(postgres, funcion, rol):
+    # Permiso explícito en la ACL de la función (no solo el que PUBLIC tiene por defecto)
+    concedido = postgres.execute(
+        """
+        SELECT count(*)
+        FROM pg_proc AS p, aclexplode(p.proacl) AS permiso
+        WHERE p.oid = %s::regprocedure
+          AND permiso.grantee = %s::regrole
+          AND permiso.privilege_type = 'EXECUTE'
+        """,
+        (funcion, rol)
+    ).fetchone()[0]
+    assert concedido == 1
@@ -0,0 +1,304 @@
+import pandas as pd
+import streamlit as st
+from utils.database import columnas_tabla, obtener_varias_tablas, versiones_tablas
+# TIPOS_DE_FLUJO y SUFIJOS_FLUJO también se importan desde este módulo
+from utils.formato_largo import (
+    SUFIJOS_FLUJO, TIPOS_DE_FLUJO, anios_en_columnas, columna_pasajeros, columna_ranking,
+    pivotar, unir_flujos, variacion_interanual,
+)
+from utils.rendimiento import cache_medido, medir
+from utils.tipos import optimizar_tipos
+
+# Años que se usan si no se pueden leer las columnas de la tabla 'total'
+ANIOS = ['2023', '2022']
+
+# Columnas de la tabla 'airports' que se agregan a la tabla de hechos
+COLUMNAS_AEROPUERTO = ['iata_code', 'city', 'state']
+
+# Tablas de la base de datos de las que se construye la tabla de hechos
+TABLAS_HECHOS = ['total', 'domestic', 'international', 'airports']
+
+# Tablas de flujo de las que se construye la tabla de hechos larga
+TABLAS_FLUJO = ['total', 'domestic', 'international']
+
+
+def obtener_anios():
+    """
+    Años con datos en la base de datos, del más reciente al más antiguo. Se leen de
+    las columnas de la tabla 'total' ('<año>_enplaned_passengers_total'), así que un
+    año nuevo aparece en las páginas sin cambiar el código.
+
+    Returns:
+        list[str]: Años (ANIOS si no se pueden leer las columnas)
+    """
+    return anios_en_columnas(columnas_tabla('total'), 'total') or list(ANIOS)
+
+
+def _columnas_tabla_flujo(flujo, anios):
+    """
+    Columnas que la tabla de hechos lee de una tabla de flujo ('total', 'domestic' o 'international').
+
+    Args:
+        flujo (str): Tipo de flujo
+        anios (list[str]): Años que se leen
+
+    Returns:
+        list[str]: Columnas de pasajeros y rankings de cada año, más 'airport_id'
+    """
+    columnas = ['airport_id']
+    for anio in anios:
+        columnas += [columna_pasajeros(anio, flujo), columna_ranking(anio, flujo)]
+    return columnas
+
+
+def _cargar_tablas_hechos(anios):
+    """
+    Carga en paralelo las tablas de la tabla de hechos, pidiendo solo las columnas que
+    se usan (domestic e international sin el JOIN a airports).
+
+    Args:
+        anios (list[str]): Años que se leen de las tablas de flujo
+
+    Returns:
+        dict[str, pd.DataFrame]: Tablas por nombre
+    """
+    return obtener_varias_tablas(
+        TABLAS_HECHOS,
+        columnas={
+            'total': ['airport'] + _columnas_tabla_flujo('total', anios),
+            'domestic': _columnas_tabla_flujo('domestic', anios),
+            'international': _columnas_tabla_flujo('international', anios),
+            'airports': ['airport'] + COLUMNAS_AEROPUERTO,
+        }
+    )
+
+
+@medir()
+def construir_hechos_largos(df_total, df_domestic, df_international):
+    """
+    Construye la tabla de hechos en formato largo: una fila por aeropuerto, año y flujo
+    con las columnas airport_id, year, flow, passengers y rank (ver utils/formato_largo.py).
+    Las columnas no crecen con la cantidad de años.
+
+    Args:
+        df_total (pd.DataFrame): Tabla 'total' de obtener_datos
+        df_domestic (pd.DataFrame): Tabla 'domestic' de obtener_datos
+        df_international (pd.DataFrame): Tabla 'international' de obtener_datos
+
+    Returns:
+        pd.DataFrame: Tabla de hechos larga
+    """
+    return unir_flujos({
+        'total': df_total,
+        'domestic': df_domestic,
+        'international': df_international,
+    })
+
+
+def obtener_hechos_largos():
+    """
+    Obtiene la tabla de hechos larga (ver construir_hechos_largos). Queda en caché y
+    solo se reconstruye cuando cambia la versión de alguna de las tablas de flujo.
+
+    Returns:
+        pd.DataFrame: Tabla de hechos larga
+    """
+    return _obtener_hechos_largos(versiones_tablas(TABLAS_FLUJO))
+
+
+@cache_medido(st.cache_data, max_entries=4)
+def _obtener_hechos_largos(versiones):
+    """
+    Implementación cacheada de obtener_hechos_largos.
+
+    Args:
+        versiones (tuple): Versión de cada tabla de TABLAS_FLUJO (solo forma parte de la clave de caché)
+
+    Returns:
+        pd.DataFrame: Tabla de hechos larga
+    """
+    tablas = _cargar_tablas_hechos(obtener_anios())
+    return construir_hechos_largos(tablas['total'], tablas['domestic'], tablas['international'])
+
+
+@medir()
+def construir_hechos_aeropuertos(df_total, df_domestic, df_international, df_airports, largo=None):
+    """
+    Construye la tabla de hechos de aeropuertos: una fila por aeropuerto de la tabla 'total'
+    con los pasajeros de cada flujo y año, el código IATA, la ciudad y el estado.
+
+    Los pasajeros salen de la tabla de hechos larga con pivotar (una columna por año y
+    flujo, sin uniones entre las tablas de flujo); los datos del aeropuerto se unen por
+    la clave entera 'airport_id' (y no por el nombre del aeropuerto). El cambio porcentual
+    entre dos años se calcula aparte con obtener_variacion.
+
+    Columnas generadas:
+    - '<año>_<flujo>': pasajeros embarcados (por ejemplo '2023_total', '2022_international')
+
+    Args:
+        df_total (pd.DataFrame): Tabla 'total' de obtener_datos
+        df_domestic (pd.DataFrame): Tabla 'domestic' de obtener_datos
+        df_international (pd.DataFrame): Tabla 'international' de obtener_datos
+        df_airports (pd.DataFrame): Tabla 'airports' de obtener_datos
+        largo (pd.DataFrame, optional): Tabla de hechos larga ya construida con las mismas tablas
+
+    Returns:
+        pd.DataFrame: Tabla de hechos ordenada como la tabla 'total'
+    """
+    if df_total.empty or 'airport_id' not in df_total.columns:
+        return pd.DataFrame()
+
+    if largo is None:
+        largo = construir_hechos_largos(df_total, df_domestic, df_international)
+
+    df = df_total[['id', 'airport', 'airport_id']]
+    df = df.join(pivotar(largo, ids=pd.unique(df['airport_id'])), on='airport_id')
+
+    if not df_airports.empty:
+        columnas = [col for col in COLUMNAS_AEROPUERTO if col in df_airports.columns]
+        df = df.join(df_airports.set_index('id')[columnas], on='airport_id')
+
+    # Texto y ids en tipos compactos; los pasajeros pivotados quedan como decimales
+    return optimizar_tipos(df.reset_index(drop=True))
+
+
+def obtener_hechos_aeropuertos():
+    """
+    Obtiene la tabla de hechos de aeropuertos (ver construir_hechos_aeropuertos).
+    Queda en caché para todas las páginas y solo se reconstruye cuando cambia
+    la versión de alguna de las tablas de las que depende.
+
+    Returns:
+        pd.DataFrame: Tabla de hechos de aeropuertos
+    """
+    return _obtener_hechos_aeropuertos(versiones_tablas(TABLAS_HECHOS))
+
+
+@cache_medido(st.cache_data, max_entries=4)
+def _obtener_hechos_aeropuertos(versiones):
+    """
+    Implementación cacheada de obtener_hechos_aeropuertos.
+
+    Args:
+        versiones (tuple): Versión de cada tabla de TABLAS_HECHOS (solo forma parte de la clave de caché)
+
+    Returns:
+        pd.DataFrame: Tabla de hechos de aeropuertos
+    """
+    tablas = _cargar_tablas_hechos(obtener_anios())
+    return construir_hechos_aeropuertos(
+        tablas['total'],
+        tablas['domestic'],
+        tablas['international'],
+        tablas['airports'],
+        largo=obtener_hechos_largos(),
+    )
+
+
+@medir()
+def construir_hechos_por_flujo(largo, df_airports, flujos):
+    """
+    Construye una tabla de hechos con una fila por aeropuerto que tiene datos en alguno
+    de los flujos pedidos: la unión de sus 'airport_id', como un merge outer entre las
+    tablas de flujo. A diferencia de construir_hechos_aeropuertos no se limita a los
+    aeropuertos de la tabla 'total'.
+
+    Columnas generadas:
+    - 'airport_id' y 'airport' (nombre de la tabla 'airports')
+    - '<año>_<flujo>': pasajeros embarcados de cada flujo pedido (NaN donde no hay dato)
+    - el código IATA, la ciudad y el estado
+
+    Args:
+        largo (pd.DataFrame): Tabla de hechos larga (ver construir_hechos_largos)
+        df_airports (pd.DataFrame): Tabla 'airports' de obtener_datos
+        flujos (list[str]): Flujos de la tabla (por ejemplo ['domestic', 'international'])
+
+    Returns:
+        pd.DataFrame: Tabla de hechos en el orden de aparición de los aeropuertos en la tabla larga
+    """
+    flujos = list(flujos)
+    ids = pd.unique(largo.loc[largo['flow'].isin(flujos), 'airport_id'])
+    if len(ids) == 0:
+        return pd.DataFrame()
+
+    df = pivotar(largo, flujos=flujos, ids=ids).reset_index()
+    columnas = [col for col in ['airport'] + COLUMNAS_AEROPUERTO if col in df_airports.columns]
+    if columnas:
+        df = df.join(df_airports.set_index('id')[columnas], on='airport_id')
+    if 'airport' not in df.columns:
+        df['airport'] = None
+    df = df[['airport_id', 'airport'] + [col for col in df.columns if col not in ('airport_id', 'airport')]]
+
+    return optimizar_tipos(df)
+
+
+def obtener_hechos_por_flujo(flujos):
+    """
+    Obtiene la tabla de hechos de los aeropuertos con datos en alguno de los flujos
+    pedidos (ver construir_hechos_por_flujo). Queda en caché por flujos y solo se
+    reconstruye cuando cambia la versión de alguna de las tablas de las que depende.
+
+    Args:
+        flujos (list[str]): Flujos de la tabla
+
+    Returns:
+        pd.DataFrame: Tabla de hechos por flujo
+    """
+    return _obtener_hechos_por_flujo(tuple(flujos), versiones_tablas(TABLAS_HECHOS))
+
+
+@cache_medido(st.cache_data, max_entries=4, show_spinner=False)
+def _obtener_hechos_por_flujo(flujos, versiones):
+    """
+    Implementación cacheada de obtener_hechos_por_flujo.
+
+    Args:
+        flujos (tuple[str, ...]): Flujos de la tabla
+        versiones (tuple): Versión de cada tabla de TABLAS_HECHOS (solo forma parte de la clave de caché)
+
+    Returns:
+        pd.DataFrame: Tabla de hechos por flujo
+    """
+    tablas = _cargar_tablas_hechos(obtener_anios())
+    return construir_hechos_por_flujo(obtener_hechos_largos(), tablas['airports'], flujos)
+
+
+def obtener_variacion(anio_base, anio_final):
+    """
+    Obtiene las métricas interanuales de un par de años (ver variacion_interanual) con
+    una fila por fila de la tabla de hechos, en el mismo orden, más las columnas
+    'airport_id' y 'airport'. Queda en caché por par de años y versión de los datos.
+
+    Args:
+        anio_base (str): Año de referencia
+        anio_final (str): Año que se compara
+
+    Returns:
+        pd.DataFrame: 'airport_id', 'airport', 'cambio_<flujo>_pct', 'diferencia_<flujo>' y 'cambio_ranking_<flujo>'
+    """
+    return _obtener_variacion(str(anio_base), str(anio_final), versiones_tablas(TABLAS_HECHOS))
+
+
+@cache_medido(st.cache_data, max_entries=16, show_spinner=False)
+def _obtener_variacion(anio_base, anio_final, versiones):
+    """
+    Implementación cacheada de obtener_variacion.
+
+    Args:
+        anio_base (str): Año de referencia
+        anio_final (str): Año que se compara
+        versiones (tuple): Versión de cada tabla de TABLAS_HECHOS (solo forma parte de la clave de caché)
+
+    Returns:
+        pd.DataFrame: Métricas interanuales alineadas con la tabla de hechos
+    """
+    hechos = obtener_hechos_aeropuertos()
+    if hechos.empty:
+        return pd.DataFrame()
+
+    ids = hechos['airport_id'].to_numpy()
+    variacion = variacion_interanual(obtener_hechos_largos(), anio_base, anio_final, ids=pd.unique(ids))
+    variacion = variacion.reindex(ids).reset_index(drop=True)
+    variacion.insert(0, 'airport_id', ids)
+    variacion.insert(1, 'airport', hechos['airport'].array)
+    return variacion
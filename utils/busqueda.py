@@ -0,0 +1,224 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+import pandas as pd
+import streamlit as st
+from utils.aeropuertos import TABLAS_HECHOS, TIPOS_DE_FLUJO, obtener_hechos_por_flujo
+from utils.database import versiones_tablas
+from utils.rendimiento import cache_medido
+
+# Campos de la tabla de hechos que se indexan y peso de cada uno en la puntuación
+CAMPOS_BUSQUEDA = {
+    'iata_code': 2.0,
+    'airport': 1.0,
+    'city': 0.8,
+    'state': 0.6,
+}
+
+# Puntuación de cada tipo de coincidencia entre un término de la búsqueda y una palabra indexada
+PUNTAJE_EXACTO = 1.0
+PUNTAJE_PREFIJO = 0.9
+PUNTAJE_SUBCADENA = 0.7
+PUNTAJE_APROXIMADO = 0.6
+
+# Similitud mínima (coeficiente de Dice sobre trigramas) para aceptar una palabra con errores de tipeo
+SIMILITUD_MINIMA = 0.5
+
+
+def normalizar(texto):
+    """
+    Normaliza un texto para buscar: minúsculas, sin acentos y con cualquier signo
+    de puntuación cambiado por espacios ("São Paulo, SP" -> "sao paulo sp").
+
+    Args:
+        texto (str): Texto original
+
+    Returns:
+        str: Texto normalizado
+    """
+    texto = unicodedata.normalize('NFKD', str(texto))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r'[^0-9a-z]+', ' ', texto.lower()).strip()
+
+
+def _trigramas(palabra):
+    """
+    Trigramas de una palabra con dos espacios al inicio y uno al final, de modo que
+    las palabras cortas también tengan trigramas y el inicio pese más que el final.
+
+    Args:
+        palabra (str): Palabra normalizada
+
+    Returns:
+        set[str]: Trigramas de la palabra
+    """
+    relleno = f'  {palabra} '
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+class IndiceBusqueda:
+    """
+    Índice de búsqueda de aeropuertos por nombre, código IATA, ciudad y estado.
+
+    Se construye una sola vez a partir de la tabla de hechos:
+    - un índice invertido palabra -> {fila: peso del campo}
+    - el vocabulario ordenado, para buscar prefijos con bisect
+    - un índice trigrama -> palabras, para buscar subcadenas y palabras con errores de tipeo
+      (los términos de uno o dos caracteres se buscan como subcadena en el vocabulario)
+
+    Cada término de la búsqueda se compara con las palabras del vocabulario (no con las
+    filas), así el costo depende del tamaño del vocabulario y no de la cantidad de aeropuertos.
+    """
+
+    def __init__(self, df, columna_id='airport_id'):
+        self.ids = df[columna_id].tolist() if columna_id in df.columns else list(range(len(df)))
+        self._filas_por_palabra = defaultdict(dict)
+        for campo, peso in CAMPOS_BUSQUEDA.items():
+            if campo not in df.columns:
+                continue
+            for fila, valor in enumerate(df[campo].tolist()):
+                if valor is None or pd.isna(valor):
+                    continue
+                for palabra in normalizar(valor).split():
+                    pesos = self._filas_por_palabra[palabra]
+                    pesos[fila] = max(pesos.get(fila, 0.0), peso)
+
+        self._vocabulario = sorted(self._filas_por_palabra)
+        self._trigramas_palabra = {palabra: _trigramas(palabra) for palabra in self._vocabulario}
+        self._palabras_por_trigrama = defaultdict(set)
+        for palabra, trigramas in self._trigramas_palabra.items():
+            for trigrama in trigramas:
+                self._palabras_por_trigrama[trigrama].add(palabra)
+
+    def _coincidencias(self, termino):
+        """
+        Palabras del vocabulario que coinciden con un término y puntuación de cada una.
+
+        Args:
+            termino (str): Término normalizado de la búsqueda
+
+        Returns:
+            dict[str, float]: Palabra -> puntuación de la coincidencia
+        """
+        coincidencias = {}
+
+        # Prefijos (incluye la coincidencia exacta): rango contiguo del vocabulario ordenado
+        inicio = bisect_left(self._vocabulario, termino)
+        for palabra in self._vocabulario[inicio:]:
+            if not palabra.startswith(termino):
+                break
+            coincidencias[palabra] = PUNTAJE_EXACTO if palabra == termino else PUNTAJE_PREFIJO
+
+        # Los términos más cortos que un trigrama no tienen trigramas interiores: se busca
+        # la subcadena recorriendo el vocabulario (por ejemplo "ai" en "hawaii")
+        if len(termino) < 3:
+            for palabra in self._vocabulario:
+                if palabra not in coincidencias and termino in palabra:
+                    coincidencias[palabra] = PUNTAJE_SUBCADENA
+            return coincidencias
+
+        # Candidatas que comparten trigramas con el término (toda palabra que contiene
+        # al término como subcadena comparte sus trigramas interiores)
+        trigramas = _trigramas(termino)
+        compartidos = defaultdict(int)
+        for trigrama in trigramas:
+            for palabra in self._palabras_por_trigrama.get(trigrama, ()):
+                compartidos[palabra] += 1
+
+        for palabra, cantidad in compartidos.items():
+            if palabra in coincidencias:
+                continue
+            if termino in palabra:
+                coincidencias[palabra] = PUNTAJE_SUBCADENA
+                continue
+            similitud = 2 * cantidad / (len(trigramas) + len(self._trigramas_palabra[palabra]))
+            if similitud >= SIMILITUD_MINIMA:
+                coincidencias[palabra] = PUNTAJE_APROXIMADO * similitud
+
+        return coincidencias
+
+    def buscar(self, consulta, limite=None):
+        """
+        Busca aeropuertos. Cada término de la consulta debe coincidir (exacto, prefijo,
+        subcadena o aproximado) con alguna palabra del aeropuerto; la puntuación suma la
+        mejor coincidencia de cada término multiplicada por el peso de su campo.
+
+        Args:
+            consulta (str): Texto de búsqueda
+            limite (int, optional): Cantidad máxima de resultados
+
+        Returns:
+            list[tuple]: (id, puntuación) de los aeropuertos encontrados, de mayor a menor puntuación
+        """
+        terminos = normalizar(consulta).split()
+        if not terminos:
+            return []
+
+        puntajes = None
+        for termino in terminos:
+            mejores = {}
+            for palabra, puntaje in self._coincidencias(termino).items():
+                for fila, peso in self._filas_por_palabra[palabra].items():
+                    valor = puntaje * peso
+                    if valor > mejores.get(fila, 0.0):
+                        mejores[fila] = valor
+            if puntajes is None:
+                puntajes = mejores
+            else:
+                puntajes = {fila: puntajes[fila] + valor for fila, valor in mejores.items() if fila in puntajes}
+            if not puntajes:
+                return []
+
+        # Mayor puntuación primero; a igual puntuación se respeta el orden original
+        orden = sorted(puntajes, key=lambda fila: (-puntajes[fila], fila))
+        if limite is not None:
+            orden = orden[:limite]
+        return [(self.ids[fila], puntajes[fila]) for fila in orden]
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def obtener_indice_busqueda():
+    """
+    Obtiene el índice de búsqueda de los aeropuertos con datos en alguna tabla de flujo
+    (incluye los que no están en la tabla 'total'). Se construye una vez por versión de
+    los datos y se comparte entre todas las sesiones.
+
+    Returns:
+        IndiceBusqueda: Índice de búsqueda
+    """
+    return _obtener_indice_busqueda(versiones_tablas(TABLAS_HECHOS))
+
+
+@cache_medido(st.cache_resource, max_entries=2, show_spinner=False)
+def _obtener_indice_busqueda(versiones):
+    """
+    Implementación cacheada de obtener_indice_busqueda.
+
+    Args:
+        versiones (tuple): Versión de cada tabla de TABLAS_HECHOS (solo forma parte de la clave de caché)
+
+    Returns:
+        IndiceBusqueda: Índice de búsqueda
+    """
+    return IndiceBusqueda(obtener_hechos_por_flujo(TIPOS_DE_FLUJO))
+
+
+def filtrar_por_busqueda(df, consulta, columna_id='airport_id'):
+    """
+    Filtra un DataFrame de aeropuertos con el índice de búsqueda y lo ordena por relevancia.
+
+    Args:
+        df (pd.DataFrame): Aeropuertos, con la columna 'columna_id'
+        consulta (str): Texto de búsqueda
+        columna_id (str): Columna con el id del aeropuerto
+
+    Returns:
+        pd.DataFrame: Aeropuertos encontrados, del más al menos relevante
+    """
+    resultados = obtener_indice_busqueda().buscar(consulta)
+    posiciones = {id_aeropuerto: i for i, (id_aeropuerto, _) in enumerate(resultados)}
+    relevancia = df[columna_id].map(posiciones)
+    return df[relevancia.notna()].iloc[relevancia.dropna().argsort()]
@@ -0,0 +1,191 @@
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.aeropuertos import TABLAS_HECHOS, obtener_hechos_por_flujo
+from utils.database import versiones_tablas
+from utils.formato_largo import anios_pivotados
+from utils.rendimiento import cache_medido, medir
+
+# Umbrales (en %) de las bandas de clasificación, de la más exigente a la menos exigente
+# (configurable con AIRPORTS_UMBRALES_CLASIFICACION, por ejemplo "90,70,60")
+UMBRALES_POR_DEFECTO = (90.0, 70.0, 60.0)
+
+# Nombre de cada banda para el tráfico doméstico y el internacional, en el orden de los umbrales
+ETIQUETAS_BANDAS = [
+    ("Predominantemente Doméstico", "Predominantemente Internacional"),
+    ("Mayormente Doméstico", "Mayormente Internacional"),
+    ("Balanceado-Doméstico", "Balanceado-Internacional"),
+]
+
+# Clasificación de los aeropuertos que no alcanzan ningún umbral
+ETIQUETA_BALANCEADO = "Balanceado"
+
+# Flujos que se comparan: se incluye todo aeropuerto con datos en alguno de los dos
+FLUJOS_PROPORCIONES = ['domestic', 'international']
+
+
+def _leer_umbrales(texto):
+    """
+    Interpreta los umbrales de AIRPORTS_UMBRALES_CLASIFICACION.
+
+    Args:
+        texto (str | None): Umbrales separados por comas (por ejemplo "90,70,60")
+
+    Returns:
+        tuple[float, ...]: Un umbral por banda, de mayor a menor
+    """
+    if not texto:
+        return UMBRALES_POR_DEFECTO
+    try:
+        umbrales = tuple(float(valor) for valor in texto.split(','))
+    except ValueError:
+        umbrales = ()
+    if len(umbrales) != len(ETIQUETAS_BANDAS) or list(umbrales) != sorted(umbrales, reverse=True):
+        print(f"Umbrales de clasificación inválidos ({texto!r}); se usan {UMBRALES_POR_DEFECTO}")
+        return UMBRALES_POR_DEFECTO
+    return umbrales
+
+
+UMBRALES_CLASIFICACION = _leer_umbrales(os.environ.get("AIRPORTS_UMBRALES_CLASIFICACION"))
+
+
+def reglas_clasificacion(umbrales=UMBRALES_CLASIFICACION):
+    """
+    Reglas de clasificación en el orden en que se evalúan: para cada banda primero el
+    tráfico doméstico y luego el internacional; gana la primera regla que se cumple.
+
+    Args:
+        umbrales (tuple[float, ...]): Un umbral por banda, de mayor a menor
+
+    Returns:
+        list[tuple[str, float, str]]: ('domestico' | 'internacional', umbral, clasificación)
+    """
+    reglas = []
+    for umbral, (etiqueta_dom, etiqueta_inter) in zip(umbrales, ETIQUETAS_BANDAS):
+        reglas.append(('domestico', umbral, etiqueta_dom))
+        reglas.append(('internacional', umbral, etiqueta_inter))
+    return reglas
+
+
+def clasificar_trafico(pct_domesticos, pct_internacionales, umbrales=UMBRALES_CLASIFICACION):
+    """
+    Clasifica aeropuertos por tipo de tráfico con np.select sobre los porcentajes,
+    sin recorrer las filas en Python. Acepta arreglos de cualquier forma (por ejemplo
+    una columna por año).
+
+    Args:
+        pct_domesticos (array-like): Porcentaje de pasajeros domésticos
+        pct_internacionales (array-like): Porcentaje de pasajeros internacionales
+        umbrales (tuple[float, ...]): Un umbral por banda, de mayor a menor
+
+    Returns:
+        np.ndarray: Clasificación de cada aeropuerto, con la misma forma que los porcentajes
+    """
+    porcentajes = {
+        'domestico': np.asarray(pct_domesticos, dtype=float),
+        'internacional': np.asarray(pct_internacionales, dtype=float),
+    }
+    reglas = reglas_clasificacion(umbrales)
+    condiciones = [porcentajes[tipo] >= umbral for tipo, umbral, _ in reglas]
+    etiquetas = [etiqueta for _, _, etiqueta in reglas]
+    return np.select(condiciones, etiquetas, default=ETIQUETA_BALANCEADO)
+
+
+def _porcentaje(parte, total):
+    """
+    Porcentaje de 'parte' sobre 'total' redondeado a 2 decimales; si el total es 0
+    es 100% cuando la parte es positiva y 0% en caso contrario.
+
+    Args:
+        parte (np.ndarray): Pasajeros del tipo de tráfico
+        total (np.ndarray): Pasajeros totales
+
+    Returns:
+        np.ndarray: Porcentajes
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.where(total > 0, parte / total * 100, np.where(parte > 0, 100.0, 0.0))
+    return np.round(pct, 2)
+
+
+@medir()
+def calcular_proporciones(df_hechos, anios=None, umbrales=UMBRALES_CLASIFICACION):
+    """
+    Calcula las proporciones de pasajeros domésticos e internacionales y la clasificación
+    de cada aeropuerto para todos los años a la vez, como matrices (aeropuertos x años).
+
+    Args:
+        df_hechos (pd.DataFrame): Tabla de hechos con 'airport_id', 'airport' y las columnas
+            '<año>_domestic' y '<año>_international' (ver obtener_hechos_por_flujo)
+        anios (list[str], optional): Años a calcular (por defecto todos los de la tabla de hechos)
+        umbrales (tuple[float, ...]): Un umbral por banda, de mayor a menor
+
+    Returns:
+        dict[str, pd.DataFrame]: Por año, columnas airport_id, airport, vuelos_domesticos, vuelos_internacionales,
+            total_vuelos, pct_domesticos, pct_internacionales y clasificacion, ordenadas por total_vuelos
+    """
+    if anios is None:
+        anios = anios_pivotados(df_hechos.columns)
+    if df_hechos.empty:
+        return {anio: pd.DataFrame() for anio in anios}
+
+    def matriz(flujo):
+        columnas = [f'{anio}_{flujo}' for anio in anios]
+        valores = df_hechos.reindex(columns=columnas).apply(pd.to_numeric, errors='coerce')
+        return valores.fillna(0).to_numpy(dtype=np.int64)
+
+    domesticos = matriz('domestic')
+    internacionales = matriz('international')
+    totales = domesticos + internacionales
+    pct_domesticos = _porcentaje(domesticos, totales)
+    pct_internacionales = _porcentaje(internacionales, totales)
+    clasificaciones = clasificar_trafico(pct_domesticos, pct_internacionales, umbrales)
+
+    ids = df_hechos['airport_id'].array
+    aeropuertos = df_hechos['airport'].array
+    resultado = {}
+    for i, anio in enumerate(anios):
+        df = pd.DataFrame({
+            'airport_id': ids,
+            'airport': aeropuertos,
+            'vuelos_domesticos': domesticos[:, i],
+            'vuelos_internacionales': internacionales[:, i],
+            'total_vuelos': totales[:, i],
+            'pct_domesticos': pct_domesticos[:, i],
+            'pct_internacionales': pct_internacionales[:, i],
+            'clasificacion': clasificaciones[:, i],
+        })
+        resultado[anio] = df.sort_values('total_vuelos', ascending=False, kind='stable').reset_index(drop=True)
+    return resultado
+
+
+def obtener_proporciones(umbrales=UMBRALES_CLASIFICACION):
+    """
+    Obtiene las proporciones y clasificaciones de todos los años (ver calcular_proporciones)
+    de los aeropuertos con datos domésticos o internacionales, aunque no estén en la
+    tabla 'total'. Quedan en caché por umbrales y solo se recalculan cuando cambia la versión de
+    alguna de las tablas de la tabla de hechos.
+
+    Args:
+        umbrales (tuple[float, ...]): Un umbral por banda, de mayor a menor
+
+    Returns:
+        dict[str, pd.DataFrame]: Proporciones por año
+    """
+    return _obtener_proporciones(tuple(umbrales), versiones_tablas(TABLAS_HECHOS))
+
+
+@cache_medido(st.cache_data, max_entries=8, show_spinner=False)
+def _obtener_proporciones(umbrales, versiones):
+    """
+    Implementación cacheada de obtener_proporciones.
+
+    Args:
+        umbrales (tuple[float, ...]): Un umbral por banda, de mayor a menor
+        versiones (tuple): Versión de cada tabla de TABLAS_HECHOS (solo forma parte de la clave de caché)
+
+    Returns:
+        dict[str, pd.DataFrame]: Proporciones por año
+    """
+    return calcular_proporciones(obtener_hechos_por_flujo(FLUJOS_PROPORCIONES), umbrales=umbrales)
@@ -0,0 +1,66 @@
+import pandas as pd
+from utils.rendimiento import medir
+
+# Columnas de la tabla 'total' que usa la comparativa 2022 vs 2023
+COLUMNAS_COMPARATIVA = [
+    'airport', '2023_rank_total', '2022_rank_total',
+    '2023_enplaned_passengers_total', '2022_enplaned_passengers_total',
+    'percentage_change_2022_2023_total',
+]
+
+# Cantidad de aeropuertos del ranking de la comparativa
+TOP_COMPARATIVA = 20
+
+# Columnas finales de la comparativa, en orden
+COLUMNAS_FINALES = ['Aeropuerto', 'Ranking 2023', 'Pasajeros 2023', 'Pasajeros 2022',
+                    'Cambio Ranking', 'Diferencia Pasajeros', 'Crecimiento (%)']
+
+
+@medir()
+def preparar_comparativa(df, top=TOP_COMPARATIVA):
+    """
+    Prepara la comparativa 2022 vs 2023 a partir de la tabla 'total': renombra las
+    columnas, descarta las filas incompletas y calcula la diferencia de pasajeros
+    y el cambio de ranking.
+
+    Args:
+        df (pd.DataFrame): Tabla 'total' con COLUMNAS_COMPARATIVA (ver obtener_datos)
+        top (int): Cantidad de aeropuertos del ranking
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: Top N por ranking 2023 (columnas COLUMNAS_FINALES)
+            y la tabla completa
+    """
+    df = df.copy()
+
+    # Nombres de las columnas según la base de datos
+    COL_PASAJEROS_2023 = '2023_enplaned_passengers_total'
+    COL_PASAJEROS_2022 = '2022_enplaned_passengers_total'
+    COL_CRECIMIENTO = 'percentage_change_2022_2023_total'
+
+    # 1. Asegurar que las columnas sean numéricas
+    df[COL_PASAJEROS_2023] = pd.to_numeric(df[COL_PASAJEROS_2023], errors='coerce')
+    df[COL_PASAJEROS_2022] = pd.to_numeric(df[COL_PASAJEROS_2022], errors='coerce')
+    df[COL_CRECIMIENTO] = pd.to_numeric(df[COL_CRECIMIENTO], errors='coerce')
+
+    # 2. Renombrar columnas
+    df = df.rename(columns={
+        '2023_rank_total': 'Ranking 2023',
+        '2022_rank_total': 'Ranking 2022',
+        COL_PASAJEROS_2023: 'Pasajeros 2023',
+        COL_PASAJEROS_2022: 'Pasajeros 2022',
+        COL_CRECIMIENTO: 'Crecimiento (%)',
+        'airport': 'Aeropuerto',
+    })
+
+    # 3. Eliminar filas con valores nulos para los cálculos clave
+    df.dropna(subset=['Pasajeros 2023', 'Pasajeros 2022', 'Crecimiento (%)', 'Ranking 2023', 'Ranking 2022'], inplace=True)
+
+    # 4. Cálculos Adicionales
+    df['Diferencia Pasajeros'] = df['Pasajeros 2023'] - df['Pasajeros 2022']
+    df['Cambio Ranking'] = df['Ranking 2022'] - df['Ranking 2023']
+
+    # Top N por ranking 2023
+    df_top = df[df['Ranking 2023'] <= top].sort_values(by='Ranking 2023')[COLUMNAS_FINALES]
+
+    return df_top, df
@@ -0,0 +1,209 @@
+import os
+import pandas as pd
+import streamlit as st
+from utils.database import obtener_cliente, descargar_paginas
+from utils.rendimiento import cache_medido
+
+# Segundos que se guarda en memoria el resultado de cada consulta (configurable con AIRPORTS_QUERY_TTL)
+TTL_CONSULTAS = int(os.environ.get('AIRPORTS_QUERY_TTL', '600'))
+
+# Cantidad de aeropuertos de los rankings "Top N" de la página de consultas
+LIMITE_TOP = 10
+LIMITE_ESTADOS = 5
+
+# Crecimiento porcentual mínimo (exclusivo) de la consulta de crecimiento doméstico
+UMBRAL_CRECIMIENTO = 20
+
+
+def _nombre_relacion(valor, campo='name'):
+    """
+    Extrae un campo de una relación embebida de PostgREST (por ejemplo {'name': 'JFK'}).
+
+    Args:
+        valor (dict | None): Valor de la columna embebida
+        campo (str): Campo que se quiere extraer
+
+    Returns:
+        str | None: Valor del campo o None si la relación no existe
+    """
+    return valor[campo] if valor else None
+
+
+def _a_dataframe(filas, columnas, renombrar=None):
+    """
+    Convierte las filas devueltas por PostgREST en un DataFrame con el nombre del
+    aeropuerto ('airports(name)') expandido en la columna 'name'.
+
+    Args:
+        filas (list[dict]): Filas de la respuesta
+        columnas (list[str]): Columnas del resultado en orden (antes de renombrar)
+        renombrar (dict, optional): Nombres finales de las columnas
+
+    Returns:
+        pd.DataFrame: Resultado listo para mostrar
+    """
+    df = pd.DataFrame(filas)
+    if df.empty:
+        return pd.DataFrame(columns=[(renombrar or {}).get(col, col) for col in columnas])
+
+    if 'airports' in df.columns:
+        df['name'] = df['airports'].apply(_nombre_relacion)
+
+    return df[columnas].rename(columns=renombrar or {}).reset_index(drop=True)
+
+
+@cache_medido(st.cache_data, ttl=TTL_CONSULTAS, show_spinner=False)
+def top_crecimiento_porcentual_domestico(limite=LIMITE_TOP):
+    """
+    Aeropuertos con mayor incremento porcentual de pasajeros domésticos (2023 vs 2022).
+    El orden y el límite se aplican en el servidor: solo viajan 'limite' filas.
+
+    Args:
+        limite (int): Cantidad de aeropuertos
+
+    Returns:
+        pd.DataFrame: Columnas name, 2022_passengers, 2023_passengers, percentage_change
+    """
+    respuesta = (
+        obtener_cliente().table('domestic')
+        .select('airports(name), 2022_enplaned_passengers_dom, 2023_enplaned_passengers_dom, percentage_change_2022_2023_dom')
+        .order('percentage_change_2022_2023_dom', desc=True, nullsfirst=False)
+        .limit(limite)
+        .execute()
+    )
+    return _a_dataframe(
+        respuesta.data,
+        ['name', '2022_enplaned_passengers_dom', '2023_enplaned_passengers_dom', 'percentage_change_2022_2023_dom'],
+        {
+            '2022_enplaned_passengers_dom': '2022_passengers',
+            '2023_enplaned_passengers_dom': '2023_passengers',
+            'percentage_change_2022_2023_dom': 'percentage_change',
+        }
+    )
+
+
+@cache_medido(st.cache_data, ttl=TTL_CONSULTAS, show_spinner=False)
+def top_incremento_absoluto_domestico(limite=LIMITE_TOP):
+    """
+    Aeropuertos con mayor incremento absoluto de pasajeros domésticos (2023 - 2022).
+    'increase' es un campo calculado de PostgREST (sql/campos_calculados.sql), así el
+    servidor puede ordenar por él y devolver solo 'limite' filas.
+
+    Args:
+        limite (int): Cantidad de aeropuertos
+
+    Returns:
+        pd.DataFrame: Columnas name, 2022_passengers, 2023_passengers, increase
+    """
+    respuesta = (
+        obtener_cliente().table('domestic')
+        .select('airports(name), 2022_enplaned_passengers_dom, 2023_enplaned_passengers_dom, increase')
+        .order('increase', desc=True, nullsfirst=False)
+        .limit(limite)
+        .execute()
+    )
+    return _a_dataframe(
+        respuesta.data,
+        ['name', '2022_enplaned_passengers_dom', '2023_enplaned_passengers_dom', 'increase'],
+        {
+            '2022_enplaned_passengers_dom': '2022_passengers',
+            '2023_enplaned_passengers_dom': '2023_passengers',
+        }
+    )
+
+
+@cache_medido(st.cache_data, ttl=TTL_CONSULTAS, show_spinner=False)
+def crecimiento_domestico_mayor_a(umbral=UMBRAL_CRECIMIENTO):
+    """
+    Aeropuertos cuyo tráfico doméstico creció más de 'umbral' por ciento en 2023.
+    El filtro y el orden se aplican en el servidor; el resultado se descarga por páginas.
+
+    Args:
+        umbral (float): Crecimiento porcentual mínimo (exclusivo)
+
+    Returns:
+        pd.DataFrame: Columnas name, 2022_passengers, 2023_passengers, percentage_change_2022_2023_dom
+    """
+    filas = descargar_paginas(
+        'domestic',
+        'id, airports(name), 2022_enplaned_passengers_dom, 2023_enplaned_passengers_dom, percentage_change_2022_2023_dom',
+        filtros=lambda q: q.gt('percentage_change_2022_2023_dom', umbral),
+        orden=[('percentage_change_2022_2023_dom', True)]
+    )
+    return _a_dataframe(
+        filas,
+        ['name', '2022_enplaned_passengers_dom', '2023_enplaned_passengers_dom', 'percentage_change_2022_2023_dom'],
+        {
+            '2022_enplaned_passengers_dom': '2022_passengers',
+            '2023_enplaned_passengers_dom': '2023_passengers',
+        }
+    )
+
+
+@cache_medido(st.cache_data, ttl=TTL_CONSULTAS, show_spinner=False)
+def proporcion_pasajeros_internacionales():
+    """
+    Proporción de los pasajeros internacionales 2023 de cada aeropuerto sobre el total,
+    con la fila 'TOTAL' del ROLLUP al final. El agregado lo calcula la función
+    international_passenger_proportion (sql/funciones_agregadas.sql) en una sola llamada RPC.
+
+    Returns:
+        pd.DataFrame: Columnas airport_name, proportion
+    """
+    respuesta = obtener_cliente().rpc('international_passenger_proportion').execute()
+    return pd.DataFrame(respuesta.data or [], columns=['airport_name', 'proportion'])
+
+
+@cache_medido(st.cache_data, ttl=TTL_CONSULTAS, show_spinner=False)
+def top_estados_pasajeros_totales(limite=LIMITE_ESTADOS):
+    """
+    Estados con mayor número de pasajeros 2023 (domésticos + internacionales).
+    Los JOIN, la suma por estado y el límite los resuelve la función
+    top_states_total_passengers (sql/funciones_agregadas.sql) en una sola llamada RPC.
+
+    Args:
+        limite (int): Cantidad de estados
+
+    Returns:
+        pd.DataFrame: Columnas states, total_passengers
+    """
+    respuesta = obtener_cliente().rpc('top_states_total_passengers', {'limit_count': limite}).execute()
+    return pd.DataFrame(respuesta.data or [], columns=['states', 'total_passengers'])
+
+
+@cache_medido(st.cache_data, ttl=TTL_CONSULTAS, show_spinner=False)
+def aeropuertos_que_mejoraron_ranking():
+    """
+    Aeropuertos cuyo ranking total 2023 es mejor (menor) que el de 2022.
+    La comparación entre columnas usa el campo calculado 'rank_change'
+    (sql/campos_calculados.sql), que el servidor filtra con rank_change > 0.
+
+    Returns:
+        pd.DataFrame: Columnas name, 2022_rank_total, 2023_rank_total
+    """
+    filas = descargar_paginas(
+        'total',
+        'id, airports(name), 2022_rank_total, 2023_rank_total',
+        filtros=lambda q: q.gt('rank_change', 0),
+        orden=[('2023_rank_total', False)]
+    )
+    return _a_dataframe(filas, ['name', '2022_rank_total', '2023_rank_total'])
+
+
+def ejecutar_consulta(consulta, *args, forzar=False):
+    """
+    Ejecuta una consulta predefinida. El resultado queda en caché por consulta y
+    parámetros durante TTL_CONSULTAS segundos, compartido entre todos los usuarios;
+    con 'forzar' se descarta esa entrada y se vuelve a consultar Supabase.
+
+    Args:
+        consulta (callable): Función de consulta de este módulo
+        *args: Parámetros de la consulta
+        forzar (bool): Ignorar el resultado en caché
+
+    Returns:
+        pd.DataFrame: Resultado de la consulta
+    """
+    if forzar:
+        consulta.clear(*args)
+    return consulta(*args)
@@ -1,101 +1,504 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 from dotenv import load_dotenv
-from supabase import create_client, Client
+import httpx
+from supabase import create_client, Client, ClientOptions
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from utils.snapshot import (
+    antiguedad_snapshot, cargar_snapshot, columnas_snapshot, guardar_snapshot, modo_offline, version_snapshot
+)
+from utils.formato_largo import SUFIJOS_FLUJO, anios_en_columnas, columna_ranking
+from utils.rendimiento import cache_medido, etapa
+from utils.supabase_simulado import backend_simulado, crear_cliente_simulado
+from utils.tipos import optimizar_tipos
 
 # Cargar variables de entorno desde archivo .env
 load_dotenv()
 
-# Obtener variables de entorno con valores por defecto
-url: str | None = os.environ.get("SUPABASE_URL")
-key: str | None = os.environ.get("SUPABASE_KEY")
+# Segundos que un snapshot local se considera vigente cuando no se puede comprobar la versión de la tabla
+SNAPSHOT_TTL: float = float(os.environ.get("AIRPORTS_SNAPSHOT_TTL", 24 * 60 * 60))
 
-if url is None or key is None:
-    raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables or .env file")
+# Segundos entre comprobaciones de la versión de cada tabla en Supabase
+VERSION_TTL: float = float(os.environ.get("AIRPORTS_VERSION_TTL", 60))
 
-supabase: Client = create_client(url, key)
+# Filas por página al descargar una tabla (PostgREST limita las filas de cada respuesta)
+TAMANO_PAGINA: int = int(os.environ.get("SUPABASE_PAGE_SIZE", 1000))
 
-@st.cache_data
-def obtener_datos(tabla):
+# Máximo de páginas que se descargan en paralelo
+MAX_DESCARGAS_PARALELAS: int = int(os.environ.get("SUPABASE_MAX_WORKERS", 4))
+
+# Segundos de espera de cada petición HTTP a Supabase
+TIMEOUT_HTTP: float = float(os.environ.get("SUPABASE_TIMEOUT", 120))
+
+
+@cache_medido(st.cache_resource, show_spinner=False)
+def obtener_cliente() -> Client:
+    """
+    Devuelve el cliente de Supabase, que se crea la primera vez que se necesita
+    y se comparte entre todas las sesiones del proceso.
+
+    El cliente usa una sesión HTTP propia con un pool de conexiones keep-alive, de modo
+    que las descargas sucesivas (y las páginas en paralelo) reutilizan las conexiones
+    abiertas en lugar de repetir el handshake TLS en cada petición.
+
+    Con AIRPORTS_FAKE_SUPABASE se devuelve en su lugar el cliente simulado en proceso
+    (ver utils/supabase_simulado.py), que no necesita conexión ni credenciales.
+
+    Returns:
+        Client: Cliente de Supabase
+
+    Raises:
+        ValueError: Si faltan SUPABASE_URL o SUPABASE_KEY
+    """
+    if backend_simulado():
+        return crear_cliente_simulado()
+
+    url: str | None = os.environ.get("SUPABASE_URL")
+    key: str | None = os.environ.get("SUPABASE_KEY")
+
+    if url is None or key is None:
+        raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables or .env file")
+
+    # Conexiones suficientes para varias tablas descargando páginas en paralelo
+    sesion = httpx.Client(
+        timeout=TIMEOUT_HTTP,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=MAX_DESCARGAS_PARALELAS * 4,
+            max_keepalive_connections=MAX_DESCARGAS_PARALELAS * 4,
+            keepalive_expiry=60,
+        ),
+    )
+
+    return create_client(url, key, options=ClientOptions(httpx_client=sesion))
+
+
+# Relaciones embebidas que PostgREST resuelve con JOIN: columna del DataFrame -> texto del 'select'
+RELACIONES = {
+    'domestic': {'airport': 'airports(airport)'},
+    'international': {'airport': 'airports(airport)'},
+    'total': {'airport': 'airports(airport)'},
+    'airports': {'city': 'city(name)', 'state': 'state(name)'},
+}
+
+
+def construir_select(tabla, columnas=None):
+    """
+    Construye el texto del 'select' de PostgREST para una tabla.
+    Sin columnas pide todas ('*') más las relaciones embebidas de la tabla; con columnas
+    pide solo esas, cambiando 'airport', 'city' y 'state' por su relación embebida.
+
+    Args:
+        tabla (str): Nombre de la tabla
+        columnas (list[str], optional): Columnas del DataFrame que se necesitan
+
+    Returns:
+        str: Texto del 'select' (por ejemplo "id, 2023_rank_dom, airports(airport)")
+    """
+    relaciones = RELACIONES.get(tabla, {})
+    if columnas is None:
+        return ", ".join(["*"] + list(relaciones.values()))
+    return ", ".join(relaciones.get(col, col) for col in columnas)
+
+
+def descargar_paginas(tabla, query, tamano_pagina=None, progreso=None, filtros=None, orden=None):
+    """
+    Descarga todas las filas de una tabla por rangos ('range') en lugar de una sola respuesta.
+    La primera página pide el conteo exacto de filas; el resto de páginas se descargan
+    en paralelo con un pool de hilos acotado y se vuelven a unir en orden de 'id'.
+
+    Si el servidor devuelve menos filas que las pedidas (límite 'max-rows' de PostgREST),
+    el tamaño de página se ajusta al real para no dejar huecos entre rangos.
+
+    Args:
+        tabla (str): Nombre de la tabla a consultar
+        query (str): Texto del 'select' de PostgREST
+        tamano_pagina (int, optional): Filas por página (por defecto SUPABASE_PAGE_SIZE)
+        progreso (callable, optional): Función progreso(filas_descargadas, filas_totales)
+        filtros (callable, optional): Función que recibe la consulta y le agrega filtros
+            del lado del servidor (por ejemplo lambda q: q.gt('columna', 20))
+        orden (list[tuple[str, bool]], optional): Columnas (columna, descendente) por las que
+            ordena el servidor antes de 'id'
+
+    Returns:
+        list[dict]: Filas de la tabla en el orden pedido (por defecto en orden de 'id')
+    """
+    tamano = tamano_pagina or TAMANO_PAGINA
+    supabase = obtener_cliente()
+
+    def consulta(**opciones):
+        q = supabase.table(tabla).select(query, **opciones)
+        if filtros:
+            q = filtros(q)
+        for columna, descendente in orden or []:
+            q = q.order(columna, desc=descendente, nullsfirst=False)
+        # 'id' al final deja un orden estable entre páginas
+        return q.order('id')
+
+    primera = consulta(count='exact').range(0, tamano - 1).execute()
+    filas = primera.data or []
+    total = primera.count if primera.count is not None else len(filas)
+
+    if progreso:
+        progreso(len(filas), total)
+
+    # El servidor puede recortar la página a su propio máximo de filas
+    if 0 < len(filas) < tamano:
+        tamano = len(filas)
+
+    inicios = list(range(tamano, total, tamano)) if filas else []
+    if not inicios:
+        return filas
+
+    def descargar_rango(inicio):
+        respuesta = consulta().range(inicio, inicio + tamano - 1).execute()
+        return respuesta.data or []
+
+    paginas = {0: filas}
+    descargadas = len(filas)
+
+    with ThreadPoolExecutor(max_workers=min(MAX_DESCARGAS_PARALELAS, len(inicios))) as pool:
+        futuros = {pool.submit(descargar_rango, inicio): inicio for inicio in inicios}
+        for futuro in as_completed(futuros):
+            paginas[futuros[futuro]] = futuro.result()
+            descargadas += len(paginas[futuros[futuro]])
+            if progreso:
+                progreso(descargadas, total)
+
+    filas = [fila for inicio in sorted(paginas) for fila in paginas[inicio]]
+
+    if len(filas) != total:
+        print(f"Advertencia: la tabla {tabla} devolvió {len(filas)} filas de {total} esperadas")
+
+    return filas
+
+
+def descargar_tabla(tabla, columnas=None, tamano_pagina=None, progreso=None):
     """
-    Obtiene datos de una tabla específica desde Supabase y los devuelve como DataFrame.
+    Descarga una tabla desde Supabase y la devuelve como DataFrame procesado.
     Para tablas 'domestic', 'international' y 'total':
     - Hace JOIN automático con la tabla 'airports' para obtener nombres de aeropuertos
     - Reemplaza 'airport_id' con 'airport_name' (nombre completo del aeropuerto)
     
     Automáticamente:
     - Reordena las columnas: 'id' primero, 'airport_name' segundo, 'airport_id' tercero (si existen)
-    - Ordena las filas por rankings de 2023 (domestic, international, total) o por 'id' (otras tablas)
+    - Ordena las filas por el ranking del año más reciente (domestic, international, total) o por 'id' (otras tablas)
+    
+    Las filas se descargan paginadas y en paralelo con descargar_paginas y se
+    procesan con procesar_filas.
+    Con 'columnas' solo se piden esas columnas al servidor (ver construir_select).
     
     Args:
         tabla (str): Nombre de la tabla a consultar
+        columnas (list[str], optional): Columnas que se necesitan (por defecto todas)
+        tamano_pagina (int, optional): Filas por página
+        progreso (callable, optional): Función progreso(filas_descargadas, filas_totales)
         
     Returns:
         pd.DataFrame: DataFrame con JOIN realizado y columnas reordenadas
+
+    Raises:
+        Exception: Si la consulta a Supabase falla
     """
-    try:
-        # Para tablas que tienen airport_id, hacer JOIN con airports
-        if tabla in ['domestic', 'international', 'total']:
-            query = "*, airports(airport)"
-        elif tabla == 'airports':
-            query = "*, city(name), state(name)"
-        else:
-            query = "*"
-        
-        response = supabase.table(tabla).select(query).execute()
+    # Para tablas que tienen airport_id, hacer JOIN con airports (ver RELACIONES)
+    query = construir_select(tabla, columnas)
+    
+    with etapa(f"descarga {tabla}"):
+        filas = descargar_paginas(tabla, query, tamano_pagina=tamano_pagina, progreso=progreso)
+    with etapa(f"DataFrame {tabla}"):
+        return procesar_filas(tabla, filas)
 
-        if response.data:
-            df = pd.DataFrame(response.data)
-            
-            # Si es una tabla con airport_id, expandir el campo airports
-            if tabla in ['domestic', 'international', 'total']:
-                # Expandir la columna airports para obtener el campo airport
-                df['airport'] = df['airports'].apply(lambda x: x['airport'] if x else None)
-                # Eliminar la columna airports original
-                df = df.drop('airports', axis=1)
-            
-            if tabla == 'airports':
-                df['city'] = df['city'].apply(lambda x: x['name'] if x else None)
-                df['state'] = df['state'].apply(lambda x: x['name'] if x else None)
+
+def procesar_filas(tabla, filas):
+    """
+    Convierte las filas devueltas por PostgREST en el DataFrame de descargar_tabla:
+    expande las relaciones embebidas, reordena las columnas, ordena las filas por
+    ranking y aplica los tipos compactos (ver optimizar_tipos).
+
+    Args:
+        tabla (str): Nombre de la tabla
+        filas (list[dict]): Filas de la respuesta
+
+    Returns:
+        pd.DataFrame: DataFrame procesado (vacío si no hay filas)
+    """
+    if filas:
+        df = pd.DataFrame(filas)
+        
+        # Si es una tabla con airport_id, expandir el campo airports
+        if tabla in ['domestic', 'international', 'total'] and 'airports' in df.columns:
+            # Expandir la columna airports para obtener el campo airport
+            df['airport'] = df['airports'].apply(lambda x: x['airport'] if x else None)
+            # Eliminar la columna airports original
+            df = df.drop('airports', axis=1)
+        
+        if tabla == 'airports':
+            for relacion in ['city', 'state']:
+                if relacion in df.columns:
+                    df[relacion] = df[relacion].apply(lambda x: x['name'] if x else None)
     
-            # Reordenar columnas para que 'id' aparezca primero y 'airport_name' en segunda posición
-            columnas_ordenadas = ['id']
-                
-            # Si existe 'airport_name', agregarlo en segunda posición
-            if tabla == 'total' or tabla == 'domestic' or tabla == 'international' or tabla == 'airports':
-                columnas_ordenadas.append('airport')
-
-            # Agregar columnas de rankings en posición específica
-            if tabla == 'total':
-                if '2023_rank_total' in df.columns:
-                    columnas_ordenadas.append('2023_rank_total')
-                if '2022_rank_total' in df.columns:
-                    columnas_ordenadas.append('2022_rank_total')
-
-            # Agregar el resto de columnas (excluyendo las ya agregadas)
-            columnas_ya_agregadas = ['id', 'airport', 'airport_id', '2023_rank_total', '2022_rank_total', 'city_id', 'state_id']
-            columnas_ordenadas.extend([col for col in df.columns if col not in columnas_ya_agregadas])
-            
-            # Reordenar DataFrame con las columnas en el orden deseado
-            df = df[columnas_ordenadas]
-            
-            # Ordenar por rankings de 2023
-            if tabla == 'domestic':
-                df = df.sort_values('2023_rank_dom').reset_index(drop=True)
-            
-            if tabla == 'international':
-                df = df.sort_values('2023_rank_inter').reset_index(drop=True)
-            
-            if tabla == 'total':
-                df = df.sort_values('2023_rank_total').reset_index(drop=True)
+        # Reordenar columnas para que 'id' aparezca primero y 'airport_name' en segunda posición
+        columnas_ordenadas = ['id']
             
-            return df
-        else:
-            return pd.DataFrame()
+        # Si existe 'airport_name', agregarlo en segunda posición
+        if tabla == 'total' or tabla == 'domestic' or tabla == 'international' or tabla == 'airports':
+            columnas_ordenadas.append('airport')
+
+        # 'airport_id' en tercera posición: es la clave entera para unir las tablas
+        if 'airport_id' in df.columns:
+            columnas_ordenadas.append('airport_id')
+
+        # Años con ranking en las tablas de flujo, del más reciente al más antiguo
+        anios_ranking = anios_en_columnas(df.columns, tabla, 'rank') if tabla in SUFIJOS_FLUJO else []
+
+        # Agregar columnas de rankings en posición específica
+        rankings_total = [columna_ranking(anio, 'total') for anio in anios_ranking] if tabla == 'total' else []
+        columnas_ordenadas.extend(rankings_total)
+
+        # Con columnas seleccionadas algunas de las anteriores pueden no existir
+        columnas_ordenadas = [col for col in columnas_ordenadas if col in df.columns]
+
+        # Agregar el resto de columnas (excluyendo las ya agregadas)
+        columnas_ya_agregadas = ['id', 'airport', 'airport_id', 'city_id', 'state_id'] + rankings_total
+        columnas_ordenadas.extend([col for col in df.columns if col not in columnas_ya_agregadas])
+        
+        # Reordenar DataFrame con las columnas en el orden deseado
+        df = df[columnas_ordenadas]
+        
+        # Ordenar por el ranking del año más reciente
+        if anios_ranking:
+            df = df.sort_values(columna_ranking(anios_ranking[0], tabla)).reset_index(drop=True)
+        
+        # Tipos compactos (texto de Arrow o categoría, int32) en lugar de objetos e int64
+        return optimizar_tipos(df)
+    else:
+        return pd.DataFrame()
+
+
+@cache_medido(st.cache_data, ttl=VERSION_TTL, show_spinner=False)
+def version_tabla(tabla):
+    """
+    Consulta la versión actual de una tabla: cantidad de filas e 'id' máximo.
+    Es una petición mínima (una sola fila con la columna 'id') que detecta inserciones
+    y borrados sin descargar la tabla. El resultado se guarda VERSION_TTL segundos.
+
+    Args:
+        tabla (str): Nombre de la tabla
+
+    Returns:
+        tuple[int, int] | None: (filas, id máximo) o None si no se puede consultar
+    """
+    if modo_offline():
+        return None
+    try:
+        respuesta = (
+            obtener_cliente().table(tabla)
+            .select('id', count='exact')
+            .order('id', desc=True)
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        print(f"Error al consultar la versión de la tabla {tabla}: {e}")
+        return None
+    id_maximo = respuesta.data[0]['id'] if respuesta.data else None
+    return (respuesta.count or 0, id_maximo)
+
+
+def versiones_tablas(tablas):
+    """
+    Devuelve la versión de varias tablas (ver version_tabla), útil como clave de caché
+    de resultados que dependen de ellas.
+
+    Args:
+        tablas (list[str]): Nombres de las tablas
+
+    Returns:
+        tuple: Versión de cada tabla, en el mismo orden
+    """
+    return tuple(version_tabla(tabla) for tabla in tablas)
+
+
+def columnas_tabla(tabla):
+    """
+    Devuelve las columnas de una tabla (sin las relaciones embebidas), por ejemplo para
+    saber qué años tienen datos antes de pedir solo esas columnas. Se consulta una sola
+    fila; la caché se indexa por la versión de la tabla.
+
+    Args:
+        tabla (str): Nombre de la tabla
+
+    Returns:
+        list[str]: Columnas de la tabla (vacía si no se pueden obtener)
+    """
+    return _columnas_tabla(tabla, version_tabla(tabla))
+
+
+@cache_medido(st.cache_data, max_entries=32, show_spinner=False)
+def _columnas_tabla(tabla, version):
+    """
+    Implementación cacheada de columnas_tabla (ver su documentación).
+
+    Args:
+        tabla (str): Nombre de la tabla
+        version (tuple | None): Versión de la tabla (None si no se pudo comprobar)
+
+    Returns:
+        list[str]: Columnas de la tabla
+    """
+    if not modo_offline():
+        try:
+            respuesta = obtener_cliente().table(tabla).select('*').limit(1).execute()
+            if respuesta.data:
+                return list(respuesta.data[0].keys())
+        except Exception as e:
+            print(f"Error al consultar las columnas de la tabla {tabla}: {e}")
+    # Sin conexión (o tabla vacía): las columnas del snapshot
+    return columnas_snapshot(tabla) or []
+
+
+def invalidar_version(tabla):
+    """
+    Descarta la versión guardada de una tabla para que la siguiente lectura la vuelva
+    a comprobar. Si la tabla cambió, solo esa tabla se descarga de nuevo.
+
+    Args:
+        tabla (str): Nombre de la tabla
+    """
+    version_tabla.clear(tabla)
+
+
+def obtener_datos(tabla, columnas=None):
+    """
+    Obtiene datos de una tabla específica y los devuelve como DataFrame.
+    Con 'columnas' solo se descargan (o se leen del snapshot) esas columnas; la caché
+    guarda una entrada por cada combinación de tabla y columnas. La columna 'id' se
+    incluye siempre porque es la que ordena la paginación.
+
+    La caché también se indexa por la versión de la tabla (ver version_tabla): cuando
+    la versión cambia solo se vuelve a descargar esa tabla, y el resto sigue en memoria.
+
+    Los datos se sirven desde el snapshot local (Parquet) cuando su versión coincide
+    con la de Supabase (o, si no se puede comprobar la versión, mientras tenga menos de
+    AIRPORTS_SNAPSHOT_TTL segundos); si no, se descargan con descargar_tabla y se guarda
+    un snapshot nuevo.
+
+    Con AIRPORTS_OFFLINE=1 nunca se consulta Supabase: solo se leen los snapshots.
+    Si Supabase no responde se usa el último snapshot disponible aunque esté vencido.
+    
+    Args:
+        tabla (str): Nombre de la tabla a consultar
+        columnas (list[str], optional): Columnas que se necesitan (por defecto todas)
+        
+    Returns:
+        pd.DataFrame: DataFrame con JOIN realizado y columnas reordenadas
+    """
+    if columnas is not None:
+        columnas = tuple(sorted(set(columnas) | {'id'}))
+    try:
+        return _obtener_datos(tabla, columnas, version_tabla(tabla))
     except Exception as e:
+        # El error no queda en caché: la próxima ejecución vuelve a intentar la descarga.
+        # Mientras tanto se usa el último snapshot aunque esté vencido.
         print(f"Error al obtener datos de la tabla {tabla}: {e}")
-        return pd.DataFrame()
+        df = cargar_snapshot(tabla, columnas)
+        return df if df is not None else pd.DataFrame()
+
+
+# Las entradas de versiones anteriores dejan de usarse; el límite evita que se acumulen
+@cache_medido(st.cache_data, max_entries=64)
+def _obtener_datos(tabla, columnas, version):
+    """
+    Implementación cacheada de obtener_datos (ver su documentación).
+
+    Args:
+        tabla (str): Nombre de la tabla a consultar
+        columnas (tuple[str] | None): Columnas normalizadas (ordenadas, con 'id')
+        version (tuple | None): Versión de la tabla (None si no se pudo comprobar)
+
+    Returns:
+        pd.DataFrame: DataFrame con JOIN realizado y columnas reordenadas
+    """
+    if modo_offline():
+        df = cargar_snapshot(tabla, columnas)
+        if df is None:
+            print(f"Modo offline: no existe snapshot de la tabla {tabla}")
+            return pd.DataFrame()
+        return df
+
+    if version is not None:
+        # Versión conocida: el snapshot sirve mientras sea de la misma versión
+        vigente = version_snapshot(tabla) == version
+    else:
+        antiguedad = antiguedad_snapshot(tabla)
+        vigente = antiguedad is not None and antiguedad < SNAPSHOT_TTL
+
+    if vigente:
+        df = cargar_snapshot(tabla, columnas)
+        if df is not None:
+            return df
+
+    # La barra se crea dentro de la función cacheada para que Streamlit pueda reproducirla
+    barra = None
+
+    def mostrar_progreso(descargadas, total):
+        nonlocal barra
+        if total <= TAMANO_PAGINA:
+            return
+        if barra is None:
+            barra = st.progress(0.0)
+        barra.progress(min(descargadas / total, 1.0), text=f"Descargando {tabla}: {descargadas:,} de {total:,} registros")
+
+    # Si la descarga falla la excepción sale de la función cacheada (Streamlit no guarda
+    # el resultado) y obtener_datos se encarga de usar el snapshot vencido
+    try:
+        df = descargar_tabla(tabla, columnas, progreso=mostrar_progreso)
+    finally:
+        if barra is not None:
+            barra.empty()
+
+    # Solo la tabla completa se guarda como snapshot
+    if not df.empty and columnas is None:
+        try:
+            guardar_snapshot(tabla, df, version)
+        except Exception as e:
+            print(f"Error al guardar el snapshot de la tabla {tabla}: {e}")
+
+    return df
+
+
+def obtener_varias_tablas(tablas, columnas=None):
+    """
+    Obtiene varias tablas a la vez y las devuelve en un diccionario.
+    Cada tabla pasa por obtener_datos (y su caché), pero las que no estén en caché
+    se cargan en paralelo en un pool de hilos: el tiempo de carga en frío de una página
+    es el de la tabla más lenta y no la suma de todas.
+
+    Args:
+        tablas (list[str]): Nombres de las tablas a consultar
+        columnas (dict[str, list[str]], optional): Columnas que se necesitan de cada tabla
+            (las tablas que no aparecen se piden completas)
+
+    Returns:
+        dict[str, pd.DataFrame]: DataFrame de cada tabla, con el nombre de la tabla como clave
+    """
+    tablas = list(dict.fromkeys(tablas))
+    if not tablas:
+        return {}
+
+    # Los hilos necesitan el contexto de la sesión para usar la caché y los elementos de Streamlit
+    ctx = get_script_run_ctx()
+
+    def cargar(tabla):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return tabla, obtener_datos(tabla, (columnas or {}).get(tabla))
+
+    with ThreadPoolExecutor(max_workers=len(tablas)) as pool:
+        return dict(pool.map(cargar, tablas))
 
 # ========== AQUÍ AGREGA LA NUEVA FUNCIÓN ==========
 def ejecutar_query_sql(query_sql):
@@ -112,7 +515,7 @@ def ejecutar_query_sql(query_sql):
     """
     try:
         # Esto ejecuta el query REAL en tu base de datos
-        response = supabase.raw(query_sql).execute()
+        response = obtener_cliente().raw(query_sql).execute()
         return pd.DataFrame(response.data)
     except Exception as e:
         print(f"Error ejecutando query: {e}")
@@ -0,0 +1,171 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy import stats
+from utils.rendimiento import medir
+
+# Estadísticas que calcula el motor, en el orden de las columnas del resultado
+ESTADISTICAS = ['count', 'mean', 'std', 'min', 'q25', 'median', 'q75', 'max', 'skewness', 'kurtosis', 'cv']
+
+# Puntos de la grilla de cuantiles de los gráficos Q-Q (configurable con AIRPORTS_QQ_PUNTOS)
+PUNTOS_QQ: int = int(os.environ.get("AIRPORTS_QQ_PUNTOS", 200))
+
+# Probabilidades extremas de la grilla Q-Q y ancho de cada cola que se refina
+PROBABILIDAD_MINIMA_QQ = 0.01
+PROBABILIDAD_MAXIMA_QQ = 0.99
+ANCHO_COLA_QQ = 0.04
+
+
+def estadisticas_matriz(matriz):
+    """
+    Calcula las estadísticas descriptivas de cada columna de una matriz en una sola
+    pasada vectorizada. Los NaN se ignoran, de modo que columnas de distinto largo
+    se pueden apilar rellenando con NaN.
+
+    Los resultados coinciden con los de pandas: desviación estándar muestral (ddof=1),
+    cuantiles con interpolación lineal, asimetría y curtosis (exceso) ajustadas como
+    Series.skew y Series.kurtosis.
+
+    Args:
+        matriz (np.ndarray): Matriz 2D de valores (filas = observaciones, columnas = variables)
+
+    Returns:
+        dict[str, np.ndarray]: Un arreglo por estadística (ver ESTADISTICAS), con un valor por columna
+    """
+    matriz = np.asarray(matriz, dtype=float)
+    validos = ~np.isnan(matriz)
+    n = validos.sum(axis=0).astype(float)
+    columnas_vacias = n == 0
+
+    # Las columnas vacías se calculan sobre ceros y se marcan como NaN al final (evita avisos de NumPy)
+    segura = np.where(validos, matriz, 0.0)
+    n_seguro = np.where(columnas_vacias, 1.0, n)
+
+    media = segura.sum(axis=0) / n_seguro
+    desvios = np.where(validos, matriz - media, 0.0)
+    cuadrados = desvios * desvios
+    m2 = cuadrados.sum(axis=0)
+    m3 = (cuadrados * desvios).sum(axis=0)
+    m4 = (cuadrados * cuadrados).sum(axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(m2 / (n - 1))
+
+        # Asimetría de Fisher-Pearson ajustada (como pandas); 0 si la columna es constante
+        asimetria = n * np.sqrt(n - 1) / (n - 2) * m3 / m2 ** 1.5
+        asimetria = np.where(m2 == 0, 0.0, asimetria)
+        asimetria = np.where(n < 3, np.nan, asimetria)
+
+        # Exceso de curtosis ajustado (como pandas); 0 si la columna es constante
+        curtosis = (
+            n * (n + 1) * (n - 1) * m4 / ((n - 2) * (n - 3) * m2 ** 2)
+            - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        )
+        curtosis = np.where(m2 == 0, 0.0, curtosis)
+        curtosis = np.where(n < 4, np.nan, curtosis)
+
+        # Coeficiente de variación en porcentaje; 0 si la media es 0
+        cv = np.where(media != 0, std / media * 100, 0.0)
+
+    # Los NaN se ordenan al final: el cuantil de cada columna se interpola entre sus n valores
+    ordenada = np.sort(matriz, axis=0)
+    cuantiles = {}
+    for nombre, q in (('min', 0.0), ('q25', 0.25), ('median', 0.5), ('q75', 0.75), ('max', 1.0)):
+        posicion = q * np.maximum(n - 1, 0)
+        inferior = np.floor(posicion).astype(int)
+        superior = np.ceil(posicion).astype(int)
+        fraccion = posicion - inferior
+        columnas = np.arange(matriz.shape[1])
+        valor_inferior = ordenada[inferior, columnas] if len(ordenada) else np.full(matriz.shape[1], np.nan)
+        valor_superior = ordenada[superior, columnas] if len(ordenada) else np.full(matriz.shape[1], np.nan)
+        cuantiles[nombre] = valor_inferior + (valor_superior - valor_inferior) * fraccion
+
+    resultado = {
+        'count': n,
+        'mean': media,
+        'std': std,
+        **cuantiles,
+        'skewness': asimetria,
+        'kurtosis': curtosis,
+        'cv': cv,
+    }
+    for nombre in ESTADISTICAS:
+        if nombre != 'count':
+            resultado[nombre] = np.where(columnas_vacias, np.nan, resultado[nombre])
+    return resultado
+
+
+@medir()
+def tabla_estadisticas(df, columnas=None, solo_no_negativos=False):
+    """
+    Calcula las estadísticas descriptivas de varias columnas de un DataFrame
+    (ver estadisticas_matriz) y las devuelve como tabla.
+
+    Args:
+        df (pd.DataFrame): Datos de entrada
+        columnas (list[str], optional): Columnas a analizar (por defecto todas las numéricas)
+        solo_no_negativos (bool): Ignorar los valores negativos, como los nulos
+
+    Returns:
+        pd.DataFrame: Una fila por columna analizada y una columna por estadística
+    """
+    if columnas is None:
+        columnas = df.select_dtypes('number').columns.tolist()
+    columnas = [col for col in columnas if col in df.columns]
+
+    matriz = df[columnas].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    if solo_no_negativos:
+        matriz = np.where(matriz >= 0, matriz, np.nan)
+
+    return pd.DataFrame(estadisticas_matriz(matriz), index=columnas)[ESTADISTICAS]
+
+
+def grilla_qq(n, puntos=PUNTOS_QQ, refinar_colas=True):
+    """
+    Probabilidades en las que se evalúa un gráfico Q-Q de n datos.
+    Con n <= puntos es la grilla de siempre (una probabilidad por dato); con más datos
+    se usa una grilla fija de 'puntos' probabilidades, así el costo del gráfico no
+    depende del tamaño de la tabla. Con 'refinar_colas' se agregan puntos en las colas
+    (el primer y último 4%), que es donde se ve el alejamiento de la normal.
+
+    Args:
+        n (int): Cantidad de datos
+        puntos (int): Puntos de la grilla
+        refinar_colas (bool): Densificar la grilla en las colas
+
+    Returns:
+        np.ndarray: Probabilidades ordenadas entre 0.01 y 0.99
+    """
+    if n <= puntos:
+        return np.linspace(PROBABILIDAD_MINIMA_QQ, PROBABILIDAD_MAXIMA_QQ, n)
+
+    grilla = np.linspace(PROBABILIDAD_MINIMA_QQ, PROBABILIDAD_MAXIMA_QQ, puntos)
+    if refinar_colas:
+        puntos_cola = max(puntos // 4, 2)
+        grilla = np.concatenate([
+            grilla,
+            np.linspace(PROBABILIDAD_MINIMA_QQ, PROBABILIDAD_MINIMA_QQ + ANCHO_COLA_QQ, puntos_cola),
+            np.linspace(PROBABILIDAD_MAXIMA_QQ - ANCHO_COLA_QQ, PROBABILIDAD_MAXIMA_QQ, puntos_cola),
+        ])
+    return np.unique(grilla)
+
+
+@medir()
+def cuantiles_qq(valores, puntos=PUNTOS_QQ, refinar_colas=True):
+    """
+    Calcula los cuantiles de un gráfico Q-Q contra una normal con la media y la
+    desviación estándar (poblacional) de los datos, sobre la grilla de grilla_qq.
+
+    Args:
+        valores (array-like): Datos sin nulos
+        puntos (int): Puntos de la grilla
+        refinar_colas (bool): Densificar la grilla en las colas
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Cuantiles teóricos (normal) y cuantiles muestrales
+    """
+    valores = np.asarray(valores, dtype=float)
+    probabilidades = grilla_qq(len(valores), puntos, refinar_colas)
+    muestrales = np.percentile(valores, probabilidades * 100)
+    teoricos = stats.norm.ppf(probabilidades, loc=np.mean(valores), scale=np.std(valores))
+    return teoricos, muestrales
@@ -0,0 +1,78 @@
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Filas que se convierten a CSV por bloque (configurable con AIRPORTS_EXPORT_CHUNK_ROWS)
+FILAS_POR_BLOQUE: int = int(os.environ.get("AIRPORTS_EXPORT_CHUNK_ROWS", 50000))
+
+# Formatos de descarga: nombre para mostrar, extensión, tipo MIME y compresión del flujo de salida
+FORMATOS_EXPORTACION = {
+    'csv': {'nombre': 'CSV', 'extension': '.csv', 'mime': 'text/csv', 'compresion': None},
+    'csv.gz': {'nombre': 'CSV comprimido (gzip)', 'extension': '.csv.gz', 'mime': 'application/gzip', 'compresion': 'gzip'},
+    'csv.zst': {'nombre': 'CSV comprimido (zstd)', 'extension': '.csv.zst', 'mime': 'application/zstd', 'compresion': 'zstd'},
+    'parquet': {'nombre': 'Parquet', 'extension': '.parquet', 'mime': 'application/vnd.apache.parquet', 'compresion': None},
+}
+
+
+def escribir_csv(df, destino, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Escribe un DataFrame como CSV por bloques de filas, de modo que nunca se arma
+    un str con el texto de toda la tabla (como hace df.to_csv() sin destino). Si el
+    destino comprime, tampoco se guarda el texto sin comprimir.
+
+    Args:
+        df (pd.DataFrame): Datos a exportar
+        destino: Flujo binario con método write (archivo, pa.NativeFile, ...)
+        filas_por_bloque (int): Filas que se convierten a texto por vez
+    """
+    filas_por_bloque = max(1, filas_por_bloque)
+    for inicio in range(0, max(len(df), 1), filas_por_bloque):
+        bloque = df.iloc[inicio:inicio + filas_por_bloque]
+        destino.write(bloque.to_csv(index=False, header=(inicio == 0)).encode('utf-8'))
+
+
+def exportar_dataframe(df, formato='csv', filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Genera el archivo de descarga de un DataFrame en el formato pedido.
+
+    El CSV se escribe por bloques y, si el formato es comprimido, pasa por un flujo de
+    compresión de pyarrow (gzip o zstd) a medida que se genera: en memoria queda el
+    archivo ya comprimido y no el texto completo. El Parquet se escribe con grupos de
+    'filas_por_bloque' filas y compresión zstd.
+
+    Args:
+        df (pd.DataFrame): Datos a exportar
+        formato (str): Clave de FORMATOS_EXPORTACION
+        filas_por_bloque (int): Filas por bloque de CSV o por grupo de filas de Parquet
+
+    Returns:
+        bytes: Contenido del archivo
+    """
+    compresion = FORMATOS_EXPORTACION[formato]['compresion']
+    with pa.BufferOutputStream() as salida:
+        if formato == 'parquet':
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            pq.write_table(tabla, salida, row_group_size=max(1, filas_por_bloque), compression='zstd')
+        elif compresion:
+            # Al cerrarse escribe el final del formato comprimido (y cierra 'salida')
+            with pa.CompressedOutputStream(salida, compresion) as destino:
+                escribir_csv(df, destino, filas_por_bloque)
+        else:
+            escribir_csv(df, salida, filas_por_bloque)
+        contenido = salida.getvalue()
+    return contenido.to_pybytes()
+
+
+def descarga_diferida(df, formato='csv'):
+    """
+    Función sin argumentos para st.download_button(data=...): el archivo solo se genera
+    cuando el usuario hace clic en descargar, y no en cada recarga de la página.
+
+    Args:
+        df (pd.DataFrame): Datos a exportar
+        formato (str): Clave de FORMATOS_EXPORTACION
+
+    Returns:
+        callable: Función que devuelve el contenido del archivo
+    """
+    return lambda: exportar_dataframe(df, formato)
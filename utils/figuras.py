@@ -0,0 +1,116 @@
+import os
+import threading
+from collections import OrderedDict
+import plotly.io as pio
+import streamlit as st
+from utils.database import versiones_tablas
+from utils.rendimiento import cache_medido, etapa, registrar_cache
+
+# Máximo de figuras (o grupos de figuras) guardadas en memoria (configurable con AIRPORTS_FIGURE_CACHE_SIZE)
+MAX_FIGURAS: int = int(os.environ.get("AIRPORTS_FIGURE_CACHE_SIZE", 128))
+
+
+class CacheFiguras:
+    """
+    Caché LRU de figuras de Plotly serializadas como JSON.
+
+    Se guarda el JSON (y no el objeto Figure) para que cada sesión reciba una figura
+    nueva que puede modificar sin afectar a las demás. Al superar 'max_entradas'
+    se descarta la figura usada hace más tiempo.
+    """
+
+    def __init__(self, max_entradas=MAX_FIGURAS):
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        """
+        Devuelve el JSON guardado para una clave y la marca como usada recientemente.
+
+        Args:
+            clave (tuple): Clave de la figura
+
+        Returns:
+            str | dict[str, str] | None: JSON de la figura (o de cada figura de un grupo) o None
+        """
+        with self._lock:
+            if clave not in self._entradas:
+                return None
+            self._entradas.move_to_end(clave)
+            return self._entradas[clave]
+
+    def guardar(self, clave, valor):
+        """
+        Guarda el JSON de una figura y descarta las más antiguas si se supera el máximo.
+
+        Args:
+            clave (tuple): Clave de la figura
+            valor (str | dict[str, str]): JSON de la figura (o de cada figura de un grupo)
+        """
+        with self._lock:
+            self._entradas[clave] = valor
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def limpiar(self):
+        """Descarta todas las figuras guardadas."""
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+@cache_medido(st.cache_resource, show_spinner=False)
+def obtener_cache_figuras():
+    """
+    Devuelve la caché de figuras, compartida entre todas las sesiones del proceso.
+
+    Returns:
+        CacheFiguras: Caché de figuras
+    """
+    return CacheFiguras()
+
+
+def figura_en_cache(clave, construir, tablas=()):
+    """
+    Devuelve la figura de una clave desde la caché o la construye y la guarda.
+
+    La clave debe incluir la página y todos los parámetros que cambian la figura
+    (flujo, año, orden, N, ...). Con 'tablas' también se agrega la versión de esas
+    tablas (ver version_tabla), así la figura se reconstruye cuando cambian los datos.
+
+    'construir' puede devolver una figura o un diccionario de figuras; si devuelve
+    None (por ejemplo, porque no hay datos) no se guarda nada.
+
+    Args:
+        clave (tuple): Página y parámetros de la figura
+        construir (callable): Función sin argumentos que crea la figura
+        tablas (list[str], optional): Tablas de las que dependen los datos de la figura
+
+    Returns:
+        go.Figure | dict[str, go.Figure] | None: Figura (o figuras) lista para st.plotly_chart
+    """
+    cache = obtener_cache_figuras()
+    clave = (*clave, versiones_tablas(tablas)) if tablas else tuple(clave)
+
+    guardado = cache.obtener(clave)
+    registrar_cache('figuras.figura_en_cache', acierto=guardado is not None)
+    if guardado is None:
+        with etapa(f"figura {clave[0]}"):
+            figura = construir()
+        if figura is None:
+            return None
+        with etapa("Plotly to_json"):
+            if isinstance(figura, dict):
+                cache.guardar(clave, {nombre: fig.to_json() for nombre, fig in figura.items()})
+            else:
+                cache.guardar(clave, figura.to_json())
+        return figura
+
+    with etapa("Plotly from_json"):
+        if isinstance(guardado, dict):
+            return {nombre: pio.from_json(texto) for nombre, texto in guardado.items()}
+        return pio.from_json(guardado)
@@ -0,0 +1,253 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Tipos de flujo de la base de datos y sufijo de sus columnas
+TIPOS_DE_FLUJO = ['total', 'domestic', 'international']
+SUFIJOS_FLUJO = {
+    'total': 'total',
+    'domestic': 'dom',
+    'international': 'inter',
+}
+
+# Columnas de la tabla de hechos en formato largo: una fila por aeropuerto, año y flujo
+COLUMNAS_LARGAS = ['airport_id', 'year', 'flow', 'passengers', 'rank']
+
+# Columnas anchas de la base de datos: '<año>_enplaned_passengers_<sufijo>' y '<año>_rank_<sufijo>'
+PATRON_COLUMNA = re.compile(r'^(\d{4})_(enplaned_passengers|rank)_(\w+)$')
+
+
+def columna_pasajeros(anio, flujo):
+    """
+    Nombre de la columna de pasajeros de un año en la tabla de un flujo.
+
+    Args:
+        anio (str | int): Año
+        flujo (str): Tipo de flujo
+
+    Returns:
+        str: Por ejemplo '2023_enplaned_passengers_dom'
+    """
+    return f'{anio}_enplaned_passengers_{SUFIJOS_FLUJO[flujo]}'
+
+
+def columna_ranking(anio, flujo):
+    """
+    Nombre de la columna de ranking de un año en la tabla de un flujo.
+
+    Args:
+        anio (str | int): Año
+        flujo (str): Tipo de flujo
+
+    Returns:
+        str: Por ejemplo '2022_rank_total'
+    """
+    return f'{anio}_rank_{SUFIJOS_FLUJO[flujo]}'
+
+
+def anios_en_columnas(columnas, flujo, medida='enplaned_passengers'):
+    """
+    Años que tienen columna de pasajeros (o de ranking) en la tabla de un flujo,
+    del más reciente al más antiguo.
+
+    Args:
+        columnas (list[str]): Columnas de la tabla
+        flujo (str): Tipo de flujo
+        medida (str): 'enplaned_passengers' o 'rank'
+
+    Returns:
+        list[str]: Años (por ejemplo ['2023', '2022'])
+    """
+    sufijo = SUFIJOS_FLUJO[flujo]
+    anios = set()
+    for columna in (columnas if columnas is not None else []):
+        coincidencia = PATRON_COLUMNA.match(columna)
+        if coincidencia and coincidencia.group(2) == medida and coincidencia.group(3) == sufijo:
+            anios.add(coincidencia.group(1))
+    return sorted(anios, reverse=True)
+
+
+def a_formato_largo(df, flujo):
+    """
+    Convierte la tabla ancha de un flujo (una columna de pasajeros y otra de ranking
+    por año) en filas (airport_id, year, flow, passengers, rank), sin bucles por fila.
+
+    Args:
+        df (pd.DataFrame): Tabla 'total', 'domestic' o 'international' con 'airport_id'
+        flujo (str): Tipo de flujo de la tabla
+
+    Returns:
+        pd.DataFrame: Tabla larga con COLUMNAS_LARGAS (vacía si no hay años)
+    """
+    anios = anios_en_columnas(df.columns, flujo)
+    if df.empty or 'airport_id' not in df.columns or not anios:
+        return pd.DataFrame(columns=COLUMNAS_LARGAS)
+
+    n = len(df)
+    pasajeros = np.column_stack([
+        pd.to_numeric(df[columna_pasajeros(anio, flujo)], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        for anio in anios
+    ])
+    rankings = np.column_stack([
+        pd.to_numeric(df[columna_ranking(anio, flujo)], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        if columna_ranking(anio, flujo) in df.columns else np.full(n, np.nan)
+        for anio in anios
+    ])
+
+    # Orden de las filas: por aeropuerto y, dentro de cada uno, por año (de la matriz aeropuertos x años)
+    return pd.DataFrame({
+        'airport_id': np.repeat(df['airport_id'].to_numpy(), len(anios)),
+        'year': np.tile(np.array(anios, dtype=np.int16), n),
+        'flow': flujo,
+        'passengers': pasajeros.ravel(),
+        'rank': rankings.ravel(),
+    })
+
+
+def unir_flujos(tablas):
+    """
+    Une las tablas largas de varios flujos en una sola tabla de hechos larga.
+
+    Args:
+        tablas (dict[str, pd.DataFrame]): Tabla ancha de cada flujo ('total', 'domestic', 'international')
+
+    Returns:
+        pd.DataFrame: Tabla larga con 'flow' como categoría
+    """
+    partes = [a_formato_largo(df, flujo) for flujo, df in tablas.items() if df is not None]
+    partes = [parte for parte in partes if not parte.empty]
+    if not partes:
+        return pd.DataFrame(columns=COLUMNAS_LARGAS)
+
+    largo = pd.concat(partes, ignore_index=True)
+    largo['flow'] = pd.Categorical(largo['flow'], categories=TIPOS_DE_FLUJO)
+    largo['year'] = largo['year'].astype(np.int16)
+    return largo
+
+
+def anios_disponibles(largo):
+    """
+    Años presentes en una tabla larga, del más reciente al más antiguo.
+
+    Args:
+        largo (pd.DataFrame): Tabla de hechos larga
+
+    Returns:
+        list[str]: Años
+    """
+    if largo.empty:
+        return []
+    return [str(anio) for anio in sorted(pd.unique(largo['year']), reverse=True)]
+
+
+def pivotar(largo, valor='passengers', anios=None, flujos=None, ids=None):
+    """
+    Convierte una tabla larga en una tabla ancha con una columna '<año>_<flujo>' por
+    combinación pedida. Cada valor se copia directamente a su celda (sin groupby ni
+    pivot_table), así que el costo es lineal en las filas de la tabla larga.
+
+    Args:
+        largo (pd.DataFrame): Tabla de hechos larga
+        valor (str): Columna que se reparte ('passengers' o 'rank')
+        anios (list[str], optional): Años (por defecto todos, del más reciente al más antiguo)
+        flujos (list[str], optional): Flujos (por defecto TIPOS_DE_FLUJO)
+        ids (array-like, optional): 'airport_id' de las filas del resultado, en orden
+            (por defecto los de la tabla larga en orden de aparición)
+
+    Returns:
+        pd.DataFrame: Indexado por 'airport_id'; NaN donde no hay dato
+    """
+    anios = [str(anio) for anio in (anios if anios is not None else anios_disponibles(largo))]
+    flujos = list(flujos if flujos is not None else TIPOS_DE_FLUJO)
+    columnas = [f'{anio}_{flujo}' for anio in anios for flujo in flujos]
+
+    if ids is None:
+        ids = pd.unique(largo['airport_id'])
+    ids = pd.Index(ids, name='airport_id')
+    matriz = np.full((len(ids), len(columnas)), np.nan)
+
+    if not largo.empty and columnas:
+        filas = ids.get_indexer(largo['airport_id'])
+        posicion_anio = pd.Index([int(anio) for anio in anios]).get_indexer(largo['year'])
+        posicion_flujo = pd.Index(flujos).get_indexer(largo['flow'].astype(object))
+        validas = (filas >= 0) & (posicion_anio >= 0) & (posicion_flujo >= 0)
+        celdas = posicion_anio * len(flujos) + posicion_flujo
+        matriz[filas[validas], celdas[validas]] = largo[valor].to_numpy(dtype=float, na_value=np.nan)[validas]
+
+    return pd.DataFrame(matriz, index=ids, columns=columnas)
+
+
+def anios_pivotados(columnas):
+    """
+    Años de las columnas '<año>_<flujo>' de una tabla generada con pivotar, del más
+    reciente al más antiguo.
+
+    Args:
+        columnas (list[str]): Columnas de la tabla
+
+    Returns:
+        list[str]: Años
+    """
+    anios = set()
+    for columna in columnas:
+        anio, _, flujo = str(columna).partition('_')
+        if anio.isdigit() and len(anio) == 4 and flujo in TIPOS_DE_FLUJO:
+            anios.add(anio)
+    return sorted(anios, reverse=True)
+
+
+def cambio_porcentual(base, final):
+    """
+    Cambio porcentual de 'base' a 'final'; si la base es 0 o falta no se puede
+    calcular y queda en 0.
+
+    Args:
+        base (array-like): Valores del año base
+        final (array-like): Valores del año final
+
+    Returns:
+        np.ndarray: Cambio porcentual
+    """
+    base = np.asarray(base, dtype=float)
+    final = np.asarray(final, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cambio = (final - base) / np.where(base != 0, base, np.nan) * 100
+    return np.nan_to_num(cambio, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def variacion_interanual(largo, anio_base, anio_final, flujos=None, ids=None):
+    """
+    Métricas interanuales de cualquier par de años, para cada flujo:
+    - 'cambio_<flujo>_pct': cambio porcentual de pasajeros (0 si no se puede calcular)
+    - 'diferencia_<flujo>': pasajeros del año final menos los del año base
+    - 'cambio_ranking_<flujo>': puestos ganados en el ranking (positivo si mejoró)
+
+    Las columnas son siempre las mismas, sin importar cuántos años haya en los datos.
+
+    Args:
+        largo (pd.DataFrame): Tabla de hechos larga
+        anio_base (str | int): Año de referencia
+        anio_final (str | int): Año que se compara
+        flujos (list[str], optional): Flujos (por defecto TIPOS_DE_FLUJO)
+        ids (array-like, optional): 'airport_id' de las filas del resultado, en orden
+
+    Returns:
+        pd.DataFrame: Indexado por 'airport_id'
+    """
+    flujos = list(flujos if flujos is not None else TIPOS_DE_FLUJO)
+    anios = [str(anio_base), str(anio_final)]
+    # Si los dos años son el mismo se pivota una sola vez (las métricas quedan en 0)
+    distintos = list(dict.fromkeys(anios))
+    pasajeros = pivotar(largo, 'passengers', distintos, flujos, ids)
+    rankings = pivotar(largo, 'rank', distintos, flujos, pasajeros.index)
+
+    columnas = {}
+    for flujo in flujos:
+        base = pasajeros[f'{anios[0]}_{flujo}'].to_numpy()
+        final = pasajeros[f'{anios[1]}_{flujo}'].to_numpy()
+        columnas[f'cambio_{flujo}_pct'] = cambio_porcentual(base, final)
+        columnas[f'diferencia_{flujo}'] = final - base
+        columnas[f'cambio_ranking_{flujo}'] = (
+            rankings[f'{anios[0]}_{flujo}'].to_numpy() - rankings[f'{anios[1]}_{flujo}'].to_numpy()
+        )
+    return pd.DataFrame(columnas, index=pasajeros.index)
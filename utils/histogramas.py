@@ -0,0 +1,162 @@
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from utils.rendimiento import cache_medido
+
+# Reglas para elegir los intervalos de los histogramas (clave -> nombre para mostrar)
+REGLAS_INTERVALOS = {
+    'fd': 'Freedman–Diaconis',
+    'sturges': 'Sturges',
+    'log': 'Logarítmica',
+}
+
+# Tope de intervalos de un histograma (Freedman–Diaconis puede pedir miles con colas largas)
+MAX_INTERVALOS = 200
+
+
+def _cantidad_intervalos(valores, regla):
+    """
+    Cantidad de intervalos según la regla de Freedman–Diaconis o la de Sturges.
+
+    Args:
+        valores (np.ndarray): Datos sin nulos
+        regla (str): 'fd' o 'sturges'
+
+    Returns:
+        int: Cantidad de intervalos (entre 1 y MAX_INTERVALOS)
+    """
+    n = len(valores)
+    rango = valores.max() - valores.min() if n else 0
+    if n < 2 or rango == 0:
+        return 1
+
+    sturges = int(np.ceil(np.log2(n))) + 1
+    if regla == 'sturges':
+        return min(sturges, MAX_INTERVALOS)
+
+    # Freedman–Diaconis: ancho = 2 * IQR / n^(1/3); si el IQR es 0 se usa Sturges
+    q25, q75 = np.percentile(valores, [25, 75])
+    if q75 == q25:
+        return min(sturges, MAX_INTERVALOS)
+    ancho = 2 * (q75 - q25) / np.cbrt(n)
+    return int(min(max(np.ceil(rango / ancho), 1), MAX_INTERVALOS))
+
+
+def _bordes_redondos(minimo, maximo, cantidad):
+    """
+    Bordes de unos 'cantidad' intervalos de ancho "redondo" (1, 2, 2.5 o 5 por una
+    potencia de 10), alineados a múltiplos del ancho, como los que elige Plotly con nbins.
+
+    Args:
+        minimo (float): Valor mínimo de los datos
+        maximo (float): Valor máximo de los datos
+        cantidad (int): Cantidad aproximada de intervalos
+
+    Returns:
+        np.ndarray: Bordes de los intervalos
+    """
+    if maximo == minimo:
+        return np.array([minimo - 0.5, maximo + 0.5])
+
+    ancho_bruto = (maximo - minimo) / cantidad
+    potencia = 10 ** np.floor(np.log10(ancho_bruto))
+    ancho = next(m * potencia for m in (1, 2, 2.5, 5, 10) if m * potencia >= ancho_bruto)
+
+    inicio = np.floor(minimo / ancho) * ancho
+    fin = np.floor(maximo / ancho) * ancho + ancho
+    return np.arange(round((fin - inicio) / ancho) + 1) * ancho + inicio
+
+
+@cache_medido(st.cache_data, show_spinner=False)
+def calcular_histograma(valores, regla='fd'):
+    """
+    Agrupa los valores en intervalos con NumPy y devuelve solo los conteos y bordes,
+    de modo que el gráfico envía al navegador un dato por intervalo y no uno por fila.
+    El resultado queda en caché por columna y regla.
+
+    Reglas:
+    - 'fd': Freedman–Diaconis (ancho según el rango intercuartílico)
+    - 'sturges': Sturges (log2(n) + 1 intervalos)
+    - 'log': intervalos de ancho constante en escala logarítmica, para datos con cola
+      larga como los pasajeros; los ceros se cuentan en el primer intervalo
+    - un entero: esa cantidad aproximada de intervalos de ancho redondo
+
+    Args:
+        valores (pd.Series | np.ndarray): Datos (los nulos se ignoran)
+        regla (str | int): Regla de intervalos
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Conteos de cada intervalo y bordes (uno más que conteos)
+    """
+    valores = np.asarray(valores, dtype=float)
+    valores = valores[~np.isnan(valores)]
+    if len(valores) == 0:
+        return np.array([], dtype=int), np.array([0.0])
+
+    if isinstance(regla, (int, np.integer)):
+        bordes = _bordes_redondos(valores.min(), valores.max(), regla)
+        return np.histogram(valores, bins=bordes)
+
+    if regla == 'log':
+        positivos = valores[valores > 0]
+        if len(positivos) == 0 or positivos.min() == positivos.max():
+            return np.histogram(valores, bins=_cantidad_intervalos(valores, 'fd'))
+        cantidad = _cantidad_intervalos(np.log10(positivos), 'fd')
+        bordes = np.geomspace(positivos.min(), positivos.max(), cantidad + 1)
+        return np.histogram(np.clip(valores, bordes[0], None), bins=bordes)
+
+    return np.histogram(valores, bins=_cantidad_intervalos(valores, regla))
+
+
+def barras_histograma(conteos, bordes, densidad=False, separacion=0.0, formato=',.0f', escala_log=False, **opciones):
+    """
+    Traza de barras de un histograma ya agrupado (ver calcular_histograma).
+
+    Args:
+        conteos (np.ndarray): Conteos de cada intervalo
+        bordes (np.ndarray): Bordes de los intervalos
+        densidad (bool): Dibujar la densidad de probabilidad en lugar de la frecuencia
+        separacion (float): Fracción del ancho de cada intervalo que queda libre entre barras
+        formato (str): Formato d3 de los bordes en el texto al pasar el cursor
+        escala_log (bool): Ubicar las barras en log10 de los valores (ver eje_logaritmico),
+            de modo que los intervalos de la regla 'log' se vean del mismo ancho
+        **opciones: Otros argumentos de go.Bar (name, marker, ...)
+
+    Returns:
+        go.Bar: Traza con una barra por intervalo
+    """
+    anchos = np.diff(bordes)
+    alturas = conteos
+    if densidad and conteos.sum() > 0:
+        alturas = conteos / (conteos.sum() * anchos)
+
+    posiciones = np.log10(bordes) if escala_log else bordes
+    anchos_barra = np.diff(posiciones)
+
+    return go.Bar(
+        x=posiciones[:-1] + anchos_barra / 2,
+        y=alturas,
+        width=anchos_barra * (1 - separacion),
+        customdata=np.column_stack([bordes[:-1], bordes[1:]]),
+        hovertemplate=f'%{{customdata[0]:{formato}}} - %{{customdata[1]:{formato}}}<br>%{{y}}<extra></extra>',
+        **opciones
+    )
+
+
+def eje_logaritmico(bordes):
+    """
+    Configuración del eje X para barras dibujadas con escala_log: las posiciones están
+    en log10 y las marcas se rotulan con el valor real (1K, 10K, 100K, ...).
+
+    Args:
+        bordes (np.ndarray): Bordes de los intervalos
+
+    Returns:
+        dict: Argumentos para fig.update_xaxes
+    """
+    exponentes = np.arange(np.floor(np.log10(bordes[0])), np.ceil(np.log10(bordes[-1])) + 1)
+    return dict(
+        tickvals=exponentes,
+        ticktext=[f'{10 ** e:,.0f}' for e in exponentes],
+        range=[np.log10(bordes[0]), np.log10(bordes[-1])],
+    )
@@ -0,0 +1,548 @@
+import argparse
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import streamlit as st
+from utils.formato_largo import TIPOS_DE_FLUJO, cambio_porcentual
+from utils.rendimiento import cache_medido, etapa
+from utils.supabase_simulado import backend_simulado
+
+# Directorio del almacén de datos mensuales (configurable con AIRPORTS_MONTHLY_DIR),
+# particionado por año y mes: 'year=2023/month=07/datos.parquet'
+DIRECTORIO_POR_DEFECTO = Path(__file__).resolve().parent.parent / "data" / "mensual"
+ARCHIVO_PARTICION = "datos.parquet"
+
+# Esquema de las carpetas de las particiones
+PARTICIONES = ds.partitioning(pa.schema([("year", pa.int16()), ("month", pa.int8())]), flavor="hive")
+
+# Meses de la ventana móvil (trailing twelve months)
+VENTANA_TTM = 12
+
+# Columnas de los archivos que se cargan: una fila por aeropuerto y mes, con los pasajeros
+# domésticos e internacionales ('total' es opcional: si falta se calcula como la suma)
+COLUMNAS_ENTRADA = ['airport_id', 'year', 'month', 'domestic', 'international']
+
+# Columnas de cada partición: una fila por aeropuerto y flujo
+# - passengers: pasajeros embarcados del mes
+# - ttm: pasajeros de los últimos 12 meses (incluido este)
+# - yoy_pct: cambio porcentual contra el mismo mes del año anterior (NaN si ese mes no está cargado)
+COLUMNAS_PARTICION = ['airport_id', 'flow', 'passengers', 'ttm', 'yoy_pct']
+
+# Columnas de la serie que leen las páginas
+COLUMNAS_SERIE = ['year', 'month'] + COLUMNAS_PARTICION + ['ttm_completo']
+
+CLAVES = ['airport_id', 'flow']
+
+
+def directorio_mensual():
+    """
+    Devuelve el directorio del almacén mensual. Con el backend simulado el directorio
+    por defecto es 'simulado/', como los snapshots.
+
+    Returns:
+        Path: Ruta del directorio
+    """
+    por_defecto = DIRECTORIO_POR_DEFECTO / "simulado" if backend_simulado() else DIRECTORIO_POR_DEFECTO
+    return Path(os.environ.get("AIRPORTS_MONTHLY_DIR", por_defecto))
+
+
+def ruta_particion(anio, mes):
+    """
+    Devuelve la ruta del archivo Parquet de un mes.
+
+    Args:
+        anio (int): Año
+        mes (int): Mes (1 a 12)
+
+    Returns:
+        Path: Ruta 'year=<año>/month=<mes>/datos.parquet'
+    """
+    return directorio_mensual() / f"year={int(anio)}" / f"month={int(mes):02d}" / ARCHIVO_PARTICION
+
+
+def desplazar_mes(anio, mes, meses):
+    """
+    Suma (o resta) meses a un año y mes.
+
+    Args:
+        anio (int): Año
+        mes (int): Mes (1 a 12)
+        meses (int): Meses a desplazar (negativo hacia atrás)
+
+    Returns:
+        tuple[int, int]: Año y mes resultantes
+    """
+    indice = int(anio) * 12 + int(mes) - 1 + meses
+    return indice // 12, indice % 12 + 1
+
+
+def meses_disponibles():
+    """
+    Meses cargados en el almacén, del más antiguo al más reciente. Solo se lista el
+    directorio; no se lee ningún archivo.
+
+    Returns:
+        list[tuple[int, int]]: (año, mes) de cada partición
+    """
+    meses = []
+    for ruta in directorio_mensual().glob(f"year=*/month=*/{ARCHIVO_PARTICION}"):
+        try:
+            anio = int(ruta.parent.parent.name.split("=", 1)[1])
+            mes = int(ruta.parent.name.split("=", 1)[1])
+        except ValueError:
+            continue
+        meses.append((anio, mes))
+    return sorted(meses)
+
+
+def version_mensual():
+    """
+    Versión del almacén mensual: los meses cargados y la fecha de modificación de cada
+    partición. Cambia cuando se carga o se corrige un mes, y sirve como clave de caché.
+
+    Returns:
+        tuple: (año, mes, mtime en ns) de cada partición
+    """
+    return tuple((anio, mes, ruta_particion(anio, mes).stat().st_mtime_ns) for anio, mes in meses_disponibles())
+
+
+def ventana_completa(anios, meses, disponibles=None):
+    """
+    Indica, para cada mes, si los 12 meses de su ventana móvil están cargados
+    (si no, el acumulado de 12 meses todavía no cubre un año completo).
+
+    Args:
+        anios (array-like): Año de cada fila
+        meses (array-like): Mes de cada fila
+        disponibles (list[tuple[int, int]], optional): Meses cargados (por defecto los del almacén)
+
+    Returns:
+        np.ndarray: True si la ventana está completa
+    """
+    disponibles = meses_disponibles() if disponibles is None else disponibles
+    cargados = np.zeros(0, dtype=np.int64)
+    if disponibles:
+        cargados = np.sort([anio * 12 + mes - 1 for anio, mes in disponibles])
+    indices = np.asarray(anios, dtype=np.int64) * 12 + np.asarray(meses, dtype=np.int64) - 1
+    # Con los meses ordenados y sin repetir, la ventana está completa si hay 12 cargados entre indice-11 e indice
+    cantidad = np.searchsorted(cargados, indices, side='right') - np.searchsorted(cargados, indices - (VENTANA_TTM - 1))
+    return cantidad == VENTANA_TTM
+
+
+def leer_particion(anio, mes, columnas=None):
+    """
+    Lee la partición de un mes.
+
+    Args:
+        anio (int): Año
+        mes (int): Mes (1 a 12)
+        columnas (list[str], optional): Columnas que se necesitan (por defecto todas)
+
+    Returns:
+        pd.DataFrame | None: Filas del mes o None si el mes no está cargado
+    """
+    ruta = ruta_particion(anio, mes)
+    if not ruta.exists():
+        return None
+    df = pd.read_parquet(ruta, engine="pyarrow", columns=columnas)
+    if 'flow' in df.columns:
+        df['flow'] = df['flow'].astype(str)
+    return df
+
+
+def _escribir_particion(anio, mes, df):
+    """
+    Guarda la partición de un mes. Como los snapshots, se escribe en un archivo temporal
+    que luego se renombra, así un lector nunca ve un archivo a medio escribir.
+
+    Args:
+        anio (int): Año
+        mes (int): Mes (1 a 12)
+        df (pd.DataFrame): Filas del mes con COLUMNAS_PARTICION
+    """
+    ruta = ruta_particion(anio, mes)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta_temporal = ruta.with_suffix(".parquet.tmp")
+    pq.write_table(pa.Table.from_pandas(df[COLUMNAS_PARTICION], preserve_index=False), ruta_temporal)
+    os.replace(ruta_temporal, ruta)
+
+
+def a_formato_mensual(df):
+    """
+    Convierte los datos mensuales de entrada (una fila por aeropuerto y mes con los
+    pasajeros domésticos e internacionales) en filas (year, month, airport_id, flow,
+    passengers). Las filas repetidas de un mismo aeropuerto y mes (por ejemplo, una
+    por aerolínea) se suman; los flujos sin pasajeros no se guardan.
+
+    Args:
+        df (pd.DataFrame): Datos con COLUMNAS_ENTRADA (y opcionalmente 'total')
+
+    Returns:
+        pd.DataFrame: Datos en formato largo, ordenados por mes
+
+    Raises:
+        ValueError: Si faltan columnas o hay meses fuera de 1 a 12
+    """
+    faltantes = [col for col in COLUMNAS_ENTRADA if col not in df.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en los datos mensuales: {', '.join(faltantes)}")
+    if not df['month'].between(1, 12).all():
+        raise ValueError("La columna 'month' debe tener valores entre 1 y 12")
+
+    pasajeros = {
+        flujo: pd.to_numeric(df[flujo], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+        for flujo in ('domestic', 'international')
+    }
+    if 'total' in df.columns:
+        pasajeros['total'] = pd.to_numeric(df['total'], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+    else:
+        pasajeros['total'] = pasajeros['domestic'] + pasajeros['international']
+
+    # El flujo como categoría: un código de 1 byte por fila en lugar de una cadena por fila
+    n = len(df)
+    flujo = pd.Categorical.from_codes(np.repeat(np.arange(len(TIPOS_DE_FLUJO), dtype=np.int8), n), categories=TIPOS_DE_FLUJO)
+    largo = pd.DataFrame({
+        'year': np.tile(df['year'].to_numpy(dtype=np.int64), len(TIPOS_DE_FLUJO)),
+        'month': np.tile(df['month'].to_numpy(dtype=np.int64), len(TIPOS_DE_FLUJO)),
+        'airport_id': np.tile(df['airport_id'].to_numpy(dtype=np.int64), len(TIPOS_DE_FLUJO)),
+        'flow': flujo,
+        'passengers': np.concatenate([pasajeros[flujo] for flujo in TIPOS_DE_FLUJO]),
+    })
+    largo = largo[largo['passengers'] > 0]
+    return largo.groupby(['year', 'month'] + CLAVES, as_index=False, sort=True, observed=True)['passengers'].sum()
+
+
+def calcular_agregados(actual, anterior=None, hace_un_anio=None):
+    """
+    Calcula los agregados de un mes a partir del mes anterior, sin recorrer la historia:
+    - ttm = ttm del mes anterior + pasajeros del mes - pasajeros de hace 12 meses
+    - yoy_pct = cambio porcentual contra el mismo mes del año anterior
+
+    Los aeropuertos que tuvieron pasajeros en la ventana pero no en este mes se
+    mantienen con 0 pasajeros hasta que salen de la ventana.
+
+    Args:
+        actual (pd.DataFrame): airport_id, flow y passengers del mes
+        anterior (pd.DataFrame, optional): airport_id, flow y ttm del mes anterior
+        hace_un_anio (pd.DataFrame, optional): airport_id, flow y passengers de hace 12 meses
+            (None si ese mes no está cargado: yoy_pct queda en NaN)
+
+    Returns:
+        pd.DataFrame: Filas del mes con COLUMNAS_PARTICION
+    """
+    vacia = pd.Series(dtype=np.int64, index=pd.MultiIndex.from_arrays([[], []], names=CLAVES))
+    mes = actual.set_index(CLAVES)['passengers'] if not actual.empty else vacia
+    ttm_anterior = anterior.set_index(CLAVES)['ttm'] if anterior is not None and not anterior.empty else vacia
+    base = hace_un_anio.set_index(CLAVES)['passengers'] if hace_un_anio is not None and not hace_un_anio.empty else vacia
+
+    indice = mes.index.union(ttm_anterior.index)
+    pasajeros = mes.reindex(indice, fill_value=0).to_numpy(dtype=np.int64)
+    pasajeros_base = base.reindex(indice, fill_value=0).to_numpy(dtype=np.int64)
+    ttm = ttm_anterior.reindex(indice, fill_value=0).to_numpy(dtype=np.int64) + pasajeros - pasajeros_base
+
+    if hace_un_anio is None:
+        yoy = np.full(len(indice), np.nan)
+    else:
+        yoy = cambio_porcentual(pasajeros_base, pasajeros)
+
+    resultado = pd.DataFrame({
+        'airport_id': indice.get_level_values('airport_id').to_numpy(dtype=np.int64),
+        'flow': indice.get_level_values('flow').astype(str),
+        'passengers': pasajeros,
+        'ttm': ttm,
+        'yoy_pct': yoy,
+    })
+    # Fuera de la ventana: sin pasajeros en los últimos 12 meses
+    return resultado[(resultado['passengers'] > 0) | (resultado['ttm'] > 0)].reset_index(drop=True)
+
+
+def _suma_ventana(anio, mes):
+    """
+    Suma directa de los pasajeros de los 12 meses que terminan en (anio, mes), para
+    cuando ese mes no está cargado y no se puede continuar su acumulado.
+
+    Args:
+        anio (int): Año del último mes de la ventana
+        mes (int): Último mes de la ventana
+
+    Returns:
+        pd.DataFrame | None: airport_id, flow y ttm (None si no hay ningún mes cargado en la ventana)
+    """
+    partes = []
+    for k in range(VENTANA_TTM):
+        particion = leer_particion(*desplazar_mes(anio, mes, -k), columnas=['airport_id', 'flow', 'passengers'])
+        if particion is not None:
+            partes.append(particion)
+    if not partes:
+        return None
+    suma = pd.concat(partes, ignore_index=True).groupby(CLAVES, as_index=False)['passengers'].sum()
+    return suma.rename(columns={'passengers': 'ttm'})
+
+
+def _guardar_mes(anio, mes, actual):
+    """
+    Calcula los agregados de un mes (ver calcular_agregados) y guarda su partición.
+    Lee solo el mes anterior y el de hace 12 meses; si el mes anterior no está cargado,
+    suma la ventana que termina en él.
+
+    Args:
+        anio (int): Año
+        mes (int): Mes (1 a 12)
+        actual (pd.DataFrame): airport_id, flow y passengers del mes
+    """
+    anterior = leer_particion(*desplazar_mes(anio, mes, -1), columnas=['airport_id', 'flow', 'ttm'])
+    if anterior is None:
+        anterior = _suma_ventana(*desplazar_mes(anio, mes, -1))
+    hace_un_anio = leer_particion(*desplazar_mes(anio, mes, -VENTANA_TTM), columnas=['airport_id', 'flow', 'passengers'])
+    _escribir_particion(anio, mes, calcular_agregados(actual, anterior, hace_un_anio))
+
+
+def ingerir_mes(anio, mes, actual):
+    """
+    Carga (o reemplaza) los datos de un mes en el almacén y actualiza los agregados.
+
+    Un mes nuevo al final de la serie solo lee el mes anterior y el de hace 12 meses.
+    Si se carga o se corrige un mes intermedio, se recalculan además los 12 meses
+    siguientes que estén cargados (los 11 cuya ventana lo incluye y el del año
+    siguiente, cuyo cambio interanual se compara con él); el resto de la historia no
+    cambia y no se lee.
+
+    Args:
+        anio (int): Año
+        mes (int): Mes (1 a 12)
+        actual (pd.DataFrame): airport_id, flow y passengers del mes (ver a_formato_mensual)
+
+    Returns:
+        int: Meses escritos (el cargado más los recalculados)
+    """
+    with etapa(f"mensual {anio}-{mes:02d}"):
+        _guardar_mes(anio, mes, actual[CLAVES + ['passengers']])
+        escritos = 1
+        for k in range(1, VENTANA_TTM + 1):
+            siguiente = desplazar_mes(anio, mes, k)
+            existente = leer_particion(*siguiente, columnas=CLAVES + ['passengers'])
+            if existente is not None:
+                _guardar_mes(*siguiente, existente)
+                escritos += 1
+    return escritos
+
+
+def ingerir(df):
+    """
+    Carga en el almacén todos los meses de un conjunto de datos mensuales, del más
+    antiguo al más reciente (ver ingerir_mes).
+
+    Args:
+        df (pd.DataFrame): Datos con COLUMNAS_ENTRADA (ver a_formato_mensual)
+
+    Returns:
+        list[tuple[int, int]]: Meses cargados
+    """
+    largo = a_formato_mensual(df)
+    meses = []
+    for (anio, mes), datos_mes in largo.groupby(['year', 'month'], sort=True):
+        ingerir_mes(int(anio), int(mes), datos_mes)
+        meses.append((int(anio), int(mes)))
+    return meses
+
+
+def cargar_mensual(aeropuertos=None, flujos=None, desde=None, hasta=None):
+    """
+    Lee la serie mensual del almacén. Solo se abren las particiones de los meses
+    pedidos, y los filtros de aeropuerto y flujo se aplican al leer los archivos.
+
+    Args:
+        aeropuertos (list[int], optional): 'airport_id' que se leen (por defecto todos)
+        flujos (list[str], optional): Flujos que se leen (por defecto todos)
+        desde (tuple[int, int], optional): Primer (año, mes)
+        hasta (tuple[int, int], optional): Último (año, mes)
+
+    Returns:
+        pd.DataFrame: COLUMNAS_SERIE ordenadas por mes, aeropuerto y flujo
+    """
+    disponibles = meses_disponibles()
+    meses = [m for m in disponibles if (desde is None or m >= tuple(desde)) and (hasta is None or m <= tuple(hasta))]
+    if not meses:
+        return pd.DataFrame(columns=COLUMNAS_SERIE)
+
+    directorio = directorio_mensual()
+    dataset = ds.dataset(
+        [str(ruta_particion(anio, mes)) for anio, mes in meses],
+        format="parquet",
+        partitioning=PARTICIONES,
+        partition_base_dir=str(directorio),
+    )
+    filtro = None
+    if aeropuertos is not None:
+        filtro = ds.field('airport_id').isin([int(a) for a in aeropuertos])
+    if flujos is not None:
+        filtro_flujo = ds.field('flow').isin(list(flujos))
+        filtro = filtro_flujo if filtro is None else filtro & filtro_flujo
+
+    with etapa("mensual lectura"):
+        df = dataset.to_table(filter=filtro).to_pandas()
+
+    df['flow'] = pd.Categorical(df['flow'], categories=TIPOS_DE_FLUJO)
+    df['ttm_completo'] = ventana_completa(df['year'], df['month'], disponibles)
+    return df[COLUMNAS_SERIE].sort_values(['year', 'month', 'airport_id', 'flow'], ignore_index=True)
+
+
+def agregar_aeropuertos(serie):
+    """
+    Suma la serie de varios aeropuertos por mes y flujo. El cambio interanual se
+    vuelve a calcular sobre los totales.
+
+    Args:
+        serie (pd.DataFrame): Serie de cargar_mensual
+
+    Returns:
+        pd.DataFrame: Una fila por mes y flujo, con las mismas columnas (airport_id en 0)
+    """
+    if serie.empty:
+        return serie
+    total = serie.groupby(['year', 'month', 'flow'], observed=True, as_index=False).agg(
+        passengers=('passengers', 'sum'), ttm=('ttm', 'sum'), ttm_completo=('ttm_completo', 'first')
+    )
+    indice = total['year'].astype(np.int64) * 12 + total['month'].astype(np.int64) - 1
+    flujos = total['flow'].astype(str)
+    pasajeros = pd.Series(total['passengers'].to_numpy(), index=pd.MultiIndex.from_arrays([indice, flujos]))
+    base = pasajeros.reindex(pd.MultiIndex.from_arrays([indice - VENTANA_TTM, flujos])).to_numpy(dtype=float)
+    total['yoy_pct'] = np.where(np.isnan(base), np.nan, cambio_porcentual(base, total['passengers']))
+    total['airport_id'] = 0
+    return total[COLUMNAS_SERIE]
+
+
+def perfil_estacional(serie):
+    """
+    Índice estacional de cada flujo: pasajeros medios de cada mes del calendario
+    respecto del promedio mensual (100 = mes típico). Se usan solo los años completos
+    si hay alguno.
+
+    Args:
+        serie (pd.DataFrame): Serie de un aeropuerto o de agregar_aeropuertos (una fila por mes y flujo)
+
+    Returns:
+        pd.DataFrame: Columnas month, flow e indice
+    """
+    if serie.empty:
+        return pd.DataFrame(columns=['month', 'flow', 'indice'])
+    meses_por_anio = serie.groupby('year')['month'].nunique()
+    completos = meses_por_anio.index[meses_por_anio == 12]
+    if len(completos):
+        serie = serie[serie['year'].isin(completos)]
+
+    medias = serie.groupby(['flow', 'month'], observed=True)['passengers'].mean()
+    promedio = medias.groupby(level='flow', observed=True).transform('mean')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        indice = medias / promedio.where(promedio != 0) * 100
+    return indice.rename('indice').reset_index()
+
+
+def obtener_serie_mensual(airport_id=None):
+    """
+    Obtiene la serie mensual de un aeropuerto, o la suma de todos los aeropuertos con
+    airport_id=None. Queda en caché hasta que se carga o se corrige algún mes.
+
+    Args:
+        airport_id (int, optional): Aeropuerto (por defecto todos)
+
+    Returns:
+        pd.DataFrame: Una fila por mes y flujo (ver cargar_mensual)
+    """
+    return _obtener_serie_mensual(airport_id, version_mensual())
+
+
+@cache_medido(st.cache_data, max_entries=32, show_spinner=False)
+def _obtener_serie_mensual(airport_id, version):
+    """
+    Implementación cacheada de obtener_serie_mensual.
+
+    Args:
+        airport_id (int | None): Aeropuerto (None para todos)
+        version (tuple): Versión del almacén (solo forma parte de la clave de caché)
+
+    Returns:
+        pd.DataFrame: Serie mensual
+    """
+    if airport_id is None:
+        return agregar_aeropuertos(cargar_mensual())
+    return cargar_mensual(aeropuertos=[airport_id])
+
+
+def aeropuertos_mensuales():
+    """
+    'airport_id' de los aeropuertos que tienen datos en el mes más reciente del almacén.
+
+    Returns:
+        list[int]: Aeropuertos
+    """
+    return _aeropuertos_mensuales(version_mensual())
+
+
+@cache_medido(st.cache_data, max_entries=4, show_spinner=False)
+def _aeropuertos_mensuales(version):
+    """
+    Implementación cacheada de aeropuertos_mensuales.
+
+    Args:
+        version (tuple): Versión del almacén (solo forma parte de la clave de caché)
+
+    Returns:
+        list[int]: Aeropuertos
+    """
+    if not version:
+        return []
+    anio, mes, _ = version[-1]
+    particion = leer_particion(anio, mes, columnas=['airport_id'])
+    return sorted(particion['airport_id'].unique().tolist())
+
+
+def _leer_archivo(ruta):
+    """
+    Lee un archivo de datos mensuales (CSV o Parquet).
+
+    Args:
+        ruta (str): Ruta del archivo
+
+    Returns:
+        pd.DataFrame: Datos del archivo
+    """
+    if str(ruta).endswith(".parquet"):
+        return pd.read_parquet(ruta)
+    return pd.read_csv(ruta)
+
+
+if __name__ == "__main__":
+    # Carga archivos mensuales (CSV o Parquet con COLUMNAS_ENTRADA) en el almacén:
+    #   python -m utils.mensual datos_2024_01.csv datos_2024_02.csv
+    # o genera datos sintéticos con estacionalidad para los aeropuertos del conjunto sintético:
+    #   python -m utils.mensual --sintetico 1000
+    parser = argparse.ArgumentParser(description="Carga datos mensuales por aeropuerto en el almacén particionado")
+    parser.add_argument('archivos', nargs='*', help="Archivos CSV o Parquet con los datos mensuales")
+    parser.add_argument('--sintetico', type=int, metavar='AEROPUERTOS',
+                        help="Generar y cargar datos sintéticos de 2022 y 2023 para esta cantidad de aeropuertos")
+    args = parser.parse_args()
+
+    if args.sintetico:
+        from benchmarks.generador import generar_mensual, generar_tablas
+        datos = [generar_mensual(generar_tablas(args.sintetico))]
+    else:
+        datos = []
+        for archivo in args.archivos:
+            try:
+                datos.append(_leer_archivo(archivo))
+            except Exception as e:
+                print(f"❌ Error al leer {archivo}: {e}")
+
+    for df in datos:
+        try:
+            cargados = ingerir(df)
+        except ValueError as e:
+            print(f"❌ {e}")
+            continue
+        for anio, mes in cargados:
+            print(f"✅ {anio}-{mes:02d} -> {ruta_particion(anio, mes)}")
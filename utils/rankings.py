@@ -0,0 +1,222 @@
+import re
+import numpy as np
+import streamlit as st
+from utils.aeropuertos import TABLAS_HECHOS, TIPOS_DE_FLUJO, obtener_hechos_aeropuertos, obtener_variacion
+from utils.database import versiones_tablas
+from utils.rendimiento import cache_medido
+
+# Columnas por las que se ordenan los rankings: pasajeros ('2023_total') y cambio porcentual ('cambio_total_pct')
+_FLUJOS = '|'.join(TIPOS_DE_FLUJO)
+PATRON_RANKING = re.compile(rf'^(\d{{4}}_({_FLUJOS})|cambio_({_FLUJOS})_pct)$')
+
+
+def columnas_ranking(df):
+    """
+    Columnas de una tabla por las que se ordenan los rankings de las páginas:
+    pasajeros de cada año y flujo ('<año>_<flujo>') y cambio porcentual ('cambio_<flujo>_pct').
+    Se toman de la tabla, así que incluyen todos los años que tenga.
+
+    Args:
+        df (pd.DataFrame): Tabla de hechos o de variación interanual
+
+    Returns:
+        list[str]: Nombres de las columnas
+    """
+    return [columna for columna in df.columns if PATRON_RANKING.match(str(columna))]
+
+
+def _orden(valores, descendente):
+    """
+    Permutación que ordena los valores (estable, con los NaN siempre al final, como sort_values).
+
+    Args:
+        valores (np.ndarray): Valores de la columna
+        descendente (bool): Orden de mayor a menor
+
+    Returns:
+        np.ndarray: Posiciones de las filas en orden
+    """
+    return np.argsort(-valores if descendente else valores, kind='stable')
+
+
+def seleccionar_extremos(valores, n, descendente=True):
+    """
+    Posiciones de los n valores mayores (o menores) con argpartition, sin ordenar toda
+    la columna: O(N) para elegirlos más O(n log n) para ordenar solo esos n.
+    Los NaN quedan al final, como en sort_values.
+
+    Args:
+        valores (np.ndarray): Valores de la columna
+        n (int): Cantidad de posiciones
+        descendente (bool): Elegir los mayores (True) o los menores (False)
+
+    Returns:
+        np.ndarray: Posiciones de las filas elegidas, en orden
+    """
+    valores = np.asarray(valores, dtype=float)
+    n = min(n, len(valores))
+    if n == 0:
+        return np.array([], dtype=int)
+
+    claves = np.where(np.isnan(valores), np.inf, -valores if descendente else valores)
+    elegidas = np.argpartition(claves, n - 1)[:n] if n < len(valores) else np.arange(len(valores))
+    return elegidas[np.argsort(claves[elegidas], kind='stable')]
+
+
+class IndiceRankings:
+    """
+    Órdenes precalculados (argsort) de las columnas de ranking de la tabla de hechos,
+    de mayor a menor y de menor a mayor. Con el orden ya calculado, elegir los Top/Bottom N
+    es tomar las primeras posiciones de la permutación, en lugar de ordenar el DataFrame
+    en cada cambio de los selectores.
+
+    Las posiciones son las de la tabla de hechos (ver obtener_hechos_aeropuertos) y se usan con iloc.
+    El índice guarda los 'airport_id' de las filas con las que se construyó, para
+    comprobar que una tabla tiene esas mismas filas en el mismo orden (ver corresponde).
+    """
+
+    def __init__(self, df, columnas=None):
+        self._ids = df['airport_id'].to_numpy() if 'airport_id' in df.columns else None
+        self._valores = {}
+        self._ordenes = {}
+        for columna in columnas or columnas_ranking(df):
+            if columna not in df.columns:
+                continue
+            valores = df[columna].to_numpy(dtype=float, na_value=np.nan)
+            self._valores[columna] = valores
+            self._ordenes[columna] = {
+                True: _orden(valores, descendente=True),
+                False: _orden(valores, descendente=False),
+            }
+
+    def __contains__(self, columna):
+        return columna in self._ordenes
+
+    def corresponde(self, df):
+        """
+        Indica si las posiciones del índice valen para 'df': los mismos aeropuertos
+        en el mismo orden. La tabla y el índice salen de cachés distintas, así que
+        pueden ser de versiones distintas de los datos.
+
+        Args:
+            df (pd.DataFrame): Tabla con la columna 'airport_id'
+
+        Returns:
+            bool: True si df tiene las mismas filas que la tabla del índice
+        """
+        if self._ids is None or 'airport_id' not in df.columns:
+            return False
+        return np.array_equal(self._ids, df['airport_id'].to_numpy())
+
+    def valores(self, columna):
+        """
+        Valores de una columna indexada.
+
+        Args:
+            columna (str): Nombre de la columna
+
+        Returns:
+            np.ndarray: Valores de la columna (float, NaN si faltan)
+        """
+        return self._valores[columna]
+
+    def top_n(self, columna, n, descendente=True, mascara=None):
+        """
+        Posiciones de los n aeropuertos con mayor (o menor) valor en una columna.
+
+        Args:
+            columna (str): Columna indexada
+            n (int): Cantidad de aeropuertos
+            descendente (bool): Mayores (Top N) o menores (Bottom N)
+            mascara (np.ndarray, optional): Filas que pueden aparecer en el resultado (bool por fila)
+
+        Returns:
+            np.ndarray: Posiciones de las filas en orden
+        """
+        orden = self._ordenes[columna][descendente]
+        if mascara is not None:
+            orden = orden[mascara[orden]]
+        return orden[:n]
+
+
+def obtener_indice_rankings():
+    """
+    Obtiene el índice de rankings de la tabla de hechos de aeropuertos. Se construye
+    una vez por versión de los datos y se comparte entre todas las sesiones.
+
+    Returns:
+        IndiceRankings: Índice de rankings
+    """
+    return _obtener_indice_rankings(versiones_tablas(TABLAS_HECHOS))
+
+
+@cache_medido(st.cache_resource, max_entries=2, show_spinner=False)
+def _obtener_indice_rankings(versiones):
+    """
+    Implementación cacheada de obtener_indice_rankings.
+
+    Args:
+        versiones (tuple): Versión de cada tabla de TABLAS_HECHOS (solo forma parte de la clave de caché)
+
+    Returns:
+        IndiceRankings: Índice de rankings
+    """
+    return IndiceRankings(obtener_hechos_aeropuertos())
+
+
+def obtener_indice_variacion(anio_base, anio_final):
+    """
+    Obtiene el índice de rankings de la variación interanual de un par de años
+    (ver obtener_variacion), una vez por par de años y versión de los datos.
+
+    Args:
+        anio_base (str): Año de referencia
+        anio_final (str): Año que se compara
+
+    Returns:
+        IndiceRankings: Índice de rankings
+    """
+    return _obtener_indice_variacion(str(anio_base), str(anio_final), versiones_tablas(TABLAS_HECHOS))
+
+
+@cache_medido(st.cache_resource, max_entries=8, show_spinner=False)
+def _obtener_indice_variacion(anio_base, anio_final, versiones):
+    """
+    Implementación cacheada de obtener_indice_variacion.
+
+    Args:
+        anio_base (str): Año de referencia
+        anio_final (str): Año que se compara
+        versiones (tuple): Versión de cada tabla de TABLAS_HECHOS (solo forma parte de la clave de caché)
+
+    Returns:
+        IndiceRankings: Índice de rankings
+    """
+    return IndiceRankings(obtener_variacion(anio_base, anio_final))
+
+
+def top_n_aeropuertos(df, columna, n, descendente=True, mascara=None, indice=None):
+    """
+    Devuelve las n filas con mayor (o menor) valor en una columna. Si la columna está
+    en el índice y este corresponde a 'df' (mismos 'airport_id' en el mismo orden) usa
+    el orden precalculado; si no, argpartition.
+
+    Args:
+        df (pd.DataFrame): Tabla de hechos de aeropuertos (u otra tabla con la columna)
+        columna (str): Columna por la que se ordena
+        n (int): Cantidad de filas
+        descendente (bool): Mayores (Top N) o menores (Bottom N)
+        mascara (np.ndarray, optional): Filas que pueden aparecer en el resultado (bool por fila)
+        indice (IndiceRankings, optional): Índice de 'df' (por defecto el de la tabla de hechos)
+
+    Returns:
+        pd.DataFrame: Filas elegidas, en orden
+    """
+    if indice is None:
+        indice = obtener_indice_rankings()
+    if columna in indice and indice.corresponde(df):
+        return df.iloc[indice.top_n(columna, n, descendente, mascara)]
+
+    valores = df[columna].to_numpy(dtype=float, na_value=np.nan)
+    posiciones = np.arange(len(df)) if mascara is None else np.flatnonzero(mascara)
+    return df.iloc[posiciones[seleccionar_extremos(valores[posiciones], n, descendente)]]
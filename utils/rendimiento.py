@@ -0,0 +1,274 @@
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Mostrar siempre el panel de rendimiento (configurable con AIRPORTS_PERF_PANEL);
+# si no, el panel solo aparece al abrir la página con ?perf=1
+VALORES_ACTIVADO = ("1", "true", "yes", "si", "sí")
+
+# Clave de st.session_state con las etapas medidas en la ejecución actual de la página
+CLAVE_ETAPAS = "_rendimiento_etapas"
+
+
+class Metricas:
+    """
+    Tiempos por etapa y aciertos/fallos de caché acumulados desde que arrancó el proceso
+    (compartidos entre todas las sesiones).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Pone todos los contadores en cero."""
+        with self._lock:
+            # nombre -> [veces, segundos totales, segundos máximos]
+            self.etapas = {}
+            # nombre -> [llamadas, fallos]
+            self.caches = {}
+
+    def registrar_etapa(self, nombre, segundos):
+        with self._lock:
+            veces, total, maximo = self.etapas.get(nombre, (0, 0.0, 0.0))
+            self.etapas[nombre] = [veces + 1, total + segundos, max(maximo, segundos)]
+
+    def registrar_cache(self, nombre, acierto):
+        with self._lock:
+            llamadas, fallos = self.caches.get(nombre, (0, 0))
+            self.caches[nombre] = [llamadas + 1, fallos + (not acierto)]
+
+    def tabla_etapas(self):
+        """
+        Returns:
+            pd.DataFrame: Veces, tiempo total, medio y máximo de cada etapa, de mayor a menor tiempo total
+        """
+        with self._lock:
+            filas = [
+                {'Etapa': nombre, 'Veces': veces, 'Total (ms)': total * 1000,
+                 'Media (ms)': total / veces * 1000, 'Máximo (ms)': maximo * 1000}
+                for nombre, (veces, total, maximo) in self.etapas.items()
+            ]
+        df = pd.DataFrame(filas, columns=['Etapa', 'Veces', 'Total (ms)', 'Media (ms)', 'Máximo (ms)'])
+        return df.sort_values('Total (ms)', ascending=False, ignore_index=True)
+
+    def tabla_caches(self):
+        """
+        Returns:
+            pd.DataFrame: Llamadas, aciertos, fallos y tasa de aciertos de cada caché
+        """
+        with self._lock:
+            filas = [
+                {'Caché': nombre, 'Llamadas': llamadas, 'Aciertos': llamadas - fallos,
+                 'Fallos': fallos, 'Aciertos (%)': (llamadas - fallos) / llamadas * 100}
+                for nombre, (llamadas, fallos) in self.caches.items()
+            ]
+        df = pd.DataFrame(filas, columns=['Caché', 'Llamadas', 'Aciertos', 'Fallos', 'Aciertos (%)'])
+        return df.sort_values('Caché', ignore_index=True)
+
+
+# Métricas del proceso
+METRICAS = Metricas()
+
+# Profundidad de las etapas anidadas en cada hilo
+_hilo = threading.local()
+
+# Las etapas de una ejecución pueden empezar a la vez en varios hilos (obtener_varias_tablas)
+_candado_ejecucion = threading.Lock()
+
+
+def iniciar_ejecucion():
+    """
+    Empieza una ejecución nueva de la página: vacía la lista de etapas de la sesión
+    para que el panel de rendimiento muestre solo las de esta ejecución, aunque la
+    anterior haya terminado antes del panel (por ejemplo, con st.stop()). Se llama al
+    principio de cada página, antes de cargar datos.
+    """
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return
+    with _candado_ejecucion:
+        st.session_state[CLAVE_ETAPAS] = []
+
+
+def _etapas_ejecucion():
+    """
+    Devuelve la lista de etapas de la ejecución actual de la página (ver iniciar_ejecucion),
+    o None fuera de una sesión de Streamlit (por ejemplo, en los benchmarks).
+
+    Returns:
+        list[dict] | None: Etapas medidas en esta ejecución
+    """
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    with _candado_ejecucion:
+        if CLAVE_ETAPAS not in st.session_state:
+            st.session_state[CLAVE_ETAPAS] = []
+        return st.session_state[CLAVE_ETAPAS]
+
+
+@contextmanager
+def etapa(nombre):
+    """
+    Mide el tiempo de un bloque de código. El tiempo se suma a las métricas del proceso
+    y, dentro de una sesión, se agrega a las etapas de la ejecución actual (con su
+    nivel de anidamiento) para el panel de rendimiento.
+
+    Args:
+        nombre (str): Nombre de la etapa (por ejemplo 'descarga total')
+    """
+    etapas = _etapas_ejecucion()
+    nivel = getattr(_hilo, 'nivel', 0)
+    registro = {'etapa': nombre, 'nivel': nivel, 'ms': None}
+    if etapas is not None:
+        etapas.append(registro)
+
+    _hilo.nivel = nivel + 1
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        _hilo.nivel = nivel
+        registro['ms'] = segundos * 1000
+        METRICAS.registrar_etapa(nombre, segundos)
+
+
+def medir(nombre=None):
+    """
+    Decorador que mide cada llamada a una función como una etapa (ver etapa).
+
+    Args:
+        nombre (str, optional): Nombre de la etapa (por defecto el de la función)
+
+    Returns:
+        callable: Decorador
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            with etapa(nombre or funcion.__name__):
+                return funcion(*args, **kwargs)
+        return medida
+    return decorador
+
+
+def registrar_cache(nombre, acierto):
+    """
+    Cuenta un acierto o un fallo de una caché propia (las de Streamlit se cuentan con cache_medido).
+
+    Args:
+        nombre (str): Nombre de la caché
+        acierto (bool): True si el valor estaba en la caché
+    """
+    METRICAS.registrar_cache(nombre, acierto)
+
+
+def cache_medido(cache, **opciones):
+    """
+    Aplica st.cache_data o st.cache_resource contando aciertos y fallos: cada llamada
+    cuenta como acierto salvo que se ejecute el cuerpo de la función, que además se
+    mide como una etapa con el nombre de la función.
+
+    Uso:
+        @cache_medido(st.cache_data, ttl=60, show_spinner=False)
+        def version_tabla(tabla): ...
+
+    Args:
+        cache (callable): st.cache_data o st.cache_resource
+        **opciones: Opciones del decorador de caché (ttl, max_entries, show_spinner, ...)
+
+    Returns:
+        callable: Decorador
+    """
+    def decorador(funcion):
+        # Las páginas se ejecutan como '__main__': se identifican por el prefijo del archivo ('6', '10', ...)
+        modulo = funcion.__module__.rsplit('.', 1)[-1]
+        if modulo == '__main__':
+            modulo = os.path.basename(funcion.__code__.co_filename).split('_', 1)[0]
+        nombre = f"{modulo}.{funcion.__name__}"
+        fallos = threading.local()
+
+        @functools.wraps(funcion)
+        def calcular(*args, **kwargs):
+            fallos.ocurrio = True
+            with etapa(nombre):
+                return funcion(*args, **kwargs)
+
+        # Streamlit lee los nombres de los parámetros (los que empiezan con '_' no se hashean)
+        calcular.__signature__ = inspect.signature(funcion)
+        cacheada = cache(**opciones)(calcular)
+
+        @functools.wraps(funcion)
+        def llamar(*args, **kwargs):
+            fallos.ocurrio = False
+            resultado = cacheada(*args, **kwargs)
+            METRICAS.registrar_cache(nombre, acierto=not fallos.ocurrio)
+            return resultado
+
+        llamar.clear = cacheada.clear
+        return llamar
+    return decorador
+
+
+def panel_activo():
+    """
+    Indica si se muestra el panel de rendimiento: con AIRPORTS_PERF_PANEL=1 o
+    abriendo la página con el parámetro ?perf=1.
+
+    Returns:
+        bool: True si el panel está activado
+    """
+    if os.environ.get("AIRPORTS_PERF_PANEL", "").strip().lower() in VALORES_ACTIVADO:
+        return True
+    return st.query_params.get("perf", "").strip().lower() in VALORES_ACTIVADO
+
+
+def panel_rendimiento():
+    """
+    Muestra en la barra lateral el panel de rendimiento (oculto salvo que panel_activo):
+    las etapas de esta ejecución de la página, los aciertos de cada caché y los tiempos
+    acumulados del proceso. Se llama al final de cada página (que empieza con iniciar_ejecucion).
+    """
+    if not panel_activo():
+        return
+
+    etapas = _etapas_ejecucion() or []
+    with st.sidebar.expander("⏱️ Rendimiento", expanded=True):
+        total = sum(e['ms'] or 0 for e in etapas if e['nivel'] == 0)
+        st.markdown(f"**Esta ejecución:** {total:,.1f} ms en {len(etapas)} etapas")
+        if etapas:
+            st.dataframe(
+                pd.DataFrame({
+                    'Etapa': [' ' * e['nivel'] + e['etapa'] for e in etapas],
+                    'ms': [e['ms'] for e in etapas],
+                }),
+                hide_index=True,
+                column_config={'ms': st.column_config.NumberColumn(format="%.1f")},
+            )
+
+        st.markdown("**Cachés** (desde el inicio del proceso)")
+        st.dataframe(
+            METRICAS.tabla_caches(),
+            hide_index=True,
+            column_config={'Aciertos (%)': st.column_config.NumberColumn(format="%.0f")},
+        )
+
+        st.markdown("**Etapas** (acumulado del proceso)")
+        st.dataframe(
+            METRICAS.tabla_etapas(),
+            hide_index=True,
+            column_config={
+                col: st.column_config.NumberColumn(format="%.1f")
+                for col in ['Total (ms)', 'Media (ms)', 'Máximo (ms)']
+            },
+        )
+
+        if st.button("Reiniciar contadores", key="_rendimiento_reiniciar"):
+            METRICAS.reiniciar()
+            st.rerun()
@@ -0,0 +1,190 @@
+import json
+import os
+import time
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.rendimiento import etapa
+from utils.supabase_simulado import backend_simulado
+from utils.tipos import optimizar_tipos
+
+# Tablas de la base de datos que se guardan como snapshot local
+TABLAS = ("city", "state", "airports", "domestic", "international", "total")
+
+# Directorio de los snapshots (configurable con AIRPORTS_SNAPSHOT_DIR)
+DIRECTORIO_POR_DEFECTO = Path(__file__).resolve().parent.parent / "data" / "snapshots"
+
+# Clave de los metadatos Parquet donde se guarda la versión de la tabla
+CLAVE_VERSION = b"airports_version"
+
+
+def directorio_snapshots():
+    """
+    Devuelve el directorio donde se guardan los archivos Parquet de cada tabla.
+    Con el backend simulado el directorio por defecto es 'simulado/', para que sus
+    datos nunca se mezclen con los snapshots de Supabase.
+
+    Returns:
+        Path: Ruta del directorio de snapshots
+    """
+    por_defecto = DIRECTORIO_POR_DEFECTO / "simulado" if backend_simulado() else DIRECTORIO_POR_DEFECTO
+    return Path(os.environ.get("AIRPORTS_SNAPSHOT_DIR", por_defecto))
+
+
+def ruta_snapshot(tabla):
+    """
+    Devuelve la ruta del archivo Parquet de una tabla.
+
+    Args:
+        tabla (str): Nombre de la tabla
+
+    Returns:
+        Path: Ruta del archivo '<tabla>.parquet'
+    """
+    return directorio_snapshots() / f"{tabla}.parquet"
+
+
+def modo_offline():
+    """
+    Indica si la aplicación debe trabajar solo con los snapshots locales,
+    sin conectarse a Supabase (AIRPORTS_OFFLINE=1).
+
+    Returns:
+        bool: True si el modo offline está activado
+    """
+    return os.environ.get("AIRPORTS_OFFLINE", "").strip().lower() in ("1", "true", "yes", "si", "sí")
+
+
+def guardar_snapshot(tabla, df, version=None):
+    """
+    Guarda el DataFrame ya procesado de una tabla como archivo Parquet.
+    La escritura se hace en un archivo temporal que luego se renombra,
+    así un lector nunca ve un archivo a medio escribir.
+
+    Args:
+        tabla (str): Nombre de la tabla
+        df (pd.DataFrame): DataFrame tal como lo devuelve obtener_datos
+        version (tuple, optional): Versión de la tabla al descargarla (ver version_tabla),
+            que se guarda en los metadatos del archivo
+    """
+    ruta = ruta_snapshot(tabla)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta_temporal = ruta.with_suffix(".parquet.tmp")
+
+    tabla_arrow = pa.Table.from_pandas(df, preserve_index=False)
+    if version is not None:
+        metadatos = dict(tabla_arrow.schema.metadata or {})
+        metadatos[CLAVE_VERSION] = json.dumps(list(version)).encode()
+        tabla_arrow = tabla_arrow.replace_schema_metadata(metadatos)
+
+    pq.write_table(tabla_arrow, ruta_temporal)
+    os.replace(ruta_temporal, ruta)
+
+
+def cargar_snapshot(tabla, columnas=None):
+    """
+    Lee el snapshot local de una tabla. Con 'columnas' solo se leen esas columnas
+    del archivo Parquet (las que no existan en el snapshot se ignoran).
+
+    Args:
+        tabla (str): Nombre de la tabla
+        columnas (list[str], optional): Columnas que se necesitan (por defecto todas)
+
+    Returns:
+        pd.DataFrame | None: DataFrame del snapshot o None si no existe o no se puede leer
+    """
+    ruta = ruta_snapshot(tabla)
+    if not ruta.exists():
+        return None
+    try:
+        if columnas is not None:
+            # Mantener el orden de columnas del snapshot
+            existentes = pq.read_schema(ruta).names
+            columnas = [col for col in existentes if col in columnas]
+        # Los snapshots anteriores a la optimización de tipos se convierten al leerlos
+        with etapa(f"snapshot {tabla}"):
+            return optimizar_tipos(pd.read_parquet(ruta, engine="pyarrow", columns=columnas))
+    except Exception as e:
+        print(f"Error al leer el snapshot de la tabla {tabla}: {e}")
+        return None
+
+
+def version_snapshot(tabla):
+    """
+    Devuelve la versión de la tabla guardada en los metadatos de su snapshot.
+
+    Args:
+        tabla (str): Nombre de la tabla
+
+    Returns:
+        tuple | None: Versión del snapshot o None si no existe o no la tiene
+    """
+    ruta = ruta_snapshot(tabla)
+    if not ruta.exists():
+        return None
+    try:
+        metadatos = pq.read_schema(ruta).metadata or {}
+        if CLAVE_VERSION not in metadatos:
+            return None
+        return tuple(json.loads(metadatos[CLAVE_VERSION]))
+    except Exception as e:
+        print(f"Error al leer la versión del snapshot de la tabla {tabla}: {e}")
+        return None
+
+
+def columnas_snapshot(tabla):
+    """
+    Devuelve las columnas del snapshot de una tabla sin leer sus datos.
+
+    Args:
+        tabla (str): Nombre de la tabla
+
+    Returns:
+        list[str] | None: Columnas o None si no existe el snapshot
+    """
+    ruta = ruta_snapshot(tabla)
+    if not ruta.exists():
+        return None
+    try:
+        return pq.read_schema(ruta).names
+    except Exception as e:
+        print(f"Error al leer las columnas del snapshot de la tabla {tabla}: {e}")
+        return None
+
+
+def antiguedad_snapshot(tabla):
+    """
+    Devuelve cuántos segundos tiene el snapshot de una tabla.
+
+    Args:
+        tabla (str): Nombre de la tabla
+
+    Returns:
+        float | None: Antigüedad en segundos o None si no existe
+    """
+    ruta = ruta_snapshot(tabla)
+    if not ruta.exists():
+        return None
+    return time.time() - ruta.stat().st_mtime
+
+
+if __name__ == "__main__":
+    # Descarga las seis tablas desde Supabase y las guarda como snapshot:
+    #   python -m utils.snapshot
+    from utils.database import descargar_tabla, version_tabla
+
+    for tabla in TABLAS:
+        try:
+            # La versión se consulta antes de descargar: si la tabla cambia entre medio,
+            # la siguiente comprobación detecta la diferencia y la vuelve a descargar
+            version = version_tabla(tabla)
+            df = descargar_tabla(tabla)
+        except Exception as e:
+            print(f"❌ Error al descargar la tabla {tabla}: {e}")
+            continue
+        if df.empty:
+            print(f"⚠️ La tabla {tabla} no devolvió datos, no se guardó snapshot")
+            continue
+        guardar_snapshot(tabla, df, version)
+        print(f"✅ {tabla}: {len(df)} registros -> {ruta_snapshot(tabla)}")
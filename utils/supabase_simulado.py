@@ -0,0 +1,462 @@
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from postgrest.exceptions import APIError
+
+# Origen de los datos del backend simulado (configurable con AIRPORTS_FAKE_SUPABASE):
+# 'sintetico' genera las tablas con benchmarks/generador.py; cualquier otro valor es un
+# directorio con un archivo '<tabla>.parquet' o '<tabla>.csv' por tabla (esquema de la base de datos)
+VALORES_SINTETICO = ("sintetico", "sintético", "synthetic")
+
+# Tamaño y semilla del conjunto sintético
+AEROPUERTOS_SINTETICOS: int = int(os.environ.get("AIRPORTS_FAKE_AIRPORTS", 1000))
+SEMILLA: int = int(os.environ.get("AIRPORTS_FAKE_SEED", 0))
+
+# Segundos de espera de cada respuesta, más un tiempo por fila devuelta (simula el ancho de banda)
+LATENCIA: float = float(os.environ.get("AIRPORTS_FAKE_LATENCY", 0))
+LATENCIA_POR_FILA: float = float(os.environ.get("AIRPORTS_FAKE_LATENCY_PER_ROW", 0))
+
+# Proporción de peticiones que fallan con un error del servidor (sorteo reproducible con la semilla)
+TASA_ERRORES: float = float(os.environ.get("AIRPORTS_FAKE_ERROR_RATE", 0))
+
+# Máximo de filas por respuesta, como 'max-rows' de PostgREST (Supabase usa 1000)
+MAX_FILAS: int = int(os.environ.get("AIRPORTS_FAKE_MAX_ROWS", 1000))
+
+# Relaciones embebidas: (tabla, relación) -> columna de la tabla que apunta al 'id' de la relación
+CLAVES_FORANEAS = {
+    ('domestic', 'airports'): 'airport_id',
+    ('international', 'airports'): 'airport_id',
+    ('total', 'airports'): 'airport_id',
+    ('airports', 'city'): 'city_id',
+    ('airports', 'state'): 'state_id',
+}
+
+# Campos calculados de sql/campos_calculados.sql: se pueden pedir, filtrar y ordenar como columnas
+CAMPOS_CALCULADOS = {
+    'domestic': {
+        'increase': lambda df: df['2023_enplaned_passengers_dom'] - df['2022_enplaned_passengers_dom'],
+    },
+    'total': {
+        'rank_change': lambda df: df['2022_rank_total'] - df['2023_rank_total'],
+    },
+}
+
+# Operadores de filtro de PostgREST
+OPERADORES = {
+    'eq': lambda serie, valor: serie == valor,
+    'neq': lambda serie, valor: serie != valor,
+    'gt': lambda serie, valor: serie > valor,
+    'gte': lambda serie, valor: serie >= valor,
+    'lt': lambda serie, valor: serie < valor,
+    'lte': lambda serie, valor: serie <= valor,
+}
+
+
+def backend_simulado():
+    """
+    Devuelve el origen de datos del backend simulado si está activado
+    (AIRPORTS_FAKE_SUPABASE), en cuyo caso la aplicación no se conecta a Supabase.
+
+    Returns:
+        str | None: 'sintetico', un directorio de tablas o None si está desactivado
+    """
+    return os.environ.get("AIRPORTS_FAKE_SUPABASE", "").strip() or None
+
+
+def cargar_tablas(origen, n_aeropuertos=AEROPUERTOS_SINTETICOS, semilla=SEMILLA):
+    """
+    Carga las tablas del backend simulado.
+
+    Args:
+        origen (str): 'sintetico' o un directorio con '<tabla>.parquet' o '<tabla>.csv'
+        n_aeropuertos (int): Aeropuertos del conjunto sintético
+        semilla (int): Semilla del conjunto sintético
+
+    Returns:
+        dict[str, pd.DataFrame]: Tablas por nombre
+
+    Raises:
+        ValueError: Si el directorio no existe o no tiene tablas
+    """
+    if origen.lower() in VALORES_SINTETICO:
+        from benchmarks.generador import generar_tablas
+        return generar_tablas(n_aeropuertos, semilla=semilla)
+
+    directorio = Path(origen)
+    if not directorio.is_dir():
+        raise ValueError(f"AIRPORTS_FAKE_SUPABASE: {origen} no es 'sintetico' ni un directorio")
+
+    tablas = {}
+    for ruta in sorted(directorio.iterdir()):
+        if ruta.suffix == '.parquet':
+            tablas[ruta.stem] = pd.read_parquet(ruta)
+        elif ruta.suffix == '.csv':
+            tablas.setdefault(ruta.stem, pd.read_csv(ruta))
+
+    if not tablas:
+        raise ValueError(f"AIRPORTS_FAKE_SUPABASE: el directorio {origen} no tiene archivos .parquet ni .csv")
+    return tablas
+
+
+def _error(mensaje, codigo):
+    """
+    Error con el mismo formato que los de PostgREST.
+
+    Args:
+        mensaje (str): Descripción del error
+        codigo (str): Código de PostgreSQL o PostgREST
+
+    Returns:
+        APIError: Excepción lista para lanzar
+    """
+    return APIError({'message': mensaje, 'code': codigo, 'hint': None, 'details': None})
+
+
+def _registros(df):
+    """
+    Convierte un DataFrame en filas como las de una respuesta JSON (tipos de Python, None en lugar de NaN).
+
+    Args:
+        df (pd.DataFrame): Filas a devolver
+
+    Returns:
+        list[dict]: Filas
+    """
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def _separar_select(texto):
+    """
+    Separa el texto del 'select' en sus elementos de primer nivel
+    ('id, airports(name, id)' -> ['id', 'airports(name, id)']).
+
+    Args:
+        texto (str): Texto del 'select'
+
+    Returns:
+        list[str]: Elementos
+    """
+    elementos, actual, nivel = [], '', 0
+    for caracter in texto:
+        if caracter == ',' and nivel == 0:
+            elementos.append(actual.strip())
+            actual = ''
+            continue
+        nivel += {'(': 1, ')': -1}.get(caracter, 0)
+        actual += caracter
+    elementos.append(actual.strip())
+    return [elemento for elemento in elementos if elemento]
+
+
+class RespuestaSimulada:
+    """Respuesta de execute() con los mismos atributos que la de postgrest (data y count)."""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class ConsultaSimulada:
+    """
+    Consulta sobre una tabla con la interfaz encadenable de postgrest:
+    select, filtros (eq, neq, gt, gte, lt, lte), order, limit, range y execute.
+    """
+
+    def __init__(self, cliente, tabla):
+        self._cliente = cliente
+        self._tabla = tabla
+        self._select = '*'
+        self._conteo = None
+        self._filtros = []
+        self._orden = []
+        self._inicio = 0
+        self._limite = None
+
+    def select(self, *columnas, count=None):
+        self._select = ','.join(columnas) or '*'
+        self._conteo = count
+        return self
+
+    def _filtro(self, operador, columna, valor):
+        self._filtros.append((columna, operador, valor))
+        return self
+
+    def eq(self, columna, valor):
+        return self._filtro('eq', columna, valor)
+
+    def neq(self, columna, valor):
+        return self._filtro('neq', columna, valor)
+
+    def gt(self, columna, valor):
+        return self._filtro('gt', columna, valor)
+
+    def gte(self, columna, valor):
+        return self._filtro('gte', columna, valor)
+
+    def lt(self, columna, valor):
+        return self._filtro('lt', columna, valor)
+
+    def lte(self, columna, valor):
+        return self._filtro('lte', columna, valor)
+
+    def order(self, columna, *, desc=False, nullsfirst=None, foreign_table=None):
+        # Como en PostgreSQL, los nulos van al final en orden ascendente y al principio en descendente
+        self._orden.append((columna, desc, desc if nullsfirst is None else nullsfirst))
+        return self
+
+    def limit(self, cantidad, *, foreign_table=None):
+        self._limite = cantidad
+        return self
+
+    def range(self, inicio, fin, foreign_table=None):
+        self._inicio = inicio
+        self._limite = fin - inicio + 1
+        return self
+
+    def execute(self):
+        return self._cliente._responder(
+            lambda: self._cliente._consultar(
+                self._tabla, self._select, self._conteo, self._filtros, self._orden, self._inicio, self._limite
+            )
+        )
+
+
+class LlamadaSimulada:
+    """Llamada RPC pendiente de execute()."""
+
+    def __init__(self, cliente, funcion, parametros):
+        self._cliente = cliente
+        self._funcion = funcion
+        self._parametros = parametros
+
+    def execute(self):
+        return self._cliente._responder(lambda: self._cliente._llamar(self._funcion, self._parametros))
+
+
+class ClienteSimulado:
+    """
+    Sustituto en proceso del cliente de Supabase para pruebas de carga e integración.
+
+    Implementa la parte de la interfaz que usa la aplicación: table().select() con
+    relaciones embebidas ('airports(airport)', 'city(name)'), campos calculados
+    ('increase', 'rank_change'), filtros, order, limit, range, count='exact' y las
+    funciones RPC de sql/funciones_agregadas.sql. Las respuestas se recortan a
+    'max_filas' como hace PostgREST y pueden demorarse o fallar de forma reproducible.
+    """
+
+    def __init__(self, tablas, latencia=LATENCIA, latencia_por_fila=LATENCIA_POR_FILA,
+                 tasa_errores=TASA_ERRORES, max_filas=MAX_FILAS, semilla=SEMILLA):
+        """
+        Args:
+            tablas (dict[str, pd.DataFrame]): Tablas con el esquema de la base de datos
+            latencia (float): Segundos de espera de cada respuesta
+            latencia_por_fila (float): Segundos adicionales por fila devuelta
+            tasa_errores (float): Proporción de peticiones que fallan
+            max_filas (int): Máximo de filas por respuesta (0 = sin límite)
+            semilla (int): Semilla del sorteo de errores
+        """
+        self.latencia = latencia
+        self.latencia_por_fila = latencia_por_fila
+        self.tasa_errores = tasa_errores
+        self.max_filas = max_filas
+        self.peticiones = 0
+
+        self._columnas = {nombre: list(df.columns) for nombre, df in tablas.items()}
+        self._tablas = {}
+        for nombre, df in tablas.items():
+            df = df.reset_index(drop=True)
+            for campo, calcular in CAMPOS_CALCULADOS.get(nombre, {}).items():
+                df = df.assign(**{campo: calcular(df)})
+            self._tablas[nombre] = df
+
+        self._azar = random.Random(semilla)
+        self._candado = threading.Lock()
+        # Posiciones de las filas por (tabla, filtros, orden): las páginas de una misma
+        # consulta no vuelven a filtrar ni a ordenar la tabla completa
+        self._posiciones = {}
+        # Tablas indexadas por 'id' para resolver las relaciones embebidas
+        self._indexadas = {}
+
+    def table(self, tabla):
+        return ConsultaSimulada(self, tabla)
+
+    def from_(self, tabla):
+        return self.table(tabla)
+
+    def rpc(self, funcion, params=None):
+        return LlamadaSimulada(self, funcion, params or {})
+
+    def _responder(self, resolver):
+        """
+        Resuelve una petición aplicando el error simulado y la latencia.
+
+        Args:
+            resolver (callable): Función que calcula la respuesta
+
+        Returns:
+            RespuestaSimulada: Respuesta de la petición
+
+        Raises:
+            APIError: Si la petición falla (simulado o por una consulta inválida)
+        """
+        with self._candado:
+            self.peticiones += 1
+            falla = self.tasa_errores > 0 and self._azar.random() < self.tasa_errores
+        if falla:
+            time.sleep(self.latencia)
+            raise _error("Error simulado del servidor", '503')
+
+        respuesta = resolver()
+        time.sleep(self.latencia + self.latencia_por_fila * len(respuesta.data))
+        return respuesta
+
+    def _tabla(self, tabla):
+        if tabla not in self._tablas:
+            raise _error(f'relation "public.{tabla}" does not exist', '42P01')
+        return self._tablas[tabla]
+
+    def _columna(self, tabla, columna):
+        df = self._tabla(tabla)
+        if columna not in df.columns:
+            raise _error(f"column {tabla}.{columna} does not exist", '42703')
+        return df[columna]
+
+    def _ordenar(self, tabla, filtros, orden):
+        """
+        Posiciones de las filas que pasan los filtros, en el orden pedido.
+
+        Args:
+            tabla (str): Nombre de la tabla
+            filtros (list[tuple]): (columna, operador, valor)
+            orden (list[tuple]): (columna, descendente, nulos primero)
+
+        Returns:
+            np.ndarray: Posiciones de las filas
+        """
+        clave = (tabla, tuple(filtros), tuple(orden))
+        if clave in self._posiciones:
+            return self._posiciones[clave]
+
+        df = self._tabla(tabla)
+        mascara = np.ones(len(df), dtype=bool)
+        for columna, operador, valor in filtros:
+            mascara &= OPERADORES[operador](self._columna(tabla, columna), valor).to_numpy(dtype=bool)
+        posiciones = np.flatnonzero(mascara)
+
+        # Ordenamientos estables desde la última columna hasta la primera
+        for columna, descendente, nulos_primero in reversed(orden):
+            valores = self._columna(tabla, columna).iloc[posiciones]
+            claves = valores.rank(method='dense').to_numpy()
+            if descendente:
+                claves = -claves
+            claves = np.where(np.isnan(claves), -np.inf if nulos_primero else np.inf, claves)
+            posiciones = posiciones[np.argsort(claves, kind='stable')]
+
+        with self._candado:
+            self._posiciones[clave] = posiciones
+        return posiciones
+
+    def _consultar(self, tabla, select, conteo, filtros, orden, inicio, limite):
+        """
+        Resuelve una consulta table().select() (ver ConsultaSimulada).
+
+        Returns:
+            RespuestaSimulada: Filas de la página pedida y conteo total si se pidió
+        """
+        df = self._tabla(tabla)
+        posiciones = self._ordenar(tabla, filtros, orden)
+
+        cantidad = len(posiciones) - inicio if limite is None else limite
+        if self.max_filas:
+            cantidad = min(cantidad, self.max_filas)
+        pagina = df.iloc[posiciones[inicio:inicio + max(cantidad, 0)]]
+
+        columnas, relaciones = [], []
+        for elemento in _separar_select(select):
+            relacion = re.fullmatch(r'(\w+)\((.*)\)', elemento)
+            if relacion:
+                relaciones.append((relacion.group(1), _separar_select(relacion.group(2)) or ['*']))
+            elif elemento == '*':
+                columnas.extend(self._columnas[tabla])
+            else:
+                self._columna(tabla, elemento)
+                columnas.append(elemento)
+
+        filas = _registros(pagina[list(dict.fromkeys(columnas))])
+        for nombre, campos in relaciones:
+            if (tabla, nombre) not in CLAVES_FORANEAS:
+                raise _error(f"Could not find a relationship between '{tabla}' and '{nombre}'", 'PGRST200')
+            campos = self._columnas[nombre] if campos == ['*'] else campos
+            for campo in campos:
+                self._columna(nombre, campo)
+            if nombre not in self._indexadas:
+                self._indexadas[nombre] = self._tabla(nombre).set_index('id')
+            valores = self._indexadas[nombre][campos].reindex(pagina[CLAVES_FORANEAS[(tabla, nombre)]])
+            existe = pagina[CLAVES_FORANEAS[(tabla, nombre)]].isin(self._indexadas[nombre].index).to_numpy()
+            for fila, registro, encontrado in zip(filas, _registros(valores), existe):
+                fila[nombre] = registro if encontrado else None
+
+        return RespuestaSimulada(filas, len(posiciones) if conteo else None)
+
+    def _llamar(self, funcion, parametros):
+        """
+        Resuelve las funciones RPC de sql/funciones_agregadas.sql.
+
+        Args:
+            funcion (str): Nombre de la función
+            parametros (dict): Argumentos de la función
+
+        Returns:
+            RespuestaSimulada: Filas devueltas por la función
+        """
+        aeropuertos = self._tabla('airports')
+
+        if funcion == 'top_states_total_passengers':
+            uniones = (
+                self._tabla('international')[['airport_id', '2023_enplaned_passengers_inter']]
+                .merge(self._tabla('domestic')[['airport_id', '2023_enplaned_passengers_dom']], on='airport_id')
+                .merge(aeropuertos[['id', 'state_id']], left_on='airport_id', right_on='id')
+                .merge(self._tabla('state')[['id', 'name']], left_on='state_id', right_on='id')
+            )
+            uniones['total_passengers'] = uniones['2023_enplaned_passengers_inter'] + uniones['2023_enplaned_passengers_dom']
+            resultado = (
+                uniones.groupby('name', as_index=False)['total_passengers'].sum()
+                .rename(columns={'name': 'states'})
+                .sort_values(['total_passengers', 'states'], ascending=[False, True])
+                .head(parametros.get('limit_count', 5))
+            )
+            return RespuestaSimulada(_registros(resultado[['states', 'total_passengers']]))
+
+        if funcion == 'international_passenger_proportion':
+            uniones = self._tabla('international').merge(
+                aeropuertos[['id', 'name']], left_on='airport_id', right_on='id', suffixes=('', '_aeropuerto')
+            )
+            total = self._tabla('international')['2023_enplaned_passengers_inter'].sum()
+            por_aeropuerto = uniones.groupby(['id_aeropuerto', 'name'], as_index=False)['2023_enplaned_passengers_inter'].sum()
+            por_aeropuerto['proportion'] = (por_aeropuerto['2023_enplaned_passengers_inter'] / total).round(3) if total else None
+            por_aeropuerto = por_aeropuerto.rename(columns={'name': 'airport_name'}).sort_values(
+                ['proportion', 'airport_name'], ascending=[False, True], na_position='last'
+            )
+            fila_total = {'airport_name': 'TOTAL', 'proportion': round(float(uniones['2023_enplaned_passengers_inter'].sum() / total), 3) if total else None}
+            return RespuestaSimulada(_registros(por_aeropuerto[['airport_name', 'proportion']]) + [fila_total])
+
+        raise _error(f"Could not find the function public.{funcion}", 'PGRST202')
+
+
+def crear_cliente_simulado(origen=None):
+    """
+    Crea el cliente simulado con las tablas de 'origen' y la configuración de las
+    variables de entorno AIRPORTS_FAKE_*.
+
+    Args:
+        origen (str, optional): Origen de los datos (por defecto AIRPORTS_FAKE_SUPABASE)
+
+    Returns:
+        ClienteSimulado: Cliente listo para usar en lugar del de Supabase
+    """
+    return ClienteSimulado(cargar_tablas(origen or backend_simulado()))
@@ -0,0 +1,111 @@
+from fnmatch import fnmatchcase
+import numpy as np
+import pandas as pd
+
+# Texto con pocos valores distintos (ciudades, estados) se guarda como categoría cuando
+# la cantidad de valores distintos no supera esta proporción de las filas
+PROPORCION_CATEGORIA = 0.5
+
+# Texto respaldado por Arrow (un solo búfer para todos los valores en lugar de un objeto por fila)
+TIPO_TEXTO = pd.StringDtype("pyarrow", na_value=np.nan)
+
+# Límites de los enteros de 32 bits
+MINIMO_INT32 = np.iinfo(np.int32).min
+MAXIMO_INT32 = np.iinfo(np.int32).max
+
+# Columnas enteras por naturaleza (rankings, pasajeros embarcados, ids) que llegan como
+# decimales cuando tienen nulos: son las únicas columnas decimales que se pasan a int32
+PATRONES_ENTEROS = ('*_rank_*', '*_enplaned_passengers_*', 'id', '*_id')
+
+
+def _cabe_en_int32(valores):
+    """
+    Indica si todos los valores (sin nulos) están dentro del rango de int32.
+
+    Args:
+        valores (pd.Series): Valores numéricos sin nulos
+
+    Returns:
+        bool: True si la columna se puede guardar como int32
+    """
+    return valores.empty or (valores.min() >= MINIMO_INT32 and valores.max() <= MAXIMO_INT32)
+
+
+def _es_columna_entera(nombre):
+    """
+    Indica si el nombre de una columna corresponde a una columna entera (ver PATRONES_ENTEROS).
+
+    Args:
+        nombre: Nombre de la columna
+
+    Returns:
+        bool: True si la columna es un ranking, pasajeros embarcados o un id
+    """
+    return any(fnmatchcase(str(nombre), patron) for patron in PATRONES_ENTEROS)
+
+
+def optimizar_columna(serie, proporcion_categoria=PROPORCION_CATEGORIA):
+    """
+    Elige un tipo de dato compacto para una columna sin perder información:
+    - texto: categoría si hay pocos valores distintos, si no texto de Arrow
+    - enteros de 64 bits: int32 si el rango lo permite (rankings, pasajeros, ids)
+    - decimales: int32 si la columna es un ranking, pasajeros embarcados o un id (ver
+      PATRONES_ENTEROS) con valores enteros y sin nulos; si no, float32 solo si todos los
+      valores se representan igual en float32 (por ejemplo 0.5 o 12.25, pero no 12.34)
+
+    Args:
+        serie (pd.Series): Columna original
+        proporcion_categoria (float): Proporción máxima de valores distintos para usar categoría
+
+    Returns:
+        pd.Series: Columna con el tipo optimizado (o la misma si no hay un tipo mejor)
+    """
+    tipo = serie.dtype
+
+    if tipo == object:
+        if pd.api.types.infer_dtype(serie, skipna=True) != 'string':
+            return serie
+        distintos = serie.nunique(dropna=True)
+        if len(serie) > 1 and distintos <= proporcion_categoria * len(serie):
+            return serie.astype('category')
+        return serie.astype(TIPO_TEXTO)
+
+    if pd.api.types.is_bool_dtype(tipo) or not pd.api.types.is_numeric_dtype(tipo):
+        return serie
+
+    if pd.api.types.is_integer_dtype(tipo):
+        if tipo.itemsize > 4 and _cabe_en_int32(serie):
+            return serie.astype(np.int32)
+        return serie
+
+    if pd.api.types.is_float_dtype(tipo) and tipo.itemsize > 4:
+        valores = serie.dropna()
+        if valores.empty:
+            return serie
+        if (_es_columna_entera(serie.name) and not serie.hasnans
+                and (valores == np.round(valores)).all() and _cabe_en_int32(valores)):
+            return serie.astype(np.int32)
+        if np.array_equal(valores.to_numpy().astype(np.float32).astype(np.float64), valores.to_numpy()):
+            return serie.astype(np.float32)
+
+    return serie
+
+
+def optimizar_tipos(df, proporcion_categoria=PROPORCION_CATEGORIA):
+    """
+    Convierte las columnas de un DataFrame cargado desde JSON (objetos de Python,
+    int64 y float64) a tipos compactos (ver optimizar_columna). No modifica el original.
+
+    Args:
+        df (pd.DataFrame): Datos cargados
+        proporcion_categoria (float): Proporción máxima de valores distintos para usar categoría
+
+    Returns:
+        pd.DataFrame: DataFrame con los tipos optimizados
+    """
+    if df.empty:
+        return df
+    return pd.DataFrame(
+        {col: optimizar_columna(df[col], proporcion_categoria) for col in df.columns},
+        index=df.index
+    )